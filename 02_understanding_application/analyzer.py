@@ -2,8 +2,18 @@ from dotenv import load_dotenv
 import os
 import sys
 import time
-import requests
 import json
+import hashlib
+
+from operation_poller import OperationPoller
+
+CU_VERSION = "2025-05-01-preview"
+# Alias store. Every consumer must read the same file (set ANALYZER_ALIASES_FILE to a
+# shared location, e.g. a mounted file share, when consumers run on other hosts),
+# otherwise they keep resolving the alias to the version they last saw.
+ALIASES_FILE = os.getenv(
+    "ANALYZER_ALIASES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "analyzer_aliases.json")
+)
 
 
 def main():
@@ -28,13 +38,18 @@ def main():
         # Create the analyzer
         """
         + Creates appropriate headers for the REST requests
-        + Submits an HTTP DELETE request to delete the analyzer if it already exists.
-        + Submits an HTTP PUT request to initiate the creation of the analyzer.
-        + Checks the response to retrieve the Operation-Location callback URL.
-        + Repeatedly submits an HTTP GET request to the callback URL to check the operation status until it is no longer running.
-        + Confirms success (or failure) of the operation to the user.
+        + GETs the current analyzer (through its alias) and compares the schema hash.
+        + Does nothing when the deployed schema is unchanged.
+        + Otherwise submits an HTTP PUT request under a versioned analyzer name and polls
+          the Operation-Location callback URL until the build is no longer running.
+        + Points the alias at the new version. The previous version is kept for consumers
+          that resolved the alias before the swap and is deleted by the next deployment.
+        + Pass --recreate to DELETE and PUT the analyzer under its plain name instead.
         """
-        create_analyzer (card_schema, analyzer, ai_svc_endpoint, ai_svc_key)
+        if "--recreate" in sys.argv:
+            create_analyzer (card_schema, analyzer, ai_svc_endpoint, ai_svc_key)
+        else:
+            deploy_analyzer (card_schema, analyzer, ai_svc_endpoint, ai_svc_key)
 
         print("\n")
 
@@ -45,8 +60,6 @@ def main():
 def create_analyzer (schema, analyzer, endpoint, key):
     
     # Create a Content Understanding analyzer
-    CU_VERSION = "2025-05-01-preview"
-    
     headers = {
      "Ocp-Apim-Subscription-Key": key,
      "Content-Type": "application/json"
@@ -54,36 +67,132 @@ def create_analyzer (schema, analyzer, endpoint, key):
     
     url = f"{endpoint}/contentunderstanding/analyzers/{analyzer}?api-version={CU_VERSION}"
 
-    # Delete the analyzer if it already exists
-    response = requests.delete(url, headers=headers)
-    print(response.status_code)
-    time.sleep(1)
+    with OperationPoller(headers={"Ocp-Apim-Subscription-Key": key}) as poller:
 
-    # Now create it
-    response = requests.put(url, headers=headers, data=(schema))
-    print(response.status_code)
+        # Delete the analyzer if it already exists
+        response = poller.session.delete(url, headers=headers)
+        print(response.status_code)
+        time.sleep(1)
 
-    # Get the response and extract the callback URL
-    callback_url = response.headers["Operation-Location"]
+        # Now create it
+        response = poller.session.put(url, headers=headers, data=(schema))
+        print(response.status_code)
 
-    # Check the status of the operation
-    time.sleep(1)
-    result_response = requests.get(callback_url, headers=headers)
+        # Get the response and extract the callback URL
+        callback_url = response.headers["Operation-Location"]
 
-    # Keep polling until the operation is no longer running
-    status = result_response.json().get("status")
-    while status == "Running":
-        time.sleep(1)
-        result_response = requests.get(callback_url, headers=headers)
-        status = result_response.json().get("status")
+        # Poll the operation until it is no longer running
+        result_json = poller.wait(callback_url)
 
-    result = result_response.json().get("status")
+    result = result_json.get("status")
     print(result)
     if result == "Succeeded":
         print(f"Analyzer '{analyzer}' created successfully.")
     else:
         print("Analyzer creation failed.")
-        print(result_response.json())
+        print(result_json)
+
+
+def schema_hash(definition):
+    """Canonical hash of an analyzer definition: sorted keys, no whitespace, tags ignored."""
+    canonical = {name: value for name, value in definition.items() if name != "tags"}
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def _project(deployed, desired):
+    """Keep only the parts of a deployed definition that the desired definition sets."""
+    if isinstance(deployed, dict) and isinstance(desired, dict):
+        return {name: _project(deployed.get(name), value) for name, value in desired.items()}
+    return deployed
+
+
+def load_aliases(aliases_file=ALIASES_FILE):
+    if not os.path.exists(aliases_file):
+        return {}
+    with open(aliases_file, "r") as file:
+        return json.load(file)
+
+
+def save_aliases(aliases, aliases_file=ALIASES_FILE):
+    # Written to a temporary file and renamed, so readers never see a partial file
+    with open(f"{aliases_file}.partial", "w") as file:
+        json.dump(aliases, file, indent=4)
+    os.replace(f"{aliases_file}.partial", aliases_file)
+
+
+def _alias_entry(aliases, analyzer):
+    """{"current": version, "previous": version or None} of an alias (plain names accepted)."""
+    entry = aliases.get(analyzer, analyzer)
+    if isinstance(entry, str):
+        return {"current": entry, "previous": None}
+    return entry
+
+
+def resolve_analyzer(analyzer, aliases_file=ALIASES_FILE):
+    """Versioned analyzer currently behind an alias (the name itself when there is no alias)."""
+    return _alias_entry(load_aliases(aliases_file), analyzer)["current"]
+
+
+def deployed_schema_hash(poller, url, desired):
+    """Schema hash of a deployed analyzer, or None when it does not exist or failed to build."""
+    response = poller.session.get(url)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    deployed = response.json()
+    if str(deployed.get("status", "")).lower() == "failed":
+        return None
+    return (deployed.get("tags") or {}).get("schemaHash") or schema_hash(_project(deployed, desired))
+
+
+def deploy_analyzer (schema, analyzer, endpoint, key, aliases_file=ALIASES_FILE, keep_previous=False):
+
+    # Hash the desired definition; the deployed one is compared against it
+    desired = json.loads(schema)
+    desired_hash = schema_hash(desired)
+    aliases = load_aliases(aliases_file)
+    entry = _alias_entry(aliases, analyzer)
+    current, previous = entry["current"], entry["previous"]
+    version = f"{analyzer}-{desired_hash[:12]}"
+
+    headers = {
+     "Ocp-Apim-Subscription-Key": key,
+     "Content-Type": "application/json"
+     }
+
+    def analyzer_url(name):
+        return f"{endpoint}/contentunderstanding/analyzers/{name}?api-version={CU_VERSION}"
+
+    with OperationPoller(headers={"Ocp-Apim-Subscription-Key": key}) as poller:
+
+        # Nothing to do when the analyzer behind the alias already has this schema
+        if deployed_schema_hash(poller, analyzer_url(current), desired) == desired_hash:
+            print(f"Analyzer '{current}' is up to date (schema {desired_hash[:12]}).")
+            return current
+
+        # Build the new version next to the current one (reused if a previous run built it)
+        if deployed_schema_hash(poller, analyzer_url(version), desired) != desired_hash:
+            body = dict(desired, tags=dict(desired.get("tags") or {}, schemaHash=desired_hash))
+            response = poller.session.put(analyzer_url(version), headers=headers, data=json.dumps(body))
+            print(response.status_code)
+            response.raise_for_status()
+            result_json = poller.wait(response.headers["Operation-Location"])
+            if result_json.get("status") != "Succeeded":
+                print(f"Analyzer '{version}' creation failed; alias '{analyzer}' still points to '{current}'.")
+                print(result_json)
+                return None
+
+        # Swap the alias. The version it pointed to stays deployed until the next swap, so
+        # consumers that resolved the alias before this one finish their runs; the version
+        # before it, kept by the previous deployment, is retired now.
+        aliases[analyzer] = {"current": version, "previous": current if current not in (analyzer, version) else None}
+        save_aliases(aliases, aliases_file)
+        print(f"Alias '{analyzer}' now points to '{version}' (previous: '{current}').")
+        if previous not in (None, analyzer, version, current) and not keep_previous:
+            response = poller.session.delete(analyzer_url(previous))
+            print(f"Deleted retired analyzer '{previous}' ({response.status_code}).")
+
+    return version
 
 
 if __name__ == "__main__":
@@ -0,0 +1,234 @@
+from dotenv import load_dotenv
+import os
+import sys
+import time
+import json
+import random
+import asyncio
+import aiohttp
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+
+from commons.analysis_cache import AnalysisCache, content_sha256
+from analyzer import resolve_analyzer
+from operation_poller import AsyncOperationPoller
+from result_extraction import JsonlSink, to_record
+
+CU_VERSION = "2025-05-01-preview"
+SUPPORTED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".pdf")
+
+
+def main():
+
+    try:
+
+        # Get the directory (or manifest) with the files to analyze
+        source = "cards"
+        output_file = "results.jsonl"
+        if len(sys.argv) > 1:
+            source = sys.argv[1]
+        if len(sys.argv) > 2:
+            output_file = sys.argv[2]
+
+        # Get config settings
+        load_dotenv()
+        ai_svc_endpoint = os.getenv('ENDPOINT')
+        ai_svc_key = os.getenv('KEY')
+        analyzer = resolve_analyzer(os.getenv('ANALYZER_NAME'))
+
+        # Analyze every file, writing one JSON line per result as they finish
+        files = load_inputs(source)
+        print(f"Analyzing {len(files)} files with '{analyzer}'")
+        cache = AnalysisCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_cache.sqlite"))
+        batch = BatchAnalyzer(ai_svc_endpoint, ai_svc_key, analyzer, cache=cache)
+        try:
+            report = asyncio.run(batch.run(files, output_file))
+        finally:
+            cache.close()
+        print(json.dumps(report, indent=4))
+
+    except Exception as ex:
+        print(ex)
+
+
+def load_inputs(source):
+    """
+    Files to analyze: every supported file of a directory (recursively), or the paths
+    listed in a manifest (.txt with one path per line, or .jsonl with a "path" key).
+    Relative manifest paths are resolved against the manifest's directory.
+    """
+    if os.path.isdir(source):
+        files = []
+        for root, _, names in os.walk(source):
+            files.extend(os.path.join(root, name) for name in names if name.lower().endswith(SUPPORTED_EXTENSIONS))
+        return sorted(files)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    files = []
+    with open(source, "r") as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = json.loads(line)["path"] if source.endswith(".jsonl") else line
+            files.append(path if os.path.isabs(path) else os.path.join(base_dir, path))
+    return files
+
+
+class BatchAnalyzer:
+    """
+    Analyzes many files with a Content Understanding analyzer concurrently.
+
+    Files are submitted over one pooled aiohttp session, with at most max_in_flight
+    analyses between submission and completion. All pending operations are polled by a
+    single AsyncOperationPoller scheduler with adaptive backoff that honors Retry-After.
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        key,
+        analyzer,
+        api_version=CU_VERSION,
+        max_in_flight=16,
+        max_connections=32,
+        initial_poll_interval=1.0,
+        max_poll_interval=15.0,
+        operation_timeout=600.0,
+        max_retries=5,
+        include_raw=False,
+        cache=None,
+    ):
+        """
+        :param cache: AnalysisCache consulted before submitting a file (None = always submit)
+        """
+        self.endpoint = endpoint.rstrip("/")
+        self.key = key
+        self.analyzer = analyzer
+        self.api_version = api_version
+        self.max_in_flight = max_in_flight
+        self.max_connections = max_connections
+        self.initial_poll_interval = initial_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.operation_timeout = operation_timeout
+        self.max_retries = max_retries
+        self.include_raw = include_raw
+        self.cache = cache
+
+    def _headers(self, content_type=None):
+        headers = {"Ocp-Apim-Subscription-Key": self.key}
+        if content_type:
+            headers["Content-Type"] = content_type
+        return headers
+
+    @staticmethod
+    def _retry_after(response, default):
+        value = response.headers.get("Retry-After")
+        try:
+            return max(float(value), 0.0) if value is not None else default
+        except ValueError:
+            return default
+
+    async def _request(self, session, method, url, idempotent=True, **kwargs):
+        """
+        Send a request with backoff. Idempotent requests retry 429/5xx and connection errors.
+        Otherwise only a 429 or a failure to connect is retried: after a 5xx, a dropped
+        connection or a timeout the request may have been accepted, and sending it again
+        would start (and bill) a second analysis.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    if response.status == 429 or (idempotent and response.status >= 500):
+                        if attempt == self.max_retries:
+                            response.raise_for_status()
+                        await asyncio.sleep(self._retry_after(response, min(2 ** attempt, 30) + random.random()))
+                        continue
+                    response.raise_for_status()
+                    return await response.json(), response.headers
+            except aiohttp.ClientConnectorError:
+                # The connection was never established, so nothing was sent
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, 30) + random.random())
+            except aiohttp.ClientConnectionError:
+                if not idempotent or attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(min(2 ** attempt, 30) + random.random())
+
+    async def _submit(self, session, image_data):
+        """Submit one file's content; return the URL of its analysis operation."""
+        url = f"{self.endpoint}/contentunderstanding/analyzers/{self.analyzer}:analyze?api-version={self.api_version}"
+        response_json, headers = await self._request(
+            session, "POST", url, idempotent=False, headers=self._headers("application/octet-stream"), data=image_data
+        )
+        return headers.get("Operation-Location") or (
+            f"{self.endpoint}/contentunderstanding/analyzerResults/{response_json['id']}?api-version={self.api_version}"
+        )
+
+    async def run(self, files, output_file="results.jsonl"):
+        """
+        Analyze every file and append one JSON line per result to output_file.
+        :return: Report with totals, elapsed time, files per second and polling metrics
+        """
+        start = time.perf_counter()
+        sink = JsonlSink(output_file)
+        slots = asyncio.Semaphore(self.max_in_flight)
+        counts = {"succeeded": 0, "failed": 0}
+        connector = aiohttp.TCPConnector(limit=self.max_connections)
+
+        async with aiohttp.ClientSession(connector=connector) as session:
+            poller = AsyncOperationPoller(
+                session,
+                headers=self._headers(),
+                initial_interval=self.initial_poll_interval,
+                max_interval=self.max_poll_interval,
+                timeout=self.operation_timeout,
+            )
+
+            async def analyze(image_file):
+                async with slots:
+                    submitted_at = time.perf_counter()
+                    cached = False
+                    try:
+                        with open(image_file, "rb") as file:
+                            image_data = file.read()
+                        content_hash = content_sha256(image_data)
+                        result_json = self.cache.get(content_hash, self.analyzer, self.api_version) if self.cache else None
+                        cached = result_json is not None
+                        if not cached:
+                            result_url = await self._submit(session, image_data)
+                            result_json = await poller.wait(result_url)
+                            if self.cache and result_json.get("status") == "Succeeded":
+                                self.cache.put(content_hash, self.analyzer, self.api_version, None, result_json)
+                    except Exception as e:
+                        result_json = {"status": "Error", "error": str(e)}
+                    counts["succeeded" if result_json.get("status") == "Succeeded" else "failed"] += 1
+                    record = to_record(
+                        image_file, result_json, cached=cached, elapsed_seconds=round(time.perf_counter() - submitted_at, 3)
+                    )
+                    if self.include_raw:
+                        record["result"] = result_json
+                    sink.write(record)
+
+            try:
+                await asyncio.gather(*(analyze(image_file) for image_file in files))
+            finally:
+                await poller.close()
+                sink.close()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "total": len(files),
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "elapsed_seconds": elapsed,
+            "files_per_second": len(files) / elapsed if elapsed > 0 else None,
+            "output_file": output_file,
+            "polling": poller.get_metrics(),
+            "cache": self.cache.get_stats() if self.cache else None,
+        }
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 from dotenv import load_dotenv
 import os
 import sys
-import time
-import requests
-import json
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+
+from commons.analysis_cache import AnalysisCache, content_sha256
+from analyzer import resolve_analyzer
+from operation_poller import OperationPoller
+from result_extraction import JsonlSink, to_record
 
 
 def main():
@@ -22,7 +26,7 @@ def main():
         load_dotenv()
         ai_svc_endpoint = os.getenv('ENDPOINT')
         ai_svc_key = os.getenv('KEY')
-        analyzer = os.getenv('ANALYZER_NAME')
+        analyzer = resolve_analyzer(os.getenv('ANALYZER_NAME'))
 
         # Analyze the business card
         analyze_card (image_file, analyzer, ai_svc_endpoint, ai_svc_key)
@@ -46,60 +50,54 @@ def analyze_card (image_file, analyzer, endpoint, key):
     with open(image_file, "rb") as file:
         image_data = file.read()
 
-    ## Use a POST request to submit the image data to the analyzer
-    print("Submitting request...")
-    headers = {
-        "Ocp-Apim-Subscription-Key": key,
-        "Content-Type": "application/octet-stream"}
-    url = f'{endpoint}/contentunderstanding/analyzers/{analyzer}:analyze?api-version={CU_VERSION}'
-    response = requests.post(url, headers=headers, data=image_data)
-
-    # Get the response and extract the ID assigned to the analysis operation
-    print(response.status_code)
-    response_json = response.json()
-    id_value = response_json.get("id")
-
-    # Use a GET request to check the status of the analysis operation
-    print ('Getting results...')
-    time.sleep(1)
-    result_url = f'{endpoint}/contentunderstanding/analyzerResults/{id_value}?api-version={CU_VERSION}'
-    result_response = requests.get(result_url, headers=headers)
-    print(result_response.status_code)
-
-    # Keep polling until the analysis is complete
-    status = result_response.json().get("status")
-    while status == "Running":
-        time.sleep(1)
-        result_response = requests.get(result_url, headers=headers)
-        status = result_response.json().get("status")
-
-    # Process the analysis results
+    # Reuse the result of a previous run when this exact content was already analyzed
+    cache = AnalysisCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_cache.sqlite"))
+    try:
+        content_hash = content_sha256(image_data)
+        result_json = cache.get(content_hash, analyzer, CU_VERSION)
+        if result_json is not None:
+            print("Result found in the analysis cache")
+            status = result_json.get("status")
+        else:
+            ## Use a POST request to submit the image data to the analyzer
+            print("Submitting request...")
+            headers = {
+                "Ocp-Apim-Subscription-Key": key,
+                "Content-Type": "application/octet-stream"}
+            url = f'{endpoint}/contentunderstanding/analyzers/{analyzer}:analyze?api-version={CU_VERSION}'
+            with OperationPoller(headers={"Ocp-Apim-Subscription-Key": key}) as poller:
+                response = poller.session.post(url, headers=headers, data=image_data)
+
+                # Get the response and extract the ID assigned to the analysis operation
+                print(response.status_code)
+                response_json = response.json()
+                id_value = response_json.get("id")
+
+                # Poll the analysis operation until it is no longer running
+                print ('Getting results...')
+                result_url = f'{endpoint}/contentunderstanding/analyzerResults/{id_value}?api-version={CU_VERSION}'
+                result_json = poller.wait(result_url)
+                status = result_json.get("status")
+            if status == "Succeeded":
+                cache.put(content_hash, analyzer, CU_VERSION, None, result_json)
+    finally:
+        cache.close()
+
+    # Process the analysis results (parsed once, by the poller)
     if status == "Succeeded":
         print("Analysis succeeded:\n")
-        result_json = result_response.json()
-        output_file = "results.json"
-        with open(output_file, "w") as json_file:
-            json.dump(result_json, json_file, indent=4)
-            print(f"Response saved in {output_file}\n")
-
-    # Iterate through the fields and extract the names and type-specific values
-        contents = result_json["result"]["contents"]
-        for content in contents:
-            if "fields" in content:
-                fields = content["fields"]
-                for field_name, field_data in fields.items():
-                    if field_data['type'] == "string":
-                        print(f"{field_name}: {field_data['valueString']}")
-                    elif field_data['type'] == "number":
-                        print(f"{field_name}: {field_data['valueNumber']}")
-                    elif field_data['type'] == "integer":
-                        print(f"{field_name}: {field_data['valueInteger']}")
-                    elif field_data['type'] == "date":
-                        print(f"{field_name}: {field_data['valueDate']}")
-                    elif field_data['type'] == "time":
-                        print(f"{field_name}: {field_data['valueTime']}")
-                    elif field_data['type'] == "array":
-                        print(f"{field_name}: {field_data['valueArray']}")    
+        output_file = "results.jsonl"
+        record = to_record(image_file, result_json)
+        with JsonlSink(output_file) as sink:
+            sink.write(record)
+            print(f"Result appended to {output_file}\n")
+
+        # Print the names and type-specific values of the fields
+        for field_name, value in record["fields"].items():
+            print(f"{field_name}: {value}")
+    else:
+        print(f"Analysis finished with status {status}")
+        print(result_json)
 
 if __name__ == "__main__":
     main()        
\ No newline at end of file
@@ -0,0 +1,271 @@
+import time
+import heapq
+import asyncio
+import statistics
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+RUNNING_STATUSES = ("NotStarted", "Running")
+
+
+class OperationTimeoutError(TimeoutError):
+    pass
+
+
+class _Operation:
+    def __init__(self, url, started, deadline, interval):
+        self.url = url
+        self.started = started
+        self.deadline = deadline
+        self.interval = interval
+        self.polls = 0
+        self.result = None
+
+
+class _PollingPolicy:
+    """
+    Shared state of the sync and async pollers: poll intervals and metrics.
+
+    The first poll of an operation waits initial_interval, or (adaptive=True) a fraction
+    of the median completion time observed so far, so fast jobs are picked up quickly and
+    slow ones are not polled needlessly. Later polls back off by `backoff` up to
+    max_interval. A Retry-After header from the service always takes precedence.
+    Each poll request times out after request_timeout, or sooner if the operation's
+    deadline is closer, so one hung connection cannot hold the others past their deadlines;
+    a timed out poll is retried like a 5xx until the deadline.
+    """
+
+    def __init__(
+        self,
+        headers=None,
+        initial_interval=0.5,
+        max_interval=15.0,
+        backoff=2.0,
+        timeout=600.0,
+        adaptive=True,
+        request_timeout=30.0,
+    ):
+        self.headers = headers or {}
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self.adaptive = adaptive
+        self.request_timeout = request_timeout
+        self._durations = []
+        self._metrics = {"operations": 0, "succeeded": 0, "failed": 0, "timed_out": 0, "polls": 0}
+
+    def _first_interval(self):
+        if self.adaptive and self._durations:
+            recent = self._durations[-100:]
+            return min(max(self.initial_interval, 0.8 * statistics.median(recent)), self.max_interval)
+        return self.initial_interval
+
+    def _start(self, url, timeout):
+        now = time.monotonic()
+        timeout = timeout or self.timeout
+        self._metrics["operations"] += 1
+        return _Operation(url, now, now + timeout, min(self._first_interval(), timeout))
+
+    def _request_timeout(self, operation):
+        """Timeout of one poll request, bounded by the time left before the deadline."""
+        return max(min(self.request_timeout, operation.deadline - time.monotonic()), 0.5)
+
+    def _poll_timed_out(self, operation):
+        # Handled as a transient server error: polled again, or timed out past the deadline
+        return self._next_delay(operation, 504, {}, {})
+
+    @staticmethod
+    def _retry_after(headers):
+        value = headers.get("Retry-After")
+        try:
+            return max(float(value), 0.0) if value is not None else None
+        except ValueError:
+            return None
+
+    def _next_delay(self, operation, status_code, headers, result_json):
+        """Record one poll; return the delay before the next one, or None when finished."""
+        operation.polls += 1
+        self._metrics["polls"] += 1
+        now = time.monotonic()
+        if status_code == 429 or status_code >= 500:
+            pass
+        elif result_json.get("status") not in RUNNING_STATUSES:
+            operation.result = result_json
+            self._finish(operation, "succeeded" if result_json.get("status") == "Succeeded" else "failed")
+            return None
+        if now >= operation.deadline:
+            operation.result = {"status": "TimedOut", "error": f"Operation not finished after {now - operation.started:.1f}s"}
+            self._finish(operation, "timed_out")
+            return None
+        retry_after = self._retry_after(headers)
+        delay = retry_after if retry_after is not None else operation.interval
+        operation.interval = min(operation.interval * self.backoff, self.max_interval)
+        return min(delay, max(operation.deadline - now, 0.0))
+
+    def _fail(self, operation, error):
+        operation.result = {"status": "Error", "error": str(error)}
+        self._finish(operation, "failed")
+
+    def _finish(self, operation, outcome):
+        self._metrics[outcome] += 1
+        if outcome == "succeeded":
+            self._durations.append(time.monotonic() - operation.started)
+
+    def get_metrics(self) -> dict:
+        """Operation counts, total polls and time-to-complete of succeeded operations."""
+        metrics = dict(self._metrics)
+        completed = metrics["succeeded"] + metrics["failed"] + metrics["timed_out"]
+        metrics["polls_per_operation"] = metrics["polls"] / completed if completed else None
+        if self._durations:
+            ordered = sorted(self._durations)
+            metrics["time_to_complete_p50"] = ordered[len(ordered) // 2]
+            metrics["time_to_complete_p95"] = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+            metrics["time_to_complete_max"] = ordered[-1]
+        return metrics
+
+
+class OperationPoller(_PollingPolicy):
+    """
+    Synchronous face: polls operation URLs over one keep-alive requests.Session.
+    wait_many multiplexes many operations in a single loop ordered by next poll time.
+    """
+
+    def __init__(self, headers=None, pool_maxsize=10, **kwargs):
+        super().__init__(headers, **kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(self.headers)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _poll(self, operation):
+        try:
+            response = self.session.get(operation.url, timeout=self._request_timeout(operation))
+            result_json = response.json() if response.status_code < 400 else {}
+            if 400 <= response.status_code < 500 and response.status_code != 429:
+                response.raise_for_status()
+        except requests.Timeout:
+            return self._poll_timed_out(operation)
+        except (requests.RequestException, ValueError) as e:
+            self._fail(operation, e)
+            return None
+        return self._next_delay(operation, response.status_code, response.headers, result_json)
+
+    def wait_many(self, urls, timeout=None) -> dict:
+        """
+        Poll every operation URL until it finishes or its deadline passes.
+        :return: {url: final status JSON}; timeouts and errors have status "TimedOut" / "Error"
+        """
+        pending = []
+        operations = {}
+        for url in urls:
+            operation = operations[url] = self._start(url, timeout)
+            heapq.heappush(pending, (operation.started + operation.interval, id(operation), operation))
+        while pending:
+            due_at, _, operation = heapq.heappop(pending)
+            time.sleep(max(due_at - time.monotonic(), 0.0))
+            delay = self._poll(operation)
+            if delay is not None:
+                heapq.heappush(pending, (time.monotonic() + delay, id(operation), operation))
+        return {url: operation.result for url, operation in operations.items()}
+
+    def wait(self, url, timeout=None) -> dict:
+        """Poll one operation until it finishes; raises OperationTimeoutError past the deadline."""
+        result = self.wait_many([url], timeout)[url]
+        if result.get("status") == "TimedOut":
+            raise OperationTimeoutError(result["error"])
+        return result
+
+
+class AsyncOperationPoller(_PollingPolicy):
+    """
+    Asynchronous face: a single scheduler task polls every registered operation over a
+    shared aiohttp session; wait() registers an operation and awaits its final status.
+    """
+
+    def __init__(self, session, headers=None, **kwargs):
+        """
+        :param session: aiohttp.ClientSession (keep-alive connection pool)
+        """
+        super().__init__(headers, **kwargs)
+        self.session = session
+        self._pending = []
+        self._futures = {}
+        self._wakeup = asyncio.Event()
+        self._scheduler = None
+
+    async def _poll(self, operation):
+        try:
+            timeout = aiohttp.ClientTimeout(total=self._request_timeout(operation))
+            async with self.session.get(operation.url, headers=self.headers, timeout=timeout) as response:
+                if 400 <= response.status < 500 and response.status != 429:
+                    response.raise_for_status()
+                result_json = await response.json() if response.status < 400 else {}
+                return self._next_delay(operation, response.status, response.headers, result_json)
+        except asyncio.TimeoutError:
+            return self._poll_timed_out(operation)
+        except Exception as e:
+            self._fail(operation, e)
+            return None
+
+    async def _poll_and_reschedule(self, operation):
+        delay = await self._poll(operation)
+        if delay is not None:
+            heapq.heappush(self._pending, (time.monotonic() + delay, id(operation), operation))
+            return
+        future = self._futures.pop(id(operation))
+        if not future.done():
+            future.set_result(operation.result)
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            due = []
+            while self._pending and self._pending[0][0] <= now:
+                due.append(heapq.heappop(self._pending)[2])
+            if due:
+                await asyncio.gather(*(self._poll_and_reschedule(operation) for operation in due))
+                continue
+            timeout = self._pending[0][0] - now if self._pending else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def wait(self, url, timeout=None) -> dict:
+        """
+        Poll one operation until it finishes (status JSON, "TimedOut" or "Error" status).
+        """
+        if self._scheduler is None or self._scheduler.done():
+            self._scheduler = asyncio.create_task(self._run())
+        operation = self._start(url, timeout)
+        future = asyncio.get_running_loop().create_future()
+        self._futures[id(operation)] = future
+        heapq.heappush(self._pending, (operation.started + operation.interval, id(operation), operation))
+        self._wakeup.set()
+        return await future
+
+    async def wait_many(self, urls, timeout=None) -> dict:
+        results = await asyncio.gather(*(self.wait(url, timeout) for url in urls))
+        return dict(zip(urls, results))
+
+    async def close(self):
+        if self._scheduler is not None:
+            self._scheduler.cancel()
+            try:
+                await self._scheduler
+            except asyncio.CancelledError:
+                pass
+            self._scheduler = None
@@ -0,0 +1,101 @@
+import json
+
+
+def _value(key):
+    return lambda field: field.get(key)
+
+
+# Typed field extraction: one entry per Content Understanding field type
+FIELD_EXTRACTORS = {
+    "string": _value("valueString"),
+    "number": _value("valueNumber"),
+    "integer": _value("valueInteger"),
+    "boolean": _value("valueBoolean"),
+    "date": _value("valueDate"),
+    "time": _value("valueTime"),
+    "array": lambda field: [extract_field(item) for item in field.get("valueArray") or []],
+    "object": lambda field: {name: extract_field(item) for name, item in (field.get("valueObject") or {}).items()},
+}
+
+
+def extract_field(field):
+    """Python value of one field, based on its type."""
+    extractor = FIELD_EXTRACTORS.get(field.get("type"))
+    if extractor is None:
+        # Unknown types keep whatever value* property they carry
+        return next((value for name, value in field.items() if name.startswith("value")), None)
+    return extractor(field)
+
+
+def extract_fields(contents):
+    """
+    Field values and confidences of every content item, merged into two flat dicts
+    (a field found in several contents keeps its first value).
+    """
+    values, confidences = {}, {}
+    for content in contents:
+        for field_name, field_data in (content.get("fields") or {}).items():
+            if field_name in values:
+                continue
+            values[field_name] = extract_field(field_data)
+            if field_data.get("confidence") is not None:
+                confidences[field_name] = field_data["confidence"]
+    return values, confidences
+
+
+def to_record(source, result_json, **extra):
+    """Compact record for one analyzed document: status, field values and confidences."""
+    result = result_json.get("result") or {}
+    fields, confidences = extract_fields(result.get("contents") or [])
+    record = {
+        "file": source,
+        "status": result_json.get("status"),
+        "analyzer_id": result.get("analyzerId"),
+        "fields": fields,
+        "confidence": confidences,
+    }
+    if "error" in result_json:
+        record["error"] = result_json["error"]
+    record.update(extra)
+    return record
+
+
+def iter_contents(file):
+    """
+    Content items of a saved analysis result, read from an open binary file. With ijson
+    installed the file is parsed incrementally, one content item at a time, so large
+    multi-page results are never fully loaded.
+    """
+    try:
+        import ijson
+    except ImportError:
+        yield from (json.load(file).get("result") or {}).get("contents") or []
+        return
+    yield from ijson.items(file, "result.contents.item", use_float=True)
+
+
+def record_from_file(path):
+    """Compact record from a saved (possibly pretty-printed) analysis result file."""
+    with open(path, "rb") as file:
+        fields, confidences = extract_fields(iter_contents(file))
+    return {"file": path, "fields": fields, "confidence": confidences}
+
+
+class JsonlSink:
+    """Appends one compact JSON object per line and flushes it, so partial runs keep their results."""
+
+    def __init__(self, output_file):
+        self.file = open(output_file, "a", encoding="utf-8")
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
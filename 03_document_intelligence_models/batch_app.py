@@ -0,0 +1,261 @@
+from dotenv import load_dotenv
+import os
+import sys
+import time
+import asyncio
+import pyarrow as pa
+import pyarrow.parquet as pq
+from azure.core.credentials import AzureKeyCredential
+from azure.ai.formrecognizer import AnalyzeResult
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+
+from commons.analysis_cache import AnalysisCache, content_sha256
+from commons.azure_storage import AsyncAzureDataLakeGen2
+
+SUPPORTED_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".heif", ".docx")
+
+INVOICE_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("status", pa.string()),
+    ("error", pa.string()),
+    ("document_index", pa.int32()),
+    ("vendor_name", pa.string()),
+    ("vendor_name_confidence", pa.float32()),
+    ("customer_name", pa.string()),
+    ("customer_name_confidence", pa.float32()),
+    ("invoice_total", pa.float64()),
+    ("invoice_total_currency", pa.string()),
+    ("invoice_total_confidence", pa.float32()),
+    ("elapsed_seconds", pa.float32()),
+])
+
+
+def main():
+
+    try:
+        # Get the invoices to analyze: a URL, a file with one URL/path per line,
+        # a local directory or a DataLake directory (datalake://<container>/<directory>)
+        source = "https://github.com/MicrosoftLearning/mslearn-ai-information-extraction/blob/main/Labfiles/prebuilt-doc-intelligence/sample-invoice/sample-invoice.pdf?raw=true"
+        output_file = "invoices.parquet"
+        if len(sys.argv) > 1:
+            source = sys.argv[1]
+        if len(sys.argv) > 2:
+            output_file = sys.argv[2]
+
+        # Get config settings
+        load_dotenv()
+        endpoint = os.getenv('ENDPOINT')
+        key = os.getenv('KEY')
+        datalake_connection_string = os.getenv('DATALAKE_CONNECTION_STRING')
+
+        print(f"\nConnecting to Forms Recognizer at: {endpoint}")
+        cache = AnalysisCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_cache.sqlite"))
+        runner = BatchInvoiceAnalyzer(endpoint, key, cache=cache)
+        try:
+            report = asyncio.run(runner.run(source, output_file, datalake_connection_string))
+        finally:
+            cache.close()
+        print(report)
+
+    except Exception as ex:
+        print(ex)
+
+    print("\nAnalysis complete.\n")
+
+
+def _field(document, name):
+    field = document.fields.get(name)
+    if field is None:
+        return None, None
+    return field.value, field.confidence
+
+
+def invoice_rows(source, result, elapsed_seconds):
+    """One output row per invoice document found in an analysis result."""
+    rows = []
+    for index, document in enumerate(result.documents):
+        vendor_name, vendor_confidence = _field(document, "VendorName")
+        customer_name, customer_confidence = _field(document, "CustomerName")
+        invoice_total, total_confidence = _field(document, "InvoiceTotal")
+        rows.append({
+            "source": source,
+            "status": "Succeeded",
+            "error": None,
+            "document_index": index,
+            "vendor_name": vendor_name,
+            "vendor_name_confidence": vendor_confidence,
+            "customer_name": customer_name,
+            "customer_name_confidence": customer_confidence,
+            "invoice_total": invoice_total.amount if invoice_total is not None else None,
+            "invoice_total_currency": (invoice_total.code or invoice_total.symbol) if invoice_total is not None else None,
+            "invoice_total_confidence": total_confidence,
+            "elapsed_seconds": elapsed_seconds,
+        })
+    return rows
+
+
+class _ParquetSink:
+    """Buffers rows and writes them as Parquet row groups of row_group_size rows."""
+
+    def __init__(self, output_file, row_group_size):
+        self.writer = pq.ParquetWriter(output_file, INVOICE_SCHEMA, compression="snappy")
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.count = 0
+
+    def write(self, rows):
+        self.rows.extend(rows)
+        self.count += len(rows)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(pa.Table.from_pylist(self.rows, schema=INVOICE_SCHEMA))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+class BatchInvoiceAnalyzer:
+    """
+    Analyzes many invoices concurrently with one asynchronous DocumentAnalysisClient
+    (a single transport and connection pool). At most max_in_flight operations are
+    between submission and result at any time; each worker polls its own operation
+    without blocking the others. Invoice fields and confidences are written to Parquet.
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        key,
+        model_id="prebuilt-invoice",
+        locale="en-US",
+        max_in_flight=16,
+        polling_interval=2,
+        row_group_size=1000,
+        api_version="2023-07-31",
+        cache=None,
+    ):
+        """
+        :param cache: AnalysisCache consulted before submitting local or DataLake documents
+                      (URL sources are always submitted, their content is not downloaded)
+        """
+        self.endpoint = endpoint
+        self.key = key
+        self.model_id = model_id
+        self.locale = locale
+        self.max_in_flight = max_in_flight
+        self.polling_interval = polling_interval
+        self.row_group_size = row_group_size
+        self.api_version = api_version
+        self.cache = cache
+
+    @staticmethod
+    async def list_sources(source, datalake=None):
+        """
+        Resolve a source into (kind, location) pairs with kind "url", "file" or "datalake".
+        """
+        if source.startswith("datalake://"):
+            container_name, _, directory_name = source[len("datalake://"):].partition("/")
+            paths = await datalake.list_file_paths(container_name, directory_name)
+            return [("datalake", f"{container_name}/{path}") for path in paths if path.lower().endswith(SUPPORTED_EXTENSIONS)]
+        if source.startswith(("http://", "https://")):
+            return [("url", source)]
+        if os.path.isdir(source):
+            files = []
+            for root, _, names in os.walk(source):
+                files.extend(os.path.join(root, name) for name in names if name.lower().endswith(SUPPORTED_EXTENSIONS))
+            return [("file", path) for path in sorted(files)]
+        with open(source, "r") as manifest:
+            lines = [line.strip() for line in manifest if line.strip() and not line.startswith("#")]
+        return [("url" if line.startswith(("http://", "https://")) else "file", line) for line in lines]
+
+    async def _analyze(self, client, datalake, kind, location):
+        if kind == "url":
+            poller = await client.begin_analyze_document_from_url(
+                self.model_id, location, locale=self.locale, polling_interval=self.polling_interval
+            )
+            return await poller.result()
+
+        if kind == "datalake":
+            container_name, _, file_path = location.partition("/")
+            document = await datalake.read_file(container_name, file_path)
+        else:
+            with open(location, "rb") as file:
+                document = file.read()
+
+        # Identical content analyzed before with the same model, api version and locale
+        content_hash = content_sha256(document)
+        if self.cache is not None:
+            cached = self.cache.get(content_hash, self.model_id, self.api_version, self.locale)
+            if cached is not None:
+                return AnalyzeResult.from_dict(cached)
+
+        poller = await client.begin_analyze_document(
+            self.model_id, document, locale=self.locale, polling_interval=self.polling_interval
+        )
+        result = await poller.result()
+        if self.cache is not None:
+            self.cache.put(content_hash, self.model_id, self.api_version, self.locale, result.to_dict())
+        return result
+
+    async def run(self, source, output_file="invoices.parquet", datalake_connection_string=None):
+        """
+        Analyze every invoice of the source and write one Parquet row per invoice document.
+        :return: Report with totals, elapsed time and documents per second
+        """
+        start = time.perf_counter()
+        datalake = AsyncAzureDataLakeGen2(datalake_connection_string) if source.startswith("datalake://") else None
+        client = DocumentAnalysisClient(
+            endpoint=self.endpoint, credential=AzureKeyCredential(self.key), api_version=self.api_version
+        )
+        sink = _ParquetSink(output_file, self.row_group_size)
+        counts = {"succeeded": 0, "failed": 0}
+
+        try:
+            sources = await self.list_sources(source, datalake)
+            print(f"Analyzing {len(sources)} invoices ({self.max_in_flight} in flight)")
+            queue = asyncio.Queue()
+            for item in sources:
+                queue.put_nowait(item)
+
+            async def worker():
+                while not queue.empty():
+                    kind, location = queue.get_nowait()
+                    started = time.perf_counter()
+                    try:
+                        result = await self._analyze(client, datalake, kind, location)
+                        rows = invoice_rows(location, result, time.perf_counter() - started)
+                        counts["succeeded"] += 1
+                    except Exception as e:
+                        rows = [{"source": location, "status": "Failed", "error": str(e), "elapsed_seconds": time.perf_counter() - started}]
+                        counts["failed"] += 1
+                    sink.write(rows)
+
+            async with client:
+                await asyncio.gather(*(worker() for _ in range(min(self.max_in_flight, len(sources)))))
+        finally:
+            sink.close()
+            if datalake is not None:
+                await datalake.close()
+
+        elapsed = time.perf_counter() - start
+        return {
+            "total": len(sources),
+            "succeeded": counts["succeeded"],
+            "failed": counts["failed"],
+            "rows": sink.count,
+            "elapsed_seconds": elapsed,
+            "documents_per_second": len(sources) / elapsed if elapsed > 0 else None,
+            "output_file": output_file,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+        }
+
+
+if __name__ == "__main__":
+    main()
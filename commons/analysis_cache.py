@@ -0,0 +1,113 @@
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+
+def content_sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent cache of document analysis results (Content Understanding or Document
+    Intelligence), keyed on (content SHA-256, analyzer/model id, api version, locale).
+
+    Results are stored as zlib-compressed compact JSON in a local SQLite database. When
+    the stored size exceeds max_bytes, the least recently used entries are evicted.
+    Safe to share between threads; several processes can use the same file (WAL mode).
+    """
+
+    def __init__(self, path: str = "analysis_cache.sqlite", max_bytes: int = 512 * 1024 * 1024):
+        """
+        :param path: SQLite database file
+        :param max_bytes: Upper bound for the compressed results kept in the cache
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " sha256 TEXT NOT NULL, model TEXT NOT NULL, api_version TEXT NOT NULL, locale TEXT NOT NULL,"
+            " result BLOB NOT NULL, size INTEGER NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL,"
+            " PRIMARY KEY (sha256, model, api_version, locale))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, sha256: str, model: str, api_version: str, locale: str = None):
+        """Cached result JSON (dict) or None."""
+        key = (sha256, model, api_version, locale or "")
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result FROM results WHERE sha256=? AND model=? AND api_version=? AND locale=?", key
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            self._connection.execute(
+                "UPDATE results SET last_access=? WHERE sha256=? AND model=? AND api_version=? AND locale=?",
+                (time.time(), *key),
+            )
+            self.stats["hits"] += 1
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, sha256: str, model: str, api_version: str, locale: str, result: dict):
+        blob = zlib.compress(json.dumps(result, separators=(",", ":"), ensure_ascii=False, default=str).encode())
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (sha256, model, api_version, locale or "", blob, len(blob), now, now),
+            )
+            self.stats["puts"] += 1
+            self._evict()
+
+    def _evict(self):
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for rowid, size in self._connection.execute("SELECT rowid, size FROM results ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM results WHERE rowid=?", (rowid,))
+            total -= size
+            evicted += 1
+        self.stats["evictions"] += evicted
+
+    def get_stats(self) -> dict:
+        """Hit ratio, service calls saved, entries and stored bytes."""
+        with self._lock:
+            entries, size = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats.update(
+            hit_ratio=stats["hits"] / lookups if lookups else 0.0,
+            service_calls_saved=stats["hits"],
+            entries=entries,
+            size_bytes=size,
+        )
+        return stats
@@ -6,27 +6,309 @@ from azure.identity import (
     AzureCliCredential,
     InteractiveBrowserCredential
 )
+from azure.identity import aio as identity_aio
+from azure.core.credentials import AccessToken
 import os
+import json
+import time
+import asyncio
+import hashlib
 import logging
+import threading
+
+
+class TokenCache:
+    """
+    Thread-safe per-scope access token cache with proactive background refresh.
+    Tokens are refreshed `refresh_margin` seconds before expiry on a daemon timer,
+    so callers on the hot path only ever read the cache. Scopes not read since the
+    previous refresh are left to expire instead of being refreshed forever; a read
+    inside the refresh margin then refreshes synchronously, so a token close to
+    expiry is never handed out for a request that may outlive it.
+    """
+
+    def __init__(self, fetch, refresh_margin: int = 300, retry_interval: int = 10,
+                 cache_path: str = None, cache_key: bytes = None, namespace: str = "",
+                 min_validity: int = 60):
+        """
+        :param fetch: Callable scope -> AccessToken used to acquire tokens
+        :param refresh_margin: Seconds before expiry at which a token is refreshed
+        :param retry_interval: Seconds between background retries after a failed refresh
+        :param cache_path: Optional file for an encrypted on-disk cache shared between processes
+        :param cache_key: Fernet key for the on-disk cache (defaults to AZURE_AUTH_TOKEN_CACHE_KEY)
+        :param namespace: Prefix isolating entries of different identities in the on-disk cache
+        :param min_validity: Seconds of validity a cached token must still have to be served
+                             when a synchronous refresh inside the margin fails
+        """
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.retry_interval = retry_interval
+        self.cache_path = cache_path
+        self.cache_key = cache_key or os.getenv("AZURE_AUTH_TOKEN_CACHE_KEY")
+        self.namespace = namespace
+        self.min_validity = min(min_validity, refresh_margin)
+        self.logger = logging.getLogger("AzureAuthHelper")
+        self._tokens = {}
+        self._used = set()
+        self._timers = {}
+        self._lock = threading.Lock()
+        self._scope_locks = {}
+        self._closed = False
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0, "refreshes": 0, "refresh_failures": 0}
+        self._cipher = None
+        if self.cache_path:
+            if not self.cache_key:
+                raise ValueError("An encryption key is required for the on-disk token cache")
+            self._cipher = self._create_cipher(self.cache_key)
+
+    def _is_fresh(self, token, margin):
+        return token is not None and token.expires_on - time.time() > margin
+
+    def _scope_lock(self, scope):
+        with self._lock:
+            return self._scope_locks.setdefault(scope, threading.Lock())
+
+    def get(self, scope: str) -> AccessToken:
+        """Return a token valid for at least refresh_margin seconds, acquiring it when needed."""
+        with self._lock:
+            token = self._tokens.get(scope)
+            if self._is_fresh(token, self.refresh_margin):
+                self.stats["hits"] += 1
+                self._used.add(scope)
+                return token
+        # Only one thread per scope goes to the credential; the rest wait for its result
+        with self._scope_lock(scope):
+            with self._lock:
+                token = self._tokens.get(scope)
+                if self._is_fresh(token, self.refresh_margin):
+                    self.stats["hits"] += 1
+                    self._used.add(scope)
+                    return token
+                self.stats["misses"] += 1
+            cached = token
+            try:
+                token = self._read_disk(scope)
+                if token is not None:
+                    with self._lock:
+                        self.stats["disk_hits"] += 1
+                else:
+                    token = self.fetch(scope)
+                    self._write_disk(scope, token)
+            except Exception as e:
+                # Refresh inside the margin failed: the current token is still usable for a while
+                if not self._is_fresh(cached, self.min_validity):
+                    raise
+                self.logger.warning(f"Token refresh failed for scope {scope}, serving cached token: {e}")
+                with self._lock:
+                    self.stats["refresh_failures"] += 1
+                    self._used.add(scope)
+                return cached
+            self._store(scope, token)
+            return token
+
+    def put(self, scope: str, token: AccessToken):
+        """Store a token acquired elsewhere (e.g. by an async credential)."""
+        self._store(scope, token)
+        self._write_disk(scope, token)
+
+    def peek(self, scope: str):
+        """Return the cached token if valid for at least refresh_margin seconds, without acquiring one."""
+        with self._lock:
+            token = self._tokens.get(scope)
+            if self._is_fresh(token, self.refresh_margin):
+                self.stats["hits"] += 1
+                self._used.add(scope)
+                return token
+            self.stats["misses"] += 1
+            return None
+
+    def _store(self, scope, token):
+        with self._lock:
+            self._tokens[scope] = token
+            self._used.discard(scope)
+            if not self._closed:
+                delay = max(token.expires_on - time.time() - self.refresh_margin, 0)
+                self._schedule(scope, delay)
+
+    def _schedule(self, scope, delay):
+        # Must be called with self._lock held
+        previous = self._timers.pop(scope, None)
+        if previous is not None:
+            previous.cancel()
+        timer = threading.Timer(delay, self._refresh, args=(scope,))
+        timer.daemon = True
+        self._timers[scope] = timer
+        timer.start()
+
+    def _refresh(self, scope):
+        with self._lock:
+            if self._closed or scope not in self._used:
+                # Idle scope: let it expire, the next read will be a regular miss
+                self._timers.pop(scope, None)
+                return
+        try:
+            with self._scope_lock(scope):
+                token = self.fetch(scope)
+            self._write_disk(scope, token)
+            with self._lock:
+                self.stats["refreshes"] += 1
+            self._store(scope, token)
+            self.logger.debug(f"Refreshed token for scope: {scope}")
+        except Exception as e:
+            with self._lock:
+                self.stats["refresh_failures"] += 1
+                current = self._tokens.get(scope)
+                if not self._closed and self._is_fresh(current, self.retry_interval):
+                    self._schedule(scope, self.retry_interval)
+                else:
+                    self._timers.pop(scope, None)
+            self.logger.warning(f"Background token refresh failed for scope {scope}: {e}")
+
+    @staticmethod
+    def _create_cipher(cache_key):
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError as e:
+            raise ImportError(
+                "The on-disk token cache needs the 'cryptography' package (pip install cryptography)"
+            ) from e
+        return Fernet(cache_key)
+
+    def _fernet(self):
+        return self._cipher
+
+    def _read_entries(self):
+        try:
+            with open(self.cache_path, "rb") as file:
+                return json.loads(self._fernet().decrypt(file.read()))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable token cache {self.cache_path}: {e}")
+            return {}
+
+    def _read_disk(self, scope):
+        if not self.cache_path:
+            return None
+        entry = self._read_entries().get(f"{self.namespace}|{scope}")
+        if entry is None:
+            return None
+        token = AccessToken(entry["token"], entry["expires_on"])
+        return token if self._is_fresh(token, self.refresh_margin) else None
+
+    def _write_disk(self, scope, token):
+        if not self.cache_path:
+            return
+        try:
+            now = time.time()
+            entries = {
+                key: entry for key, entry in self._read_entries().items()
+                if entry["expires_on"] > now
+            }
+            entries[f"{self.namespace}|{scope}"] = {"token": token.token, "expires_on": token.expires_on}
+            payload = self._fernet().encrypt(json.dumps(entries).encode("utf-8"))
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as file:
+                file.write(payload)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            self.logger.warning(f"Could not write token cache {self.cache_path}: {e}")
+
+    def close(self):
+        """Cancel all pending background refreshes."""
+        with self._lock:
+            self._closed = True
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+
+class CredentialRegistry:
+    """
+    Process-wide registry of credential objects, so repeated AzureAuthHelper instances
+    share credentials (and their HTTP transports and MSAL caches) instead of rebuilding them.
+    For the default chain it also keeps the credential that actually succeeded, pinned,
+    together with the timings of the probe that resolved it.
+    """
+
+    _credentials = {}
+    _pinned = {}
+    _probe_timings = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_or_create(cls, key, factory):
+        with cls._lock:
+            credential = cls._pinned.get(key) or cls._credentials.get(key)
+            if credential is None:
+                credential = factory()
+                cls._credentials[key] = credential
+            return credential
+
+    @classmethod
+    def pin(cls, key, credential, timings):
+        with cls._lock:
+            cls._pinned[key] = credential
+            cls._probe_timings[key] = timings
+
+    @classmethod
+    def get_pinned(cls, key):
+        with cls._lock:
+            return cls._pinned.get(key)
+
+    @classmethod
+    def get_probe_timings(cls, key=None):
+        with cls._lock:
+            if key is not None:
+                return list(cls._probe_timings.get(key, []))
+            return {k: list(v) for k, v in cls._probe_timings.items()}
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._credentials.clear()
+            cls._pinned.clear()
+            cls._probe_timings.clear()
+
 
 class AzureAuthHelper:
     """
     A unified helper for Azure authentication using different methods.
     """
 
-    def __init__(self, method: str = "default", **kwargs):
+    def __init__(self, method: str = "default", token_refresh_margin: int = 300,
+                 token_cache_path: str = None, token_cache_key: bytes = None,
+                 allow_interactive: bool = False, **kwargs):
         """
         Initialize the authentication helper.
         :param method: Authentication method name
                        (default | managed_identity | service_principal |
                         environment | cli | interactive)
-        :param kwargs: Optional parameters like tenant_id, client_id, client_secret
+        :param allow_interactive: Let the default chain fall back to the interactive browser
+                                  (disabled by default so headless workers cannot hang)
+        :param token_refresh_margin: Seconds before expiry at which cached tokens are refreshed
+        :param token_cache_path: Optional encrypted on-disk token cache shared between processes
+        :param token_cache_key: Fernet key for the on-disk cache (defaults to AZURE_AUTH_TOKEN_CACHE_KEY)
+        :param kwargs: Optional parameters like tenant_id, client_id, client_secret.
+                       For the default method, DefaultAzureCredential options such as
+                       exclude_*_credential or process_timeout are forwarded.
         """
         self.method = method.lower()
+        self.allow_interactive = allow_interactive
         self.kwargs = kwargs
         self.credential = None
+        self.async_credential = None
+        self._async_fetches = {}
         self._setup_logger()
         self._init_credential()
+        self.token_cache = TokenCache(
+            fetch=self._fetch_token,
+            refresh_margin=token_refresh_margin,
+            cache_path=token_cache_path,
+            cache_key=token_cache_key,
+            namespace=f"{self.method}:{kwargs.get('tenant_id', '')}:{kwargs.get('client_id', '')}",
+        )
 
     def _setup_logger(self):
         self.logger = logging.getLogger("AzureAuthHelper")
@@ -39,60 +321,248 @@ class AzureAuthHelper:
             self.logger.addHandler(handler)
             self.logger.setLevel(logging.INFO)
 
+    def _registry_key(self):
+        secret = self.kwargs.get("client_secret")
+        return (
+            self.method,
+            self.allow_interactive,
+            self.kwargs.get("tenant_id"),
+            self.kwargs.get("client_id"),
+            hashlib.sha256(secret.encode("utf-8")).hexdigest() if secret else None,
+            tuple(sorted((k, v) for k, v in self.kwargs.items() if k.startswith("exclude_") or k == "process_timeout")),
+        )
+
+    def _default_chain_options(self):
+        options = {
+            k: v for k, v in self.kwargs.items()
+            if k.startswith("exclude_") or k == "process_timeout"
+        }
+        options.setdefault("exclude_interactive_browser_credential", not self.allow_interactive)
+        return options
+
+    def _create_credential(self):
+        if self.method == "default":
+            self.logger.info("Using DefaultAzureCredential")
+            return DefaultAzureCredential(**self._default_chain_options())
+
+        elif self.method == "managed_identity":
+            client_id = self.kwargs.get("client_id")
+            self.logger.info("Using ManagedIdentityCredential")
+            return ManagedIdentityCredential(client_id=client_id)
+
+        elif self.method == "service_principal":
+            self.logger.info("Using ClientSecretCredential (Service Principal)")
+            return ClientSecretCredential(
+                tenant_id=self.kwargs["tenant_id"],
+                client_id=self.kwargs["client_id"],
+                client_secret=self.kwargs["client_secret"]
+            )
+
+        elif self.method == "environment":
+            self.logger.info("Using EnvironmentCredential")
+            return EnvironmentCredential()
+
+        elif self.method == "cli":
+            self.logger.info("Using AzureCliCredential")
+            return AzureCliCredential()
+
+        elif self.method == "interactive":
+            self.logger.info("Using InteractiveBrowserCredential")
+            return InteractiveBrowserCredential()
+
+        raise ValueError(f"Unknown authentication method: {self.method}")
+
     def _init_credential(self):
-        """Initialize the appropriate Azure credential."""
+        """Initialize the appropriate Azure credential, reusing the process-wide one if it exists."""
         try:
-            if self.method == "default":
-                self.credential = DefaultAzureCredential(
-                    exclude_interactive_browser_credential=False
-                )
-                self.logger.info("Using DefaultAzureCredential")
-
-            elif self.method == "managed_identity":
-                client_id = self.kwargs.get("client_id")
-                self.credential = ManagedIdentityCredential(client_id=client_id)
-                self.logger.info("Using ManagedIdentityCredential")
-
-            elif self.method == "service_principal":
-                self.credential = ClientSecretCredential(
-                    tenant_id=self.kwargs["tenant_id"],
-                    client_id=self.kwargs["client_id"],
-                    client_secret=self.kwargs["client_secret"]
-                )
-                self.logger.info("Using ClientSecretCredential (Service Principal)")
-
-            elif self.method == "environment":
-                self.credential = EnvironmentCredential()
-                self.logger.info("Using EnvironmentCredential")
-
-            elif self.method == "cli":
-                self.credential = AzureCliCredential()
-                self.logger.info("Using AzureCliCredential")
-
-            elif self.method == "interactive":
-                self.credential = InteractiveBrowserCredential()
-                self.logger.info("Using InteractiveBrowserCredential")
-
+            key = self._registry_key()
+            pinned = CredentialRegistry.get_pinned(key)
+            if pinned is not None:
+                self.credential = pinned
+                self.logger.info(f"Using pinned {type(pinned).__name__}")
             else:
-                raise ValueError(f"Unknown authentication method: {self.method}")
+                self.credential = CredentialRegistry.get_or_create(key, self._create_credential)
 
         except Exception as e:
             self.logger.error(f"Failed to initialize credential: {e}")
             raise
 
+    def _probe_default_chain(self, scope: str):
+        timings = []
+        errors = []
+        for candidate in getattr(self.credential, "credentials", ()):
+            start = time.perf_counter()
+            try:
+                token = candidate.get_token(scope)
+            except Exception as e:
+                timings.append({
+                    "credential": type(candidate).__name__,
+                    "seconds": time.perf_counter() - start,
+                    "succeeded": False,
+                    "error": str(e).splitlines()[0] if str(e) else type(e).__name__,
+                })
+                errors.append(f"{type(candidate).__name__}: {e}")
+                continue
+            timings.append({
+                "credential": type(candidate).__name__,
+                "seconds": time.perf_counter() - start,
+                "succeeded": True,
+                "error": None,
+            })
+            CredentialRegistry.pin(self._registry_key(), candidate, timings)
+            self.credential = candidate
+            self.logger.info(
+                f"Pinned {type(candidate).__name__} after probing {len(timings)} credential(s) "
+                f"in {sum(t['seconds'] for t in timings):.2f}s"
+            )
+            return token
+        raise RuntimeError("No credential in the default chain could acquire a token: " + "; ".join(errors))
+
+    def resolve_credential(self, scope: str = "https://management.azure.com/.default"):
+        """
+        Probe the default credential chain once, timing each candidate, and pin the first
+        one that returns a token so later instances in the process skip the probing.
+        Other methods have nothing to probe and return their credential unchanged.
+        :param scope: Scope used for the probe token request
+        :return: The resolved credential instance
+        """
+        pinned = CredentialRegistry.get_pinned(self._registry_key())
+        if pinned is not None:
+            self.credential = pinned
+        elif self.method == "default":
+            self.token_cache.put(scope, self._probe_default_chain(scope))
+        return self.credential
+
+    def get_probe_timings(self):
+        """
+        Get the timings of the probe that resolved the pinned default credential.
+        :return: List of {credential, seconds, succeeded, error} entries, in probe order
+        """
+        return CredentialRegistry.get_probe_timings(self._registry_key())
+
+    def _fetch_token(self, scope: str):
+        if self.method == "default" and CredentialRegistry.get_pinned(self._registry_key()) is None:
+            token = self._probe_default_chain(scope)
+        else:
+            token = self.credential.get_token(scope)
+        self.logger.info(f"Successfully acquired token for scope: {scope}")
+        return token
+
     def get_token(self, scope: str = "https://management.azure.com/.default"):
         """
         Retrieve an access token for a specific Azure scope.
+        Tokens are served from an in-process cache and refreshed in the background before expiry.
         :param scope: The resource scope (default is Azure Management API)
         :return: Access token string
         """
-        token = self.credential.get_token(scope)
-        self.logger.info(f"Successfully acquired token for scope: {scope}")
-        return token.token
+        return self.token_cache.get(scope).token
+
+    def get_token_stats(self):
+        """
+        Get the token cache counters (hits, misses, disk_hits, refreshes, refresh_failures).
+        :return: Dictionary of counters
+        """
+        return dict(self.token_cache.stats)
 
     def get_credential(self):
         """
         Get the Azure credential object for SDK clients.
+        For the default method this is the pinned credential once the chain has been resolved,
+        either by resolve_credential() or by an SDK client that used the shared chain.
         :return: Azure credential instance
         """
+        if self.method == "default":
+            key = self._registry_key()
+            pinned = CredentialRegistry.get_pinned(key)
+            if pinned is None:
+                # DefaultAzureCredential remembers the credential that succeeded after its first use
+                pinned = getattr(self.credential, "_successful_credential", None)
+                if pinned is not None:
+                    CredentialRegistry.pin(key, pinned, [])
+            if pinned is not None:
+                self.credential = pinned
         return self.credential
+
+    def _init_async_credential(self):
+        """Initialize the asyncio counterpart of the configured (or pinned) credential."""
+        if self.method == "default":
+            pinned = CredentialRegistry.get_pinned(self._registry_key())
+            async_type = getattr(identity_aio, type(pinned).__name__, None) if pinned is not None else None
+            if async_type is identity_aio.ManagedIdentityCredential:
+                return async_type(client_id=self.kwargs.get("client_id"))
+            if async_type is not None and async_type not in (
+                identity_aio.DefaultAzureCredential, identity_aio.ChainedTokenCredential
+            ):
+                # The sync chain already found the credential that works: skip the probing
+                return async_type()
+            if pinned is not None:
+                self.logger.warning(f"No async counterpart for pinned {type(pinned).__name__}, using the default chain")
+            # azure.identity.aio has no interactive browser credential to exclude
+            options = self._default_chain_options()
+            options.pop("exclude_interactive_browser_credential", None)
+            return identity_aio.DefaultAzureCredential(**options)
+        elif self.method == "managed_identity":
+            return identity_aio.ManagedIdentityCredential(client_id=self.kwargs.get("client_id"))
+        elif self.method == "service_principal":
+            return identity_aio.ClientSecretCredential(
+                tenant_id=self.kwargs["tenant_id"],
+                client_id=self.kwargs["client_id"],
+                client_secret=self.kwargs["client_secret"]
+            )
+        elif self.method == "environment":
+            return identity_aio.EnvironmentCredential()
+        elif self.method == "cli":
+            return identity_aio.AzureCliCredential()
+        # azure.identity.aio has no interactive browser credential
+        raise ValueError(f"No async credential available for method: {self.method}")
+
+    def get_async_credential(self):
+        """
+        Get the asyncio credential object for `.aio` SDK clients.
+        The credential is created once and shared; close it with `close_async()`.
+        :return: Azure async credential instance
+        """
+        if self.async_credential is None:
+            try:
+                self.async_credential = self._init_async_credential()
+                self.logger.info(f"Using async {type(self.async_credential).__name__}")
+            except Exception as e:
+                self.logger.error(f"Failed to initialize async credential: {e}")
+                raise
+        return self.async_credential
+
+    async def _fetch_token_async(self, scope: str):
+        token = await self.get_async_credential().get_token(scope)
+        self.token_cache.put(scope, token)
+        self.logger.info(f"Successfully acquired token for scope: {scope}")
+        return token
+
+    async def get_token_async(self, scope: str = "https://management.azure.com/.default"):
+        """
+        Retrieve an access token for a specific Azure scope without blocking the event loop.
+        Concurrent misses for the same scope share a single credential request.
+        :param scope: The resource scope (default is Azure Management API)
+        :return: Access token string
+        """
+        token = self.token_cache.peek(scope)
+        if token is not None:
+            return token.token
+        loop = asyncio.get_running_loop()
+        key = (id(loop), scope)
+        task = self._async_fetches.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch_token_async(scope))
+            self._async_fetches[key] = task
+            task.add_done_callback(lambda _: self._async_fetches.pop(key, None))
+        # Shielded: a cancelled caller does not cancel the request other callers wait on
+        return (await asyncio.shield(task)).token
+
+    def close(self):
+        """Stop the background token refreshes."""
+        self.token_cache.close()
+
+    async def close_async(self):
+        """Close the async credential and its HTTP transport."""
+        if self.async_credential is not None:
+            await self.async_credential.close()
+            self.async_credential = None
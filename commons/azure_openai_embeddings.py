@@ -0,0 +1,295 @@
+import os
+import queue
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class OpenAIEmbeddingBackend:
+    """
+    Embedding backend over an openai / AzureOpenAI client. One call embeds a list of inputs.
+    """
+
+    def __init__(self, client, model: str):
+        """
+        :param client: openai.OpenAI or openai.AzureOpenAI client
+        :param model: Model or Azure deployment name
+        """
+        self.client = client
+        self.model = model
+
+    def __call__(self, texts: list, dimensions: int = None):
+        kwargs = {"dimensions": dimensions} if dimensions else {}
+        response = self.client.embeddings.create(model=self.model, input=texts, **kwargs)
+        data = sorted(response.data, key=lambda item: item.index)
+        vectors = np.asarray([item.embedding for item in data], dtype=np.float32)
+        tokens = response.usage.prompt_tokens if response.usage is not None else 0
+        return vectors, tokens
+
+
+class FakeEmbeddingBackend:
+    """
+    Deterministic offline backend: each text maps to a normalized random vector seeded
+    by its hash, so identical texts always get identical embeddings.
+    """
+
+    def __init__(self, dims: int = 3072, model: str = "fake-embedding"):
+        self.dims = dims
+        self.model = model
+        self.calls = 0
+
+    def __call__(self, texts: list, dimensions: int = None):
+        self.calls += 1
+        dims = dimensions or self.dims
+        vectors = np.empty((len(texts), dims), dtype=np.float32)
+        for i, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+            vectors[i] = vector / np.linalg.norm(vector)
+        return vectors, sum(len(text.split()) for text in texts)
+
+
+class EmbeddingCache:
+    """
+    LRU cache of float32 embeddings keyed by (model, dims, sha256(text)), optionally
+    backed by a directory of raw float32 files shared between runs and processes.
+    """
+
+    def __init__(self, max_entries: int = 10000, cache_dir: str = None):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, dimensions: int, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{dimensions or ''}\0{text}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.f32")
+
+    def get(self, key):
+        """Return (vector, source) with source "memory" or "disk", or (None, None)."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                return vector, "memory"
+        if self.cache_dir:
+            try:
+                vector = np.fromfile(self._path(key), dtype=np.float32)
+            except FileNotFoundError:
+                return None, None
+            self._remember(key, vector)
+            return vector, "disk"
+        return None, None
+
+    def put(self, key, vector: np.ndarray):
+        vector = np.ascontiguousarray(vector, dtype=np.float32)
+        self._remember(key, vector)
+        if self.cache_dir:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            partial = f"{path}.{threading.get_ident()}.partial"
+            vector.tofile(partial)
+            os.replace(partial, path)
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class EmbeddingClient:
+    """
+    Embedding service shared by query and document vectorization.
+
+    Concurrent embed() calls are collected for up to batch_window seconds and sent as a
+    single multi-input request; embed_many() chunks its inputs directly. Identical texts
+    are embedded once, and results are cached in memory (LRU) and optionally on disk.
+    The backend is any callable (texts, dimensions) -> (float32 matrix, token count),
+    e.g. OpenAIEmbeddingBackend or FakeEmbeddingBackend for offline runs.
+    """
+
+    def __init__(
+        self,
+        backend,
+        model: str = None,
+        dimensions: int = None,
+        max_batch_size: int = 256,
+        batch_window: float = 0.01,
+        max_workers: int = 4,
+        cache_size: int = 10000,
+        cache_dir: str = None,
+    ):
+        """
+        :param model: Cache namespace (defaults to the backend's model)
+        :param dimensions: Requested output dimensions (None = model default)
+        :param max_batch_size: Maximum inputs per backend call
+        :param batch_window: Seconds embed() waits to group concurrent calls
+        :param max_workers: Backend calls in flight at once
+        :param cache_dir: Directory for the on-disk cache (None = memory only)
+        """
+        self.backend = backend
+        self.model = model or getattr(backend, "model", "default")
+        self.dimensions = dimensions
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.cache = EmbeddingCache(cache_size, cache_dir)
+        self.stats = {"requests": 0, "texts": 0, "tokens": 0, "cache_hits": 0, "disk_hits": 0, "deduplicated": 0}
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._queue = queue.Queue()
+        self._dispatcher = None
+        self._dispatcher_lock = threading.Lock()
+        self._closed = False
+        self._in_flight = {}
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats[name] += value
+
+    def _call_backend(self, texts: list) -> np.ndarray:
+        vectors, tokens = self.backend(texts, self.dimensions)
+        self._count(requests=1, tokens=tokens)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _lookup(self, texts: list):
+        """Resolve cached texts; return (vectors by text, unique missing texts)."""
+        found, missing = {}, []
+        for text in dict.fromkeys(texts):
+            vector, source = self.cache.get(EmbeddingCache.key(self.model, self.dimensions, text))
+            if vector is None:
+                missing.append(text)
+                continue
+            found[text] = vector
+            self._count(cache_hits=1, disk_hits=int(source == "disk"))
+        self._count(texts=len(texts), deduplicated=len(texts) - len(set(texts)))
+        return found, missing
+
+    def _embed_missing(self, missing: list, found: dict, parallel: bool = True):
+        chunks = [missing[i:i + self.max_batch_size] for i in range(0, len(missing), self.max_batch_size)]
+        results = self._executor.map(self._call_backend, chunks) if parallel else map(self._call_backend, chunks)
+        for chunk, vectors in zip(chunks, results):
+            for text, vector in zip(chunk, vectors):
+                self.cache.put(EmbeddingCache.key(self.model, self.dimensions, text), vector)
+                found[text] = vector
+
+    def embed_many(self, texts: list) -> np.ndarray:
+        """
+        Embed a list of texts; returns a float32 matrix in input order.
+        """
+        return self._embed(texts, parallel=True)
+
+    def _embed(self, texts: list, parallel: bool) -> np.ndarray:
+        found, missing = self._lookup(texts)
+        if missing:
+            self._embed_missing(missing, found, parallel)
+        return np.stack([found[text] for text in texts]) if texts else np.empty((0, 0), dtype=np.float32)
+
+    # ------------------------------------------------------------------ micro-batching
+
+    def _start_dispatcher(self):
+        # Called with _dispatcher_lock held
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            stop = False
+            while len(pending) < self.max_batch_size:
+                try:
+                    item = self._queue.get(timeout=self.batch_window)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.append(item)
+            self._executor.submit(self._resolve, pending)
+            if stop:
+                return
+
+    def _resolve(self, pending: list):
+        texts = [text for text, _ in pending]
+        try:
+            # Runs on an executor worker, so the batch is sent from this thread
+            vectors = self._embed(texts, parallel=False)
+        except Exception as e:
+            vectors = None
+            for _, future in pending:
+                future.set_exception(e)
+        with self._dispatcher_lock:
+            for text in texts:
+                self._in_flight.pop(text, None)
+        if vectors is not None:
+            for (_, future), vector in zip(pending, vectors):
+                future.set_result(vector)
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue one text for the next micro-batch; the future resolves to its vector.
+        A text already queued or in flight shares the existing future.
+        """
+        # The closed check and the enqueue happen under one lock, so nothing can be queued
+        # behind the stop sentinel put by close()
+        with self._dispatcher_lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingClient is closed")
+            future = self._in_flight.get(text)
+            if future is not None:
+                self._count(texts=1, deduplicated=1)
+                return future
+            self._start_dispatcher()
+            future = self._in_flight[text] = Future()
+            self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed one text (float32 vector). Safe to call from many threads; concurrent calls
+        share backend requests. Pass vector.tolist() to VectorizedQuery.
+        """
+        vector, source = self.cache.get(EmbeddingCache.key(self.model, self.dimensions, text))
+        if vector is not None:
+            self._count(texts=1, cache_hits=1, disk_hits=int(source == "disk"))
+            return vector
+        return self.submit(text).result()
+
+    def close(self):
+        """
+        Stop the dispatcher after the texts already queued are sent. Any future that is
+        still pending afterwards fails instead of blocking its caller forever.
+        """
+        with self._dispatcher_lock:
+            self._closed = True
+            dispatcher = self._dispatcher
+            if dispatcher is not None:
+                self._queue.put(None)
+        if dispatcher is not None:
+            dispatcher.join()
+        self._executor.shutdown(wait=True)
+        with self._dispatcher_lock:
+            pending = list(self._in_flight.values())
+            self._in_flight.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("EmbeddingClient closed before the text was embedded"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,295 @@
+import re
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+# Per-call transport options of azure-core: they never change the results, so they are
+# left out of the cache key. Every other search() argument is part of it.
+_TRANSPORT_OPTIONS = frozenset((
+    "headers", "timeout", "connection_timeout", "read_timeout", "logging_enable",
+    "raw_request_hook", "raw_response_hook", "retry_total", "retry_connect", "retry_read",
+    "retry_status", "retry_backoff_factor", "retry_backoff_max", "retry_mode", "user_agent",
+    "request_id", "client_request_id", "tracing_attributes", "network_span_namer", "cls",
+))
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different questions share a key."""
+    return re.sub(r"\s+", " ", text or "").strip().lower()
+
+
+def _describe_vector_query(query) -> dict:
+    """Serializable description of a VectorizedQuery / VectorizableTextQuery."""
+    description = query.as_dict() if hasattr(query, "as_dict") else dict(vars(query))
+    description.setdefault("kind", type(query).__name__)
+    if description.get("text") is not None:
+        description["text"] = normalize_query(description["text"])
+    if description.get("vector") is not None:
+        description["vector"] = hashlib.sha256(np.asarray(description["vector"], dtype=np.float32).tobytes()).hexdigest()
+    return description
+
+
+def _describe_parameter(value):
+    """JSON-friendly form of a search() argument (SDK models as dicts, lists element-wise)."""
+    if hasattr(value, "as_dict"):
+        return value.as_dict()
+    if isinstance(value, (list, tuple)):
+        return [_describe_parameter(item) for item in value]
+    return value
+
+
+class CachedSearchResults(list):
+    """
+    Materialized search results that keep the response metadata SearchItemPaged exposes
+    (count, facets, answers, coverage, debug info), so a cached hit can still answer them.
+    """
+
+    METADATA = ("count", "facets", "answers", "coverage", "debug_info")
+
+    def __init__(self, results=(), metadata: dict = None):
+        super().__init__(results)
+        self.metadata = dict(metadata or {})
+
+    @classmethod
+    def from_response(cls, response):
+        results = list(response)
+        # Read after iterating: the metadata comes from the first page, already fetched
+        metadata = {
+            name: getattr(response, f"get_{name}")()
+            for name in cls.METADATA
+            if hasattr(response, f"get_{name}")
+        }
+        return cls(results, metadata)
+
+    def copy(self):
+        return CachedSearchResults(self, self.metadata)
+
+    def get_count(self):
+        return self.metadata.get("count")
+
+    def get_facets(self):
+        return self.metadata.get("facets")
+
+    def get_answers(self):
+        return self.metadata.get("answers")
+
+    def get_coverage(self):
+        return self.metadata.get("coverage")
+
+    def get_debug_info(self):
+        return self.metadata.get("debug_info")
+
+
+class _CacheEntry:
+    __slots__ = ("results", "expires_at", "group", "embedding", "version")
+
+    def __init__(self, results, expires_at, group, embedding, version):
+        self.results = results
+        self.expires_at = expires_at
+        self.group = group
+        self.embedding = embedding
+        self.version = version
+
+
+class CachedSearchClient:
+    """
+    Query-result cache in front of SearchClient.search.
+
+    Exact hits are keyed on the normalized search text, the vector queries (normalized
+    text or a hash of the vector, k, fields, ...) and every other search() argument
+    (top, filter, facets, query_answer, ...); only transport options are ignored. With
+    semantic_threshold set, a miss is also served from a cached query with the same
+    parameters whose embedding has cosine similarity above the threshold. Entries expire after ttl seconds, the least recently used are evicted
+    beyond max_entries, and everything is dropped when the index version changes.
+    """
+
+    def __init__(
+        self,
+        search_client,
+        ttl: float = 300,
+        max_entries: int = 1000,
+        semantic_threshold: float = None,
+        embedding_client=None,
+        index_client=None,
+        version_check_interval: float = 60,
+        index_name: str = None,
+    ):
+        """
+        :param search_client: azure.search.documents.SearchClient
+        :param semantic_threshold: Minimum cosine similarity for a semantic hit (None = exact only)
+        :param embedding_client: EmbeddingClient used to embed VectorizableTextQuery texts for
+                                 semantic hits (VectorizedQuery vectors are used directly)
+        :param index_client: SearchIndexClient used to detect index changes (ETag and document
+                             count), checked at most every version_check_interval seconds
+        :param index_name: Index queried by search_client, needed with index_client
+                           (defaults to the client's index_name attribute when it has one)
+        """
+        self.search_client = search_client
+        self.index_name = index_name or getattr(search_client, "index_name", None)
+        if index_client is not None and self.index_name is None:
+            raise ValueError("index_name is required to check the index version")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        self.embedding_client = embedding_client
+        self.index_client = index_client
+        self.version_check_interval = version_check_interval
+        self.index_version = None
+        self._version_checked_at = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "lookups": 0, "exact_hits": 0, "semantic_hits": 0, "misses": 0,
+            "evictions": 0, "expirations": 0, "invalidations": 0,
+        }
+
+    # ------------------------------------------------------------------ index version
+
+    def _fetch_index_version(self):
+        index = self.index_client.get_index(self.index_name)
+        statistics = self.index_client.get_index_statistics(self.index_name)
+        count = statistics["document_count"] if isinstance(statistics, dict) else statistics.document_count
+        return f"{index.e_tag}:{count}"
+
+    def set_index_version(self, version):
+        """Record the current index version; cached results of other versions are dropped."""
+        with self._lock:
+            if version != self.index_version:
+                if self.index_version is not None:
+                    self._invalidate()
+                self.index_version = version
+
+    def _check_index_version(self):
+        if self.index_client is None:
+            return
+        now = time.monotonic()
+        if self._version_checked_at is not None and now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        self.set_index_version(self._fetch_index_version())
+
+    def _invalidate(self):
+        if self._entries:
+            self.stats["invalidations"] += 1
+        self._entries.clear()
+
+    def invalidate(self):
+        """Drop every cached result (e.g. after uploading documents)."""
+        with self._lock:
+            self._invalidate()
+
+    # ------------------------------------------------------------------ keys
+
+    def _keys(self, search_text, kwargs):
+        parameters = {
+            name: _describe_parameter(value)
+            for name, value in kwargs.items()
+            if value is not None and name != "vector_queries" and name not in _TRANSPORT_OPTIONS
+        }
+        vector_queries = [_describe_vector_query(query) for query in kwargs.get("vector_queries") or []]
+        group = json.dumps(
+            {"parameters": parameters, "vector_queries": [
+                {name: value for name, value in query.items() if name not in ("text", "vector")}
+                for query in vector_queries
+            ]},
+            sort_keys=True, default=str,
+        )
+        exact = json.dumps(
+            {"group": group, "search_text": normalize_query(search_text), "vector_queries": vector_queries},
+            sort_keys=True, default=str,
+        )
+        return hashlib.sha256(exact.encode()).hexdigest(), hashlib.sha256(group.encode()).hexdigest()
+
+    def _query_embedding(self, search_text, kwargs):
+        """Embedding that represents the query for semantic matching (None if unavailable)."""
+        vector_queries = kwargs.get("vector_queries") or []
+        if len(vector_queries) != 1 or search_text:
+            return None
+        query = vector_queries[0]
+        if getattr(query, "vector", None) is not None:
+            vector = np.asarray(query.vector, dtype=np.float32)
+        elif getattr(query, "text", None) is not None and self.embedding_client is not None:
+            vector = np.asarray(self.embedding_client.embed(normalize_query(query.text)), dtype=np.float32)
+        else:
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    # ------------------------------------------------------------------ lookup
+
+    def _get_exact(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= now:
+            del self._entries[key]
+            self.stats["expirations"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _get_semantic(self, group, embedding, now):
+        best_key, best_score = None, self.semantic_threshold
+        for key, entry in list(self._entries.items()):
+            if entry.group != group or entry.embedding is None or len(entry.embedding) != len(embedding):
+                continue
+            if entry.expires_at <= now:
+                del self._entries[key]
+                self.stats["expirations"] += 1
+                continue
+            score = float(entry.embedding @ embedding)
+            if score >= best_score:
+                best_key, best_score = key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    def _store(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def search(self, search_text: str = None, **kwargs) -> CachedSearchResults:
+        """
+        Same arguments as SearchClient.search. Results are returned as a CachedSearchResults
+        list of result dicts, served from the cache or materialized from the service
+        response, with get_count(), get_facets() and get_answers() as on the SDK pager.
+        """
+        self._check_index_version()
+        key, group = self._keys(search_text, kwargs)
+        with self._lock:
+            self.stats["lookups"] += 1
+            entry = self._get_exact(key, time.monotonic())
+            if entry is not None:
+                self.stats["exact_hits"] += 1
+                return entry.results.copy()
+
+        # The query is only embedded once the exact lookup has missed
+        embedding = self._query_embedding(search_text, kwargs) if self.semantic_threshold is not None else None
+        with self._lock:
+            if embedding is not None:
+                entry = self._get_semantic(group, embedding, time.monotonic())
+                if entry is not None:
+                    self.stats["semantic_hits"] += 1
+                    return entry.results.copy()
+            self.stats["misses"] += 1
+            version = self.index_version
+
+        results = CachedSearchResults.from_response(self.search_client.search(search_text, **kwargs))
+        with self._lock:
+            if version == self.index_version:
+                self._store(key, _CacheEntry(results, time.monotonic() + self.ttl, group, embedding, version))
+        return results.copy()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        hits = stats["exact_hits"] + stats["semantic_hits"]
+        stats["hit_rate"] = hits / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
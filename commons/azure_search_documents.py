@@ -0,0 +1,179 @@
+import base64
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+_BASE64_URLSAFE = np.frombuffer(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_", dtype=np.uint8
+)
+_JSON_ESCAPES = [("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r"), ("\t", "\\t")]
+_JSON_CONTROL_CHARS = [chr(c) for c in range(0x20) if chr(c) not in "\n\r\t"]
+
+
+def encode_key(key: str) -> str:
+    """Encode key to be Azure Search compatible using URL-safe base64."""
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def encode_keys(keys) -> pa.StringArray:
+    """
+    Vectorized encode_key over an Arrow array of keys.
+    Keys are grouped by byte length so each group is encoded as one NumPy matrix
+    operation, and the result is assembled directly into Arrow buffers.
+    """
+    if isinstance(keys, pa.ChunkedArray):
+        keys = keys.combine_chunks()
+    keys = pc.cast(keys, pa.string())
+    if keys.null_count:
+        raise ValueError("Document keys cannot be null")
+
+    n = len(keys)
+    offsets = np.frombuffer(keys.buffers()[1], dtype=np.int32, count=n + 1, offset=keys.offset * 4)
+    data = np.frombuffer(keys.buffers()[2], dtype=np.uint8) if keys.buffers()[2] is not None else np.empty(0, np.uint8)
+    lengths = np.diff(offsets)
+
+    out_lengths = 4 * ((lengths + 2) // 3)
+    out_offsets = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(out_lengths, out=out_offsets[1:])
+    out_data = np.empty(int(out_offsets[-1]), dtype=np.uint8)
+
+    for length in np.unique(lengths):
+        if length == 0:
+            continue
+        rows = np.nonzero(lengths == length)[0]
+        padded = int((length + 2) // 3 * 3)
+        matrix = np.zeros((len(rows), padded), dtype=np.uint32)
+        matrix[:, :length] = data[offsets[rows][:, None] + np.arange(length)]
+        triples = matrix.reshape(len(rows), -1, 3)
+        n24 = (triples[..., 0] << 16) | (triples[..., 1] << 8) | triples[..., 2]
+        sextets = np.stack([(n24 >> 18) & 63, (n24 >> 12) & 63, (n24 >> 6) & 63, n24 & 63], axis=-1)
+        chars = _BASE64_URLSAFE[sextets.reshape(len(rows), -1)]
+        padding = padded - int(length)
+        if padding:
+            chars[:, -padding:] = ord("=")
+        width = chars.shape[1]
+        out_data[out_offsets[rows][:, None] + np.arange(width)] = chars
+
+    return pa.StringArray.from_buffers(n, pa.py_buffer(out_offsets), pa.py_buffer(out_data))
+
+
+def _json_strings(values) -> pa.StringArray:
+    """Render an Arrow string array as JSON string literals (null -> null)."""
+    values = pc.cast(values, pa.string())
+    for char, escaped in _JSON_ESCAPES:
+        values = pc.replace_substring(values, char, escaped)
+    if pc.any(pc.match_substring_regex(values, "[\\x00-\\x1f]")).as_py():
+        for char in _JSON_CONTROL_CHARS:
+            values = pc.replace_substring(values, char, f"\\u{ord(char):04x}")
+    return pc.fill_null(pc.binary_join_element_wise('"', values, '"', ""), "null")
+
+
+def _json_vectors(values) -> pa.StringArray:
+    """
+    Render an Arrow list<float> array as JSON arrays. The floats are formatted by
+    Arrow's cast kernel straight from the value buffer, never as Python floats.
+    NaN and infinity have no JSON representation and are rejected.
+    """
+    non_finite = pc.sum(pc.invert(pc.is_finite(pc.list_flatten(values)))).as_py()
+    if non_finite:
+        raise ValueError(f"Embeddings contain {non_finite} NaN or infinite values")
+    as_text = pc.cast(values, pa.list_(pa.string()))
+    joined = pc.binary_join(as_text, ",")
+    return pc.fill_null(pc.binary_join_element_wise("[", joined, "]", ""), "null")
+
+
+def _split_documents(documents: pa.StringArray) -> list:
+    offsets = np.frombuffer(documents.buffers()[1], dtype=np.int32, count=len(documents) + 1, offset=documents.offset * 4)
+    data = documents.buffers()[2].to_pybytes()
+    return [data[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+class ParquetDocumentSource:
+    """
+    Streams search documents out of a Parquet file as pre-encoded JSON objects.
+
+    The file is read one record batch at a time, keys are base64-encoded for the whole
+    batch at once and every document is rendered to JSON with Arrow compute kernels,
+    so memory stays bounded by one batch and no per-cell Python objects are created.
+    The output feeds AzureSearchDocumentUploader.upload directly.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 1000,
+        id_column: str = "_id",
+        title_column: str = "title",
+        content_column: str = "text",
+        embedding_column: str = "text-embedding-3-large-3072-embedding",
+        encode_ids: bool = True,
+        embedding_store=None,
+    ):
+        """
+        :param path: Parquet file with the source documents
+        :param batch_size: Rows read and encoded per record batch
+        :param encode_ids: Base64-encode the ids (Azure Search keys only allow a restricted charset)
+        :param embedding_store: EmbeddingStore built from this file; embeddings are then taken
+                                from the mapped store instead of decoding the Parquet column.
+                                Must be a float32, unnormalized store: float16/int8 or
+                                normalized stores would upload altered vectors
+        """
+        if embedding_store is not None and (embedding_store.dtype != "float32" or embedding_store.normalized):
+            raise ValueError(
+                "embedding_store must hold the source vectors (float32, not normalized), "
+                f"got dtype={embedding_store.dtype}, normalized={embedding_store.normalized}"
+            )
+        self.path = path
+        self.batch_size = batch_size
+        self.id_column = id_column
+        self.title_column = title_column
+        self.content_column = content_column
+        self.embedding_column = embedding_column
+        self.encode_ids = encode_ids
+        self.embedding_store = embedding_store
+
+    @property
+    def num_rows(self) -> int:
+        return pq.ParquetFile(self.path).metadata.num_rows
+
+    def _store_embeddings(self, start: int, count: int) -> pa.ListArray:
+        vectors = np.ascontiguousarray(self.embedding_store.slice(start, start + count), dtype=np.float32)
+        offsets = np.arange(0, vectors.size + 1, vectors.shape[1], dtype=np.int32)
+        return pa.ListArray.from_arrays(pa.array(offsets), pa.array(vectors.reshape(-1)))
+
+    def _encode_batch(self, batch: pa.RecordBatch, embeddings=None) -> pa.StringArray:
+        ids = batch.column(self.id_column)
+        if self.encode_ids:
+            # Base64url output never needs escaping
+            keys = pc.binary_join_element_wise('"', encode_keys(ids), '"', "")
+        else:
+            if ids.null_count:
+                raise ValueError("Document keys cannot be null")
+            keys = _json_strings(ids)
+        return pc.binary_join_element_wise(
+            '{"id":', keys,
+            ',"title":', _json_strings(batch.column(self.title_column)),
+            ',"content":', _json_strings(batch.column(self.content_column)),
+            ',"embedding":', _json_vectors(batch.column(self.embedding_column) if embeddings is None else embeddings),
+            "}",
+            "",
+        )
+
+    def iter_batches(self):
+        """
+        Yield one list of JSON-encoded documents (bytes) per record batch.
+        """
+        parquet_file = pq.ParquetFile(self.path)
+        columns = [self.id_column, self.title_column, self.content_column]
+        if self.embedding_store is None:
+            columns.append(self.embedding_column)
+        start = 0
+        for batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=columns):
+            embeddings = None if self.embedding_store is None else self._store_embeddings(start, batch.num_rows)
+            start += batch.num_rows
+            yield _split_documents(self._encode_batch(batch, embeddings))
+
+    def __iter__(self):
+        for documents in self.iter_batches():
+            yield from documents
@@ -1,5 +1,6 @@
 
 from azure.search.documents.indexes import SearchIndexClient
+from azure.search.documents.indexes.aio import SearchIndexClient as AsyncSearchIndexClient
 from azure.search.documents.indexes.models import (
     BinaryQuantizationCompression,
     HnswAlgorithmConfiguration,
@@ -16,11 +17,89 @@ from azure.search.documents.indexes.models import (
     RescoringOptions
     )
 from azure.core.exceptions import ResourceExistsError
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+import requests
+import asyncio
+import threading
+import random
+import json
+import time
 
 
-class AzureSearchIndexManager:
-    def __init__(self, service_endpoint: str, credential: str, index_name_prefix: str, vector_dimensions: int):
-        self.client = SearchIndexClient(endpoint=service_endpoint, credential=credential)
+# Settings whose absence is meaningful (e.g. no compression) and is compared even when
+# unset; None, an empty value and a missing key all mean "not set"
+_NULLABLE_SETTINGS = ("compression_name", "compressions", "truncation_dimension")
+
+
+def _is_unset(value):
+    return value is None or value == [] or value == ""
+
+
+def _item_name(item):
+    return item.get("name") or item.get("compression_name") if isinstance(item, dict) else None
+
+
+def _diff_definitions(desired, existing, path=""):
+    """
+    Differences between a desired index definition and the deployed one (both as_dict()).
+    Only keys set in the desired definition are compared, so service-side defaults do not
+    show up as changes. Lists of named items (fields, profiles...) are matched by name.
+    :return: List of (path, kind, desired value, existing value), kind = added|removed|changed
+    """
+    if isinstance(desired, dict) and isinstance(existing, dict):
+        keys = list(desired) + [key for key in _NULLABLE_SETTINGS if key in existing and key not in desired]
+        changes = []
+        for key in keys:
+            value = desired.get(key)
+            if value is None and key not in _NULLABLE_SETTINGS:
+                continue
+            if key in _NULLABLE_SETTINGS and _is_unset(value) and _is_unset(existing.get(key)):
+                continue
+            changes.extend(_diff_definitions(value, existing.get(key), f"{path}.{key}" if path else key))
+        return changes
+    if isinstance(desired, list) and isinstance(existing, list) and all(_item_name(item) for item in desired + existing):
+        existing_items = {_item_name(item): item for item in existing}
+        desired_names = {_item_name(item) for item in desired}
+        changes = []
+        for item in desired:
+            name = _item_name(item)
+            if name in existing_items:
+                changes.extend(_diff_definitions(item, existing_items[name], f"{path}.{name}"))
+            else:
+                changes.append((f"{path}.{name}", "added", item, None))
+        changes.extend(
+            (f"{path}.{name}", "removed", None, item) for name, item in existing_items.items() if name not in desired_names
+        )
+        return changes
+    if existing is None and isinstance(desired, list) and all(_item_name(item) for item in desired):
+        return [(f"{path}.{_item_name(item)}", "added", item, None) for item in desired]
+    return [] if desired == existing else [(path, "changed", desired, existing)]
+
+
+class _IndexDefinitionBuilder:
+    """
+    Part shared by the sync and async index managers: the SearchIndex definition of a
+    scenario, its diff against the deployed index and the provisioning reports. It does
+    no I/O; each manager sends the requests with its own SearchIndexClient.
+    """
+
+    # HNSW parameters used unless a scenario overrides them with "hnsw_parameters"
+    DEFAULT_HNSW_PARAMETERS = {"m": 4, "ef_construction": 400, "ef_search": 500, "metric": "cosine"}
+
+    # Settings of an existing field, algorithm or compression the service can change in
+    # place. Any other change to an existing item, or removing one, needs a rebuild.
+    UPDATABLE_SETTINGS = (
+        "retrievable",
+        "parameters.ef_search",
+        "rescoring_options.enable_rescoring",
+        "rescoring_options.default_oversampling",
+    )
+
+    # Provisioning status reported for each action of _plan_index
+    PROVISION_STATUS = {"create": "created", "update": "updated", "unchanged": "unchanged", "rebuild": "needs_rebuild"}
+
+    def __init__(self, index_name_prefix: str, vector_dimensions: int):
         self.index_name_prefix = index_name_prefix
         self.vector_dimensions = vector_dimensions
 
@@ -96,20 +175,17 @@ class AzureSearchIndexManager:
 
         return compression
 
-    def _create_vector_search_config(self, compression_config=None):
+    def _create_vector_search_config(self, compression_config=None, hnsw_parameters: dict = None):
         """
         Creates the VectorSearch configuration, including algorithm and compression settings.
         """
+        parameters = {**self.DEFAULT_HNSW_PARAMETERS, **(hnsw_parameters or {})}
+
         # Define the HNSW algorithm configuration
         algorithm_config = HnswAlgorithmConfiguration(
             name="hnsw-config",
             kind="hnsw",
-            parameters=HnswParameters(
-                m=4,
-                ef_construction=400,
-                ef_search=500,
-                metric="cosine"
-            )
+            parameters=HnswParameters(**parameters)
         )
 
         # Define the VectorSearchProfile
@@ -130,9 +206,9 @@ class AzureSearchIndexManager:
 
         return vector_search
 
-    def create_index(self, scenario: dict):
+    def _build_index(self, scenario: dict):
         """
-        Creates or updates an index based on the provided scenario.
+        Builds the SearchIndex definition for the provided scenario.
         """
         index_name = f"{self.index_name_prefix}-{scenario['name']}"
 
@@ -149,28 +225,711 @@ class AzureSearchIndexManager:
                 config_type=scenario["compression_type"],
                 truncate_dims=scenario.get("truncate_dims"),
                 discard_originals=scenario.get("discard_originals", False),
+                oversample_ratio=scenario.get("oversample_ratio", 10),
             )
 
         # Create vector search configuration
-        vector_search = self._create_vector_search_config(compression_config)
+        vector_search = self._create_vector_search_config(compression_config, scenario.get("hnsw_parameters"))
 
         # Define the SearchIndex
-        index = SearchIndex(
+        return SearchIndex(
             name=index_name,
             fields=fields,
             vector_search=vector_search,
         )
 
+    def _handle_create_error(self, index_name: str, e: Exception):
+        if isinstance(e, ResourceExistsError) or (getattr(e, "message", None) and "already exists" in e.message):
+            print(f"Index {index_name} already exists.")
+        else:
+            print(f"Error creating index {index_name}: {type(e)} - {str(e)}")
+
+    def _plan_index(self, index, existing):
+        """
+        Compare a desired SearchIndex with the deployed one (None if missing).
+        :return: (action, changes), action = create | update | unchanged | rebuild
+        """
+        if existing is None:
+            return "create", []
+        changes = _diff_definitions(index.as_dict(), existing.as_dict())
+        if not changes:
+            return "unchanged", []
+        described = [
+            f"{path}: {kind}" if kind != "changed" else f"{path}: {existing_value!r} -> {desired_value!r}"
+            for path, kind, desired_value, existing_value in changes
+        ]
+        in_place = all(
+            kind == "added" or (kind == "changed" and path.endswith(self.UPDATABLE_SETTINGS))
+            for path, kind, _, _ in changes
+        )
+        return ("update" if in_place else "rebuild"), described
+
+    @staticmethod
+    def _provision_result(index, status, changes, error, start):
+        return {
+            "index_name": index.name,
+            "status": status,
+            "changes": changes,
+            "error": error,
+            "seconds": time.perf_counter() - start,
+        }
+
+    @staticmethod
+    def _provision_report(results, elapsed):
+        report = {"elapsed_seconds": elapsed, "indexes": results}
+        for status in ("created", "updated", "unchanged", "needs_rebuild", "rebuilt", "failed"):
+            report[status] = [result["index_name"] for result in results if result["status"] == status]
+        return report
+
+    def _statistics_targets(self, scenarios, expected_count, baseline):
+        index_names = [f"{self.index_name_prefix}-{scenario['name']}" for scenario in scenarios]
+        baseline_index = f"{self.index_name_prefix}-{baseline}" if baseline else None
+        return (
+            {index_name: expected_count for index_name in index_names},
+            baseline_index if baseline_index in index_names else None,
+        )
+
+
+class AzureSearchIndexManager(_IndexDefinitionBuilder):
+    """
+    Creates and provisions the indexes of vector search scenarios with a SearchIndexClient.
+    """
+
+    def __init__(self, service_endpoint: str, credential: str, index_name_prefix: str, vector_dimensions: int):
+        super().__init__(index_name_prefix, vector_dimensions)
+        self.client = SearchIndexClient(endpoint=service_endpoint, credential=credential)
+
+    def create_index(self, scenario: dict):
+        """
+        Creates or updates an index based on the provided scenario.
+        """
+        index = self._build_index(scenario)
+
         # Create or update the index
         try:
             self.client.create_or_update_index(index)
-        except ResourceExistsError:
-            print(f"Index {index_name} already exists.")
         except Exception as e:
-            if e.message and "already exists" in e.message:
-                print(f"Index {index_name} already exists.")
-            else:
-                print(f"Error creating index {index_name}: {type(e)} - {str(e)}")
-    
+            self._handle_create_error(index.name, e)
+
+        # Return the index name
+        return index.name
+
+    def _provision_index(self, scenario, existing, rebuild):
+        start = time.perf_counter()
+        index = self._build_index(scenario)
+        action, changes = self._plan_index(index, existing.get(index.name))
+        status = self.PROVISION_STATUS[action]
+        error = None
+        try:
+            if action == "rebuild" and rebuild:
+                self.client.delete_index(index.name)
+                self.client.create_index(index)
+                status = "rebuilt"
+            elif action == "create":
+                self.client.create_index(index)
+            elif action == "update":
+                self.client.create_or_update_index(index)
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+        return self._provision_result(index, status, changes, error, start)
+
+    def provision_indexes(self, scenarios: list, max_concurrency: int = 8, rebuild: bool = False):
+        """
+        Bring the indexes of several scenarios to their desired definition.
+
+        Existing definitions are fetched with a single list call and diffed against the
+        scenario (fields, vector profiles, HNSW parameters, compression). Missing indexes
+        are created, in-place changes applied and no-op updates skipped, with up to
+        max_concurrency requests at once. Changes the service cannot apply in place are
+        reported as needs_rebuild, or applied by dropping and recreating the index when
+        rebuild=True (its documents are lost and must be re-uploaded).
+        :return: Report with per-index status, changes and seconds, plus names per status
+        """
+        start = time.perf_counter()
+        existing = {index.name: index for index in self.client.list_indexes()}
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = list(executor.map(lambda scenario: self._provision_index(scenario, existing, rebuild), scenarios))
+        report = self._provision_report(results, time.perf_counter() - start)
+        for result in results:
+            print(f"Index {result['index_name']}: {result['status']} ({result['seconds']:.2f}s)")
+        return report
+
+    def wait_for_statistics(self, scenarios: list, expected_count: int, baseline: str = "baseline", **kwargs):
+        """
+        Wait until the index of every scenario reports expected_count documents and stable
+        sizes (see IndexStatisticsMonitor). Compression ratios are relative to the index of
+        the scenario named `baseline`, when present.
+        """
+        monitor = IndexStatisticsMonitor(self.client, **kwargs)
+        return monitor.wait_for(*self._statistics_targets(scenarios, expected_count, baseline))
+
+
+class AsyncAzureSearchIndexManager(_IndexDefinitionBuilder):
+    """
+    asyncio counterpart of AzureSearchIndexManager built on the `.aio` SearchIndexClient.
+    Pass an async credential (e.g. AzureAuthHelper.get_async_credential()) or an AzureKeyCredential.
+    """
+
+    def __init__(self, service_endpoint: str, credential, index_name_prefix: str, vector_dimensions: int):
+        super().__init__(index_name_prefix, vector_dimensions)
+        self.client = AsyncSearchIndexClient(endpoint=service_endpoint, credential=credential)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.client.close()
+
+    async def create_index(self, scenario: dict):
+        """
+        Creates or updates an index based on the provided scenario.
+        """
+        index = self._build_index(scenario)
+
+        # Create or update the index
+        try:
+            await self.client.create_or_update_index(index)
+        except Exception as e:
+            self._handle_create_error(index.name, e)
+
         # Return the index name
-        return index_name
\ No newline at end of file
+        return index.name
+
+    async def create_indexes(self, scenarios: list, max_concurrency: int = 8):
+        """
+        Creates or updates the indexes of several scenarios concurrently.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def create(scenario):
+            async with semaphore:
+                return await self.create_index(scenario)
+
+        return await asyncio.gather(*(create(scenario) for scenario in scenarios))
+
+    async def wait_for_statistics(self, scenarios: list, expected_count: int, baseline: str = "baseline", **kwargs):
+        """
+        asyncio version of AzureSearchIndexManager.wait_for_statistics.
+        """
+        monitor = AsyncIndexStatisticsMonitor(self.client, **kwargs)
+        return await monitor.wait_for(*self._statistics_targets(scenarios, expected_count, baseline))
+
+    async def _provision_index(self, scenario, existing, rebuild):
+        start = time.perf_counter()
+        index = self._build_index(scenario)
+        action, changes = self._plan_index(index, existing.get(index.name))
+        status = self.PROVISION_STATUS[action]
+        error = None
+        try:
+            if action == "rebuild" and rebuild:
+                await self.client.delete_index(index.name)
+                await self.client.create_index(index)
+                status = "rebuilt"
+            elif action == "create":
+                await self.client.create_index(index)
+            elif action == "update":
+                await self.client.create_or_update_index(index)
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+        return self._provision_result(index, status, changes, error, start)
+
+    async def provision_indexes(self, scenarios: list, max_concurrency: int = 8, rebuild: bool = False):
+        """
+        asyncio version of AzureSearchIndexManager.provision_indexes.
+        """
+        start = time.perf_counter()
+        existing = {index.name: index async for index in self.client.list_indexes()}
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def provision(scenario):
+            async with semaphore:
+                return await self._provision_index(scenario, existing, rebuild)
+
+        results = list(await asyncio.gather(*(provision(scenario) for scenario in scenarios)))
+        report = self._provision_report(results, time.perf_counter() - start)
+        for result in results:
+            print(f"Index {result['index_name']}: {result['status']} ({result['seconds']:.2f}s)")
+        return report
+
+
+class AzureSearchDocumentUploader:
+    """
+    High-throughput document uploader for one or several indexes.
+
+    Documents are consumed lazily from any iterable and packed into batches bounded by
+    both the request payload size and the document count, so 3072-dim vectors do not
+    overflow the 16 MB request limit. Each batch is encoded once and fanned out to every
+    target index. A bounded number of batches is kept in flight (the producer blocks when
+    the window is full). Throttled requests (429/503) back off honoring Retry-After,
+    throttled documents inside a 207 response are retried, and a 413 splits the batch.
+    """
+
+    RETRYABLE_STATUS = {429, 502, 503, 504}
+
+    def __init__(
+        self,
+        service_endpoint: str,
+        credential,
+        index_names: list,
+        max_payload_bytes: int = 12 * 1024 * 1024,
+        max_batch_size: int = 1000,
+        max_in_flight: int = 4,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        action: str = "upload",
+        key_field: str = "id",
+        api_version: str = "2024-07-01",
+        timeout: int = 120,
+    ):
+        """
+        :param credential: AzureKeyCredential or a token credential (e.g. AzureAuthHelper.get_credential())
+        :param index_names: Indexes that receive the same document stream
+        :param max_payload_bytes: Upper bound for the JSON body of a single request
+        :param max_batch_size: Upper bound for documents per request (service limit is 1000)
+        :param max_in_flight: Concurrent requests per index
+        :param action: Indexing action (upload | merge | mergeOrUpload | delete)
+        """
+        if isinstance(index_names, str) or not index_names:
+            raise ValueError("index_names must be a non-empty list of index names")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.service_endpoint = service_endpoint.rstrip("/")
+        self.credential = credential
+        self.index_names = list(index_names)
+        self.max_payload_bytes = max_payload_bytes
+        self.max_batch_size = max_batch_size
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.action = action
+        self.key_field = key_field
+        self.api_version = api_version
+        self.timeout = timeout
+        self._token = None
+        self._token_lock = threading.Lock()
+        self.session = requests.Session()
+        workers = max_in_flight * len(self.index_names)
+        adapter = HTTPAdapter(pool_connections=len(self.index_names), pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _auth_headers(self):
+        if hasattr(self.credential, "key"):
+            return {"api-key": self.credential.key}
+        with self._token_lock:
+            if self._token is None or self._token.expires_on - time.time() < 300:
+                self._token = self.credential.get_token("https://search.azure.com/.default")
+            return {"Authorization": f"Bearer {self._token.token}"}
+
+    def _encode_action(self, document):
+        """
+        Encode one document as an indexing action. Pre-encoded JSON objects (bytes) are
+        passed through, with the action injected, so callers can skip dict materialization.
+        """
+        if isinstance(document, (bytes, bytearray)):
+            return b'{"@search.action":"' + self.action.encode("ascii") + b'",' + bytes(document).lstrip()[1:]
+        payload = {"@search.action": self.action}
+        payload.update(document)
+        return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def _iter_batches(self, documents):
+        """Pack encoded actions into batches bounded by payload size and document count."""
+        batch = []
+        batch_bytes = len(b'{"value":[]}')
+        for document in documents:
+            encoded = self._encode_action(document)
+            if batch and (
+                batch_bytes + len(encoded) + 1 > self.max_payload_bytes
+                or len(batch) >= self.max_batch_size
+            ):
+                yield batch
+                batch = []
+                batch_bytes = len(b'{"value":[]}')
+            batch.append(encoded)
+            batch_bytes += len(encoded) + 1
+        if batch:
+            yield batch
+
+    def _action_keys(self, actions):
+        return [json.loads(action).get(self.key_field) for action in actions]
+
+    @staticmethod
+    def _parse_results(response):
+        """Per-document results of a 200/207 response, or None if the body is not the expected JSON."""
+        try:
+            body = response.json()
+        except ValueError:
+            return None
+        results = body.get("value") if isinstance(body, dict) else None
+        return results if isinstance(results, list) else None
+
+    def _match_results(self, chunk, results, stats):
+        """
+        Pair the per-document results with the actions by key, count successes and
+        failures, and return the throttled actions to send again. An action without a
+        result counts as failed.
+        """
+        if len(results) == len(chunk) and all(result.get("status") for result in results):
+            # Every action acknowledged: no need to decode the keys
+            stats["succeeded"] += len(chunk)
+            return []
+        by_key = {}
+        for result in results:
+            by_key.setdefault(result.get("key"), []).append(result)
+        throttled = []
+        for action, key in zip(chunk, self._action_keys(chunk)):
+            matches = by_key.get(key)
+            if not matches:
+                stats["failed"] += 1
+                stats["failed_keys"].append(key)
+                stats["errors"].append(f"{key}: no result returned for this document")
+                continue
+            result = matches.pop(0)
+            if result.get("status"):
+                stats["succeeded"] += 1
+            elif result.get("statusCode") in self.RETRYABLE_STATUS:
+                throttled.append(action)
+            else:
+                stats["failed"] += 1
+                stats["failed_keys"].append(key)
+                stats["errors"].append(f"{key}: {result.get('errorMessage')}")
+        return throttled
+
+    def _retry_delay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+        delay = min(self.backoff_base * 2 ** attempt, self.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    def _post(self, index_name, actions):
+        body = b'{"value":[' + b",".join(actions) + b"]}"
+        headers = {"Content-Type": "application/json"}
+        headers.update(self._auth_headers())
+        url = f"{self.service_endpoint}/indexes('{index_name}')/docs/search.index?api-version={self.api_version}"
+        return self.session.post(url, data=body, headers=headers, timeout=self.timeout), len(body)
+
+    def _send_batch(self, index_name, batch_number, actions):
+        start = time.perf_counter()
+        stats = {
+            "index_name": index_name,
+            "batch": batch_number,
+            "documents": len(actions),
+            "bytes": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "attempts": 0,
+            "throttled": 0,
+            "errors": [],
+            "failed_keys": [],
+        }
+        pending = [actions]
+        while pending:
+            chunk = pending.pop()
+            attempt = 0
+            while chunk:
+                stats["attempts"] += 1
+                error = None
+                try:
+                    response, size = self._post(index_name, chunk)
+                except requests.RequestException as e:
+                    response, size = None, 0
+                    error = f"{type(e).__name__}: {e}"
+                stats["bytes"] += size
+                if response is not None and response.status_code == 413 and len(chunk) > 1:
+                    # Payload too large: split in two and send both halves
+                    middle = len(chunk) // 2
+                    pending.extend([chunk[middle:], chunk[:middle]])
+                    chunk = None
+                    break
+                if response is not None and response.status_code in (200, 201, 207):
+                    results = self._parse_results(response)
+                    if results is None:
+                        # Outcome unknown; indexing actions are idempotent, so send them again
+                        error = f"HTTP {response.status_code} with an unreadable body: {response.text[:200]}"
+                    else:
+                        chunk = self._match_results(chunk, results, stats)
+                        if not chunk:
+                            break
+                        stats["throttled"] += 1
+                elif response is not None and response.status_code not in self.RETRYABLE_STATUS:
+                    stats["failed"] += len(chunk)
+                    stats["failed_keys"].extend(self._action_keys(chunk))
+                    stats["errors"].append(f"HTTP {response.status_code}: {response.text[:500]}")
+                    break
+                elif response is not None:
+                    stats["throttled"] += 1
+                if attempt >= self.max_retries:
+                    stats["failed"] += len(chunk)
+                    stats["failed_keys"].extend(self._action_keys(chunk))
+                    last_error = error or f"HTTP {response.status_code}"
+                    stats["errors"].append(f"Gave up after {attempt + 1} attempts: {last_error}")
+                    break
+                time.sleep(self._retry_delay(attempt, response))
+                attempt += 1
+        stats["seconds"] = time.perf_counter() - start
+        return stats
+
+    def upload(self, documents):
+        """
+        Upload a document stream to every target index.
+        :param documents: Iterable of dicts or pre-encoded JSON document objects (bytes)
+        :return: Report with per-index totals and per-batch statistics
+        """
+        start = time.perf_counter()
+        window = threading.BoundedSemaphore(self.max_in_flight * len(self.index_names))
+        futures = []
+
+        def release(_):
+            window.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight * len(self.index_names)) as executor:
+            for batch_number, batch in enumerate(self._iter_batches(documents), 1):
+                for index_name in self.index_names:
+                    # Backpressure: wait for a free slot before encoding/sending more
+                    window.acquire()
+                    future = executor.submit(self._send_batch, index_name, batch_number, batch)
+                    future.add_done_callback(release)
+                    futures.append(future)
+            batches = [future.result() for future in futures]
+
+        elapsed = time.perf_counter() - start
+        indexes = {}
+        for index_name in self.index_names:
+            index_batches = [b for b in batches if b["index_name"] == index_name]
+            succeeded = sum(b["succeeded"] for b in index_batches)
+            indexes[index_name] = {
+                "batches": len(index_batches),
+                "succeeded": succeeded,
+                "failed": sum(b["failed"] for b in index_batches),
+                "throttled": sum(b["throttled"] for b in index_batches),
+                "bytes": sum(b["bytes"] for b in index_batches),
+                "docs_per_second": succeeded / elapsed if elapsed > 0 else 0.0,
+            }
+            print(
+                f"Index {index_name}: {indexes[index_name]['succeeded']} uploaded, "
+                f"{indexes[index_name]['failed']} failed, {indexes[index_name]['docs_per_second']:.1f} docs/s"
+            )
+        return {"elapsed_seconds": elapsed, "indexes": indexes, "batches": batches}
+
+
+class IndexStatisticsMonitor:
+    """
+    Polls index statistics (document count, storage size, vector index size) of many
+    indexes until they converge, to verify a bulk load before promoting the indexes.
+
+    Statistics are not real-time: the count can lag behind the upload and sizes keep
+    changing for a while after it. An index has converged when it reports the expected
+    document count and its sizes were identical for stable_polls consecutive polls.
+    Every round polls the pending indexes concurrently; the interval grows while nothing
+    changes and the total wait is bounded by timeout.
+    """
+
+    def __init__(
+        self,
+        client,
+        poll_interval: float = 5.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        stable_polls: int = 2,
+        timeout: float = 600.0,
+        max_workers: int = 8,
+    ):
+        """
+        :param client: SearchIndexClient
+        :param stable_polls: Consecutive polls with unchanged statistics required to converge
+        :param timeout: Upper bound for the whole wait, in seconds
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stable_polls = stable_polls
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+    def _get_statistics(self, index_name):
+        stats = self.client.get_index_statistics(index_name)
+        return {
+            "document_count": stats["document_count"],
+            "storage_size": stats["storage_size"],
+            "vector_index_size": stats.get("vector_index_size", 0),
+        }
+
+    @staticmethod
+    def _compression_ratio(sample, baseline_sample):
+        if baseline_sample is None:
+            return None
+        size = sample["storage_size"] + sample["vector_index_size"]
+        baseline_size = baseline_sample["storage_size"] + baseline_sample["vector_index_size"]
+        return baseline_size / size if size else None
+
+    def _start(self, expected_counts):
+        return {
+            index_name: {
+                "status": "pending",
+                "expected_count": expected_count,
+                "stable": 0,
+                "seconds_to_converge": None,
+                "error": None,
+                "samples": [],
+            }
+            for index_name, expected_count in expected_counts.items()
+        }
+
+    def _record(self, state, stats, start):
+        """Add one poll result to an index state; return True when its statistics changed."""
+        if isinstance(stats, Exception):
+            state["error"] = f"{type(stats).__name__}: {stats}"
+            return False
+        state["error"] = None
+        elapsed = time.perf_counter() - start
+        previous = state["samples"][-1] if state["samples"] else None
+        sample = {"elapsed_seconds": elapsed, **stats, "docs_per_second": None}
+        if previous is not None:
+            delta = elapsed - previous["elapsed_seconds"]
+            sample["docs_per_second"] = (stats["document_count"] - previous["document_count"]) / delta if delta > 0 else None
+        state["samples"].append(sample)
+
+        unchanged = previous is not None and all(previous[key] == stats[key] for key in stats)
+        state["stable"] = state["stable"] + 1 if unchanged else 1
+        if stats["document_count"] == state["expected_count"] and state["stable"] >= self.stable_polls:
+            state["status"] = "converged"
+            state["seconds_to_converge"] = elapsed
+        return not unchanged
+
+    def _next_interval(self, interval, changed):
+        return self.poll_interval if changed else min(interval * self.backoff, self.max_interval)
+
+    @staticmethod
+    def _finished(indexes):
+        return all(state["status"] != "pending" for state in indexes.values())
+
+    def wait_for(self, expected_counts: dict, baseline_index: str = None) -> dict:
+        """
+        Poll until every index converges or the timeout passes.
+        :param expected_counts: {index_name: expected document count}
+        :param baseline_index: Index whose size is the reference for compression ratios
+        :return: Report with per-index status (converged | timeout), final statistics,
+                 compression ratio and a time series of samples (elapsed seconds, statistics,
+                 docs_per_second since the previous sample, compression_ratio)
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        indexes = self._start(expected_counts)
+        interval = self.poll_interval
+
+        def poll(index_name):
+            try:
+                return self._get_statistics(index_name)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while True:
+                pending = [name for name, state in indexes.items() if state["status"] == "pending"]
+                changed = False
+                for name, stats in zip(pending, executor.map(poll, pending)):
+                    changed = self._record(indexes[name], stats, start) or changed
+                now = time.perf_counter()
+                if self._finished(indexes) or now >= deadline:
+                    break
+                interval = self._next_interval(interval, changed)
+                time.sleep(min(interval, deadline - now))
+
+        return self._report(indexes, baseline_index, start)
+
+    def _report(self, indexes, baseline_index, start):
+        baseline = indexes.get(baseline_index)
+        baseline_samples = baseline["samples"] if baseline else []
+        report = {"elapsed_seconds": time.perf_counter() - start, "converged": True, "indexes": {}}
+        for name, state in indexes.items():
+            if state["status"] == "pending":
+                state["status"] = "timeout"
+                report["converged"] = False
+            for sample in state["samples"]:
+                # Latest baseline sample taken at or before this one
+                reference = next(
+                    (b for b in reversed(baseline_samples) if b["elapsed_seconds"] <= sample["elapsed_seconds"]),
+                    baseline_samples[0] if baseline_samples else None,
+                )
+                sample["compression_ratio"] = self._compression_ratio(sample, reference)
+            final = state["samples"][-1] if state["samples"] else {}
+            report["indexes"][name] = {
+                "status": state["status"],
+                "expected_count": state["expected_count"],
+                "document_count": final.get("document_count"),
+                "storage_size": final.get("storage_size"),
+                "vector_index_size": final.get("vector_index_size"),
+                "compression_ratio": final.get("compression_ratio"),
+                "seconds_to_converge": state["seconds_to_converge"],
+                "error": state["error"],
+                "samples": state["samples"],
+            }
+            print(
+                f"Index {name}: {state['status']}, {final.get('document_count')}/{state['expected_count']} documents"
+            )
+        return report
+
+
+class AsyncIndexStatisticsMonitor(IndexStatisticsMonitor):
+    """
+    asyncio version of IndexStatisticsMonitor for the `.aio` SearchIndexClient; every
+    round polls the pending indexes with concurrent requests on the event loop.
+    """
+
+    async def _get_statistics(self, index_name):
+        stats = await self.client.get_index_statistics(index_name)
+        return {
+            "document_count": stats["document_count"],
+            "storage_size": stats["storage_size"],
+            "vector_index_size": stats.get("vector_index_size", 0),
+        }
+
+    async def wait_for(self, expected_counts: dict, baseline_index: str = None) -> dict:
+        """
+        Same as IndexStatisticsMonitor.wait_for, without blocking the event loop.
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        indexes = self._start(expected_counts)
+        interval = self.poll_interval
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def poll(index_name):
+            async with semaphore:
+                try:
+                    return await self._get_statistics(index_name)
+                except Exception as e:
+                    return e
+
+        while True:
+            pending = [name for name, state in indexes.items() if state["status"] == "pending"]
+            changed = False
+            for name, stats in zip(pending, await asyncio.gather(*(poll(name) for name in pending))):
+                changed = self._record(indexes[name], stats, start) or changed
+            now = time.perf_counter()
+            if self._finished(indexes) or now >= deadline:
+                break
+            interval = self._next_interval(interval, changed)
+            await asyncio.sleep(min(interval, deadline - now))
+
+        return self._report(indexes, baseline_index, start)
@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from commons.azure_search_documents import encode_key
+from commons.azure_search_index import AzureSearchDocumentUploader
+
+
+def default_document_builder(path: str, content: bytes) -> list:
+    """One search document per file: encoded path as key, file name as title, text as content."""
+    return [{
+        "id": encode_key(path),
+        "title": os.path.basename(path),
+        "content": content.decode("utf-8", errors="replace"),
+    }]
+
+
+class SyncManifest:
+    """
+    Local record of what is already indexed: one row per DataLake file with the etag and
+    last_modified seen when it was last synced and the document keys it produced.
+    Stored in SQLite.
+    """
+
+    def __init__(self, path: str = "index_manifest.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, etag TEXT NOT NULL, last_modified TEXT, size INTEGER,"
+            " keys TEXT NOT NULL, synced REAL NOT NULL)"
+        )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def entries(self) -> dict:
+        """{path: (etag, [document keys])} for every synced file."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path, etag, keys FROM files").fetchall()
+        return {path: (etag, json.loads(keys)) for path, etag, keys in rows}
+
+    def update(self, rows=(), forget=()):
+        """
+        In one transaction, store (path, etag, last_modified, size, keys) rows of successfully
+        synced files and drop the paths whose documents were removed.
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                    [(path, etag, last_modified, size, json.dumps(keys), now) for path, etag, last_modified, size, keys in rows],
+                )
+                self._connection.executemany("DELETE FROM files WHERE path=?", [(path,) for path in forget])
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+
+class DataLakeIndexSync:
+    """
+    Incremental sync of a DataLake directory into one or more search indexes.
+
+    The directory is listed once with paged get_paths calls; etag and last_modified come
+    from the listing itself (no properties request per file). The listing is compared with
+    the SyncManifest: only new or changed files are downloaded, turned into documents and
+    sent with mergeOrUpload; documents of removed files, and documents a changed file no
+    longer produces, are deleted. A file is recorded in the manifest only once all of its
+    documents were accepted by every index, so failures are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        datalake,
+        container_name: str,
+        directory_name: str,
+        service_endpoint: str,
+        credential,
+        index_names: list,
+        manifest_path: str = "index_manifest.sqlite",
+        build_documents=None,
+        page_size: int = 5000,
+        max_workers: int = 8,
+        **uploader_options,
+    ):
+        """
+        :param datalake: AzureDataLakeGen2 instance (iter_paths and read_file are used)
+        :param index_names: Indexes to keep in sync (e.g. those created by AzureSearchIndexManager)
+        :param build_documents: Callable (path, content bytes) -> list of documents; each
+                                document needs the key field. Defaults to default_document_builder
+        :param page_size: Paths requested per listing page
+        :param max_workers: Concurrent file downloads
+        :param uploader_options: Extra AzureSearchDocumentUploader arguments (batch sizes, retries...)
+        """
+        self.datalake = datalake
+        self.container_name = container_name
+        self.directory_name = directory_name
+        self.build_documents = build_documents or default_document_builder
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.key_field = uploader_options.get("key_field", "id")
+        self.manifest = SyncManifest(manifest_path)
+        uploader_options.pop("action", None)
+        self.upserts = AzureSearchDocumentUploader(
+            service_endpoint, credential, index_names, action="mergeOrUpload", **uploader_options
+        )
+        self.deletes = AzureSearchDocumentUploader(
+            service_endpoint, credential, index_names, action="delete", **uploader_options
+        )
+
+    def close(self):
+        self.upserts.close()
+        self.deletes.close()
+        self.manifest.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def list_files(self) -> dict:
+        """{path: (etag, last_modified, size)} of every file under the directory, one paged listing."""
+        files = {}
+        for record in self.datalake.iter_paths(
+            self.container_name, self.directory_name, max_results=self.page_size, files_only=True
+        ):
+            last_modified = record.last_modified.isoformat() if record.last_modified else None
+            files[record.name] = (record.etag, last_modified, record.size)
+        return files
+
+    def plan(self) -> dict:
+        """Compare the current listing with the manifest: new, changed, deleted and unchanged files."""
+        listing = self.list_files()
+        known = self.manifest.entries()
+        new, changed, unchanged = [], [], 0
+        for path, (etag, _, _) in listing.items():
+            if path not in known:
+                new.append(path)
+            elif known[path][0] != etag:
+                changed.append(path)
+            else:
+                unchanged += 1
+        deleted = [path for path in known if path not in listing]
+        return {"listing": listing, "known": known, "new": new, "changed": changed, "deleted": deleted, "unchanged": unchanged}
+
+    def _read(self, path):
+        return self.build_documents(path, self.datalake.read_file(self.container_name, path))
+
+    def _iter_documents(self, paths, produced, failed):
+        """
+        Download and convert files with a bounded window of concurrent downloads, yielding
+        their documents as they are built. Keys per path go to `produced`, errors to `failed`.
+        """
+        window = self.max_workers * 4
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for offset in range(0, len(paths), window):
+                chunk = paths[offset:offset + window]
+                futures = [executor.submit(self._read, path) for path in chunk]
+                for path, future in zip(chunk, futures):
+                    try:
+                        documents = future.result()
+                    except Exception as e:
+                        print(f"Error reading {path}: {e}")
+                        failed.add(path)
+                        continue
+                    produced[path] = [document[self.key_field] for document in documents]
+                    yield from documents
+
+    @staticmethod
+    def _failed_keys(report):
+        return {key for batch in report["batches"] for key in batch.get("failed_keys", [])}
+
+    def sync(self, dry_run: bool = False) -> dict:
+        """
+        Push new and changed files, delete documents of removed files and update the manifest.
+        :param dry_run: Only compute and report the plan
+        :return: Report with file counts, documents uploaded/deleted/failed and elapsed time
+        """
+        start = time.perf_counter()
+        plan = self.plan()
+        listing, known = plan["listing"], plan["known"]
+        report = {
+            "listed": len(listing),
+            "new": len(plan["new"]),
+            "changed": len(plan["changed"]),
+            "deleted": len(plan["deleted"]),
+            "unchanged": plan["unchanged"],
+            "uploaded": 0,
+            "removed": 0,
+            "failed_files": 0,
+        }
+        print(
+            f"{report['listed']} files listed: {report['new']} new, {report['changed']} changed, "
+            f"{report['deleted']} deleted, {report['unchanged']} unchanged"
+        )
+        if dry_run:
+            report["elapsed_seconds"] = time.perf_counter() - start
+            return report
+
+        # New and changed files
+        produced, failed_paths = {}, set()
+        failed_keys = set()
+        to_upload = plan["new"] + plan["changed"]
+        if to_upload:
+            upload_report = self.upserts.upload(self._iter_documents(to_upload, produced, failed_paths))
+            failed_keys = self._failed_keys(upload_report)
+            report["uploaded"] = sum(len(keys) for keys in produced.values()) - len(failed_keys)
+
+        # Documents of removed files and documents a changed file no longer produces
+        stale = {path: known[path][1] for path in plan["deleted"]}
+        for path in plan["changed"]:
+            if path in produced:
+                stale[path] = known[path][1]
+        # A key still produced by some listed file (e.g. a document moved from a removed
+        # file to a new one) is live and must not be deleted
+        live = {key for keys in produced.values() for key in keys}
+        live.update(key for path in listing if path in known and path not in produced for key in known[path][1])
+        stale = {path: sorted(set(keys) - live) for path, keys in stale.items()}
+        stale_keys = sorted({key for keys in stale.values() for key in keys})
+        failed_deletes = set()
+        if stale_keys:
+            delete_report = self.deletes.upload({self.key_field: key} for key in stale_keys)
+            failed_deletes = self._failed_keys(delete_report)
+            report["removed"] = len(stale_keys) - len(failed_deletes)
+
+        # Only files fully accepted by every index are recorded as synced, and only removed
+        # files whose documents are all gone are forgotten. Both are decided before the
+        # manifest is touched and applied in one transaction.
+        synced = []
+        for path, keys in produced.items():
+            if failed_keys.intersection(keys) or failed_deletes.intersection(stale.get(path, ())):
+                failed_paths.add(path)
+                continue
+            etag, last_modified, size = listing[path]
+            synced.append((path, etag, last_modified, size, keys))
+        removed = [path for path in plan["deleted"] if not failed_deletes.intersection(stale[path])]
+        failed_paths.update(set(plan["deleted"]) - set(removed))
+        self.manifest.update(rows=synced, forget=removed)
+
+        report["failed_files"] = len(failed_paths)
+        report["elapsed_seconds"] = time.perf_counter() - start
+        print(
+            f"Sync complete: {report['uploaded']} documents uploaded, {report['removed']} deleted, "
+            f"{report['failed_files']} files failed in {report['elapsed_seconds']:.1f}s"
+        )
+        return report
@@ -1,20 +1,363 @@
 from azure.storage.filedatalake import DataLakeServiceClient,FileSystemClient
+from azure.storage.filedatalake.aio import DataLakeServiceClient as AsyncDataLakeServiceClient
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.core.pipeline.transport import AioHttpTransport, RequestsTransport
 from azure.identity import DefaultAzureCredential
-from typing import Dict
+from typing import Dict, NamedTuple, Optional
 from azure.storage.blob import BlobServiceClient, PublicAccess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from datetime import datetime
+import requests
+import asyncio
+import queue
+import threading
+import time
+import uuid
+import os
+
+
+class PathRecord(NamedTuple):
+    """Entrada de un listado de DataLake."""
+    name: str
+    size: int
+    is_directory: bool
+    last_modified: Optional[datetime]
+    etag: Optional[str]
+
+
+def _to_path_record(path):
+    return PathRecord(
+        name=path.name,
+        size=path.content_length or 0,
+        is_directory=bool(path.is_directory),
+        last_modified=path.last_modified,
+        etag=path.etag,
+    )
+
+
+def _split_prefix(directory_name, prefix):
+    """
+    Directorio que se envía al servicio para un prefijo de nombre: get_paths solo filtra
+    por directorio, así que se lista el directorio más profundo contenido en el prefijo
+    y el resto del prefijo se filtra en el cliente.
+    """
+    if not prefix:
+        return directory_name, None
+    full_prefix = f"{directory_name.rstrip('/')}/{prefix}" if directory_name else prefix
+    return full_prefix.rpartition("/")[0] or None, full_prefix
+
+
+_WRITE_FORMATS = ("csv", "parquet")
+
+
+def _temporary_path(file_path):
+    """Ruta temporal junto al destino: el renombrado final no sale del directorio."""
+    return f"{file_path}.{uuid.uuid4().hex}.partial"
+
+
+def _iter_dataframe_chunks(dataframe, chunk_rows):
+    for start in range(0, max(len(dataframe), 1), chunk_rows):
+        yield dataframe.iloc[start:start + chunk_rows]
+
+
+def _encode_dataframe(writer, dataframe, file_format, chunk_rows, compression, encoding):
+    """
+    Codifica el DataFrame sobre writer por bloques de filas. Es un generador que cede el
+    control tras cada bloque para que el llamador envíe lo acumulado (flush() en el cliente
+    síncrono, await drain() en el asíncrono).
+    """
+    if file_format == "csv":
+        for i, chunk in enumerate(_iter_dataframe_chunks(dataframe, chunk_rows)):
+            writer.write(chunk.to_csv(index=False, header=(i == 0)).encode(encoding))
+            yield
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_writer = None
+    try:
+        for chunk in _iter_dataframe_chunks(dataframe, chunk_rows):
+            if parquet_writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                parquet_writer = pq.ParquetWriter(writer, table.schema, compression=compression)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=parquet_writer.schema, preserve_index=False)
+            # Cada bloque de filas se escribe como un row group independiente
+            parquet_writer.write_table(table)
+            yield
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+
+
+def _new_clear_report():
+    return {
+        "mode": None,
+        "deleted_files": None,
+        "failed_files": 0,
+        "errors": [],
+        "recreated": None,
+        "elapsed_seconds": 0.0,
+        "files_per_second": None,
+    }
+
+
+def _finish_clear_report(report, start, container_name, directory_name):
+    report["elapsed_seconds"] = time.perf_counter() - start
+    if report["deleted_files"] is not None and report["elapsed_seconds"] > 0:
+        report["files_per_second"] = report["deleted_files"] / report["elapsed_seconds"]
+    if report["recreated"] is not False:
+        print(f"Directorio '{directory_name}' vaciado exitosamente en el contenedor '{container_name}'")
+
+
+def _record_recreate_failure(report, directory_name, error):
+    report["recreated"] = False
+    report["errors"].append(f"{directory_name}: {error}")
+    print(f"Se borró el contenido pero no se pudo volver a crear el directorio '{directory_name}', ya no existe: {error}")
+
+
+def _transfer_result(source, destination, start, attempts, size=None, error=None):
+    return {
+        "source": source,
+        "destination": destination,
+        "status": "failed" if error is not None else "succeeded",
+        "bytes": 0 if error is not None else size,
+        "attempts": attempts,
+        "elapsed_seconds": time.perf_counter() - start,
+        "error": f"{type(error).__name__}: {error}" if error is not None else None,
+    }
+
+
+def _transfer_report(results, elapsed):
+    total_bytes = sum(result["bytes"] for result in results)
+    succeeded = sum(1 for result in results if result["status"] == "succeeded")
+    report = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "bytes": total_bytes,
+        "elapsed_seconds": elapsed,
+        "throughput_mb_s": (total_bytes / 2**20) / elapsed if elapsed > 0 else 0.0,
+        "results": list(results),
+    }
+    print(
+        f"Transferencia completada: {report['succeeded']}/{report['total']} archivos, "
+        f"{report['failed']} con error, {report['throughput_mb_s']:.2f} MB/s"
+    )
+    return report
+
+
+def _local_upload_pairs(local_directory, directory_name):
+    """Pares (ruta local, ruta remota) de un directorio local, conservando su estructura bajo directory_name."""
+    files = []
+    for root, _, names in os.walk(local_directory):
+        for name in names:
+            local_path = os.path.join(root, name)
+            relative_path = os.path.relpath(local_path, local_directory).replace(os.sep, "/")
+            files.append((local_path, f"{directory_name.rstrip('/')}/{relative_path}"))
+    return files
+
+
+def _local_download_path(remote_path, directory_name, local_directory):
+    """Ruta local de un archivo remoto, relativa a directory_name dentro de local_directory."""
+    prefix = directory_name.rstrip("/") + "/"
+    relative_path = remote_path[len(prefix):] if remote_path.startswith(prefix) else os.path.basename(remote_path)
+    return os.path.join(local_directory, *relative_path.split("/"))
+
+
+class _BufferedFileWriter:
+    """
+    Estado común de los flujos de escritura sobre DataLake: acumula bytes en memoria y los
+    escribe con append_data en un archivo temporal junto al destino. Al cerrar, un único
+    flush_data confirma el contenido y el temporal se renombra sobre el destino, de modo que
+    un archivo existente solo se reemplaza si la escritura termina; abort() borra el temporal.
+    """
+
+    def __init__(self, container_client, file_path, buffer_size: int = 8 * 1024 * 1024):
+        self.file_path = file_path
+        self.file_client = container_client.get_file_client(_temporary_path(file_path))
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+        self._offset = 0
+        self.closed = False
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self._offset + len(self._buffer)
+
+    def write(self, data):
+        self._buffer += data
+        return len(data)
+
+    def _take(self, force=False):
+        """Bytes pendientes y su offset, o None si el buffer aún no alcanza buffer_size."""
+        if not self._buffer or not (force or len(self._buffer) >= self.buffer_size):
+            return None
+        data, offset = bytes(self._buffer), self._offset
+        self._buffer.clear()
+        self._offset += len(data)
+        return data, offset
+
+    def _destination(self):
+        return f"{self.file_client.file_system_name}/{self.file_path}"
+
+    def _report_abort_error(self, error):
+        print(f"No se pudo borrar el archivo temporal '{self.file_client.path_name}': {error}")
+
+
+class _DataLakeFileWriter(_BufferedFileWriter):
+    """Flujo de escritura síncrono: write() envía los bytes en cuanto se llena el buffer."""
+
+    def __init__(self, container_client, file_path, buffer_size: int = 8 * 1024 * 1024):
+        super().__init__(container_client, file_path, buffer_size)
+        self.file_client.create_file()
+
+    def write(self, data):
+        super().write(data)
+        self.flush()
+        return len(data)
+
+    def _append(self, force=False):
+        pending = self._take(force)
+        if pending is not None:
+            data, offset = pending
+            self.file_client.append_data(data, offset=offset, length=len(data))
+
+    def flush(self):
+        # Los bytes se confirman en close(); aquí solo se vacía el buffer si está lleno
+        self._append()
+
+    def close(self):
+        if self.closed:
+            return
+        self._append(force=True)
+        self.file_client.flush_data(self._offset)
+        self.file_client.rename_file(self._destination())
+        self.closed = True
+
+    def abort(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.file_client.delete_file()
+        except Exception as e:
+            self._report_abort_error(e)
+
 
 class AzureDataLakeGen2():
-    def __init__(self, connection_string):
+    def __init__(
+        self,
+        connection_string,
+        pool_connections: int = 10,
+        pool_maxsize: int = 50,
+        connection_timeout: int = 20,
+        read_timeout: int = 60,
+        max_cached_clients: int = 1024,
+    ):
+        """
+        :param connection_string: Cadena de conexión de la cuenta de almacenamiento
+        :param pool_connections: Número de pools de conexiones HTTP que se mantienen (uno por host)
+        :param pool_maxsize: Máximo de conexiones HTTP reutilizables por pool
+        :param connection_timeout: Timeout de conexión en segundos
+        :param read_timeout: Timeout de lectura en segundos
+        :param max_cached_clients: Máximo de clientes de archivo/directorio en caché
+        """
         self.connection_string = connection_string
-        
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connection_timeout = connection_timeout
+        self.read_timeout = read_timeout
+        self.max_cached_clients = max_cached_clients
+        self.service_client = None
+        self._session = None
+        self._lock = threading.RLock()
+        self._file_system_clients = {}
+        self._path_clients = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _build_transport(self):
+        # Una sola sesión HTTP compartida por todos los clientes derivados del service client
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        return RequestsTransport(
+            session=self._session,
+            session_owner=False,
+            connection_timeout=self.connection_timeout,
+            read_timeout=self.read_timeout,
+        )
+
     def get_authenticacion(self):
-        try:
-            self.service_client = DataLakeServiceClient.from_connection_string(self.connection_string)
-            print("Autenticación exitosa")
-        except Exception as e:
-            print(f"Error en la autenticación: {e}")
-    
+        if self.service_client is not None:
+            return
+        with self._lock:
+            if self.service_client is not None:
+                return
+            try:
+                self.service_client = DataLakeServiceClient.from_connection_string(
+                    self.connection_string,
+                    transport=self._build_transport(),
+                )
+                print("Autenticación exitosa")
+            except Exception as e:
+                print(f"Error en la autenticación: {e}")
+
+    def close(self):
+        with self._lock:
+            if self.service_client is not None:
+                self.service_client.close()
+            if self._session is not None:
+                self._session.close()
+            self.service_client = None
+            self._session = None
+            self._file_system_clients.clear()
+            self._path_clients.clear()
+
+    def _get_file_system_client(self, container_name):
+        self.get_authenticacion()
+        with self._lock:
+            container_client = self._file_system_clients.get(container_name)
+            if container_client is None:
+                container_client = self.service_client.get_file_system_client(container_name)
+                self._file_system_clients[container_name] = container_client
+            return container_client
+
+    def _get_path_client(self, kind, container_name, path):
+        key = (kind, container_name, path)
+        with self._lock:
+            client = self._path_clients.get(key)
+            if client is not None:
+                self._path_clients.move_to_end(key)
+                return client
+        container_client = self._get_file_system_client(container_name)
+        if kind == "file":
+            client = container_client.get_file_client(path)
+        else:
+            client = container_client.get_directory_client(path)
+        with self._lock:
+            self._path_clients[key] = client
+            while len(self._path_clients) > self.max_cached_clients:
+                self._path_clients.popitem(last=False)
+        return client
+
+    def _get_file_client(self, container_name, file_path):
+        return self._get_path_client("file", container_name, file_path)
+
+    def _get_directory_client(self, container_name, directory_name):
+        return self._get_path_client("directory", container_name, directory_name)
+
     def create_container(self, container_name):
         try:
             self.get_authenticacion()
@@ -28,7 +371,7 @@ class AzureDataLakeGen2():
     def create_or_replace_container(self, container_name):
         try:
             self.get_authenticacion()
-            if self.service_client.get_file_system_client(container_name).exists():
+            if self._get_file_system_client(container_name).exists():
                 print(f"El contenedor '{container_name}' ya existe")
             else:
                 container_client = self.service_client.create_file_system(container_name)
@@ -45,43 +388,151 @@ class AzureDataLakeGen2():
         except Exception as e:
             print(f"Error al eliminar el contenedor: {e}")
 
+    def iter_containers(self):
+        """Nombres de los contenedores (file systems) de la cuenta, paginados por el SDK."""
+        self.get_authenticacion()
+        for container in self.service_client.list_file_systems():
+            yield container.name
+
+    def iter_path_pages(
+        self,
+        container_name,
+        directory_name=None,
+        recursive: bool = True,
+        max_results: int = 5000,
+        prefix: str = None,
+        files_only: bool = False,
+        continuation_token: str = None,
+    ):
+        """
+        Listado paginado de rutas: genera (lista de PathRecord, continuation_token) por página.
+        El token de cada página permite reanudar el listado desde la siguiente página
+        (None en la última).
+        :param directory_name: Directorio a listar (None = raíz del contenedor)
+        :param recursive: Incluir subdirectorios a cualquier profundidad
+        :param max_results: Rutas por página (tamaño de cada petición al servicio)
+        :param prefix: Prefijo de nombre, relativo a directory_name
+        :param files_only: Omitir los directorios
+        :param continuation_token: Token devuelto por una página anterior
+        """
+        container_client = self._get_file_system_client(container_name)
+        path, full_prefix = _split_prefix(directory_name, prefix)
+        pages = container_client.get_paths(path=path, recursive=recursive, max_results=max_results).by_page(
+            continuation_token=continuation_token
+        )
+        for page in pages:
+            records = [
+                _to_path_record(item)
+                for item in page
+                if not (files_only and item.is_directory)
+                and (full_prefix is None or item.name.startswith(full_prefix))
+            ]
+            yield records, pages.continuation_token
+
+    def iter_paths(self, container_name, directory_name=None, **kwargs):
+        """
+        Genera PathRecord de cada ruta sin cargar el listado completo en memoria.
+        Acepta los mismos argumentos que iter_path_pages.
+        """
+        for records, _ in self.iter_path_pages(container_name, directory_name, **kwargs):
+            yield from records
+
+    def iter_paths_parallel(
+        self,
+        container_name,
+        directory_name=None,
+        max_workers: int = 8,
+        max_results: int = 5000,
+        files_only: bool = False,
+        queue_size: int = 100,
+    ):
+        """
+        Listado recursivo repartido entre los subdirectorios de primer nivel: cada uno se
+        lista en su propio hilo y las páginas se generan a medida que llegan (sin orden
+        garantizado). La cola acotada frena a los hilos si el consumidor es más lento.
+        """
+        top_level = list(self.iter_paths(container_name, directory_name, recursive=False, max_results=max_results))
+        for record in top_level:
+            if not (files_only and record.is_directory):
+                yield record
+        subdirectories = [record.name for record in top_level if record.is_directory]
+        if not subdirectories:
+            return
+
+        pages = queue.Queue(maxsize=queue_size)
+        done = object()
+        stop = threading.Event()
+
+        def list_subdirectory(name):
+            try:
+                for records, _ in self.iter_path_pages(
+                    container_name, name, recursive=True, max_results=max_results, files_only=files_only
+                ):
+                    if stop.is_set():
+                        return
+                    pages.put(records)
+            except Exception as e:
+                pages.put(e)
+            finally:
+                pages.put(done)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for name in subdirectories:
+                executor.submit(list_subdirectory, name)
+            pending = len(subdirectories)
+            try:
+                while pending:
+                    item = pages.get()
+                    if item is done:
+                        pending -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield from item
+            finally:
+                # Consumidor detenido o error: liberar a los hilos bloqueados en la cola
+                stop.set()
+                while pending:
+                    if pages.get() is done:
+                        pending -= 1
+
     def list_containers(self):
         try:
-            self.get_authenticacion()
-            containers = self.service_client.list_file_systems()
-            for container in containers:
-                print(container.name)
+            names = list(self.iter_containers())
+            for name in names:
+                print(name)
+            return names
         except Exception as e:
             print(f"Error al listar los contenedores: {e}")
-    
+            return []
+
     def list_directories(self, container_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            paths = container_client.get_paths()
-            for path in paths:
-                print(path.name)
+            names = [record.name for record in self.iter_paths(container_name)]
+            for name in names:
+                print(name)
+            return names
         except ResourceNotFoundError:
             print(f"El contenedor '{container_name}' no existe")
         except Exception as e:
             print(f"Error al listar los directorios: {e}")
+        return []
 
     def list_files(self, container_name, directory_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            paths = container_client.get_paths(path=directory_name)
-            for path in paths:
-                print(path.name)
+            names = [record.name for record in self.iter_paths(container_name, directory_name)]
+            for name in names:
+                print(name)
+            return names
         except ResourceNotFoundError:
             print(f"El contenedor '{container_name}' o el directorio '{directory_name}' no existe")
         except Exception as e:
             print(f"Error al listar los archivos: {e}")
+        return []
 
     def create_directory(self, container_name, directory_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
+            container_client = self._get_file_system_client(container_name)
             directory_client = container_client.create_directory(directory_name)
             print(f"Directorio '{directory_name}' creado exitosamente en el contenedor '{container_name}'")
         except ResourceExistsError:
@@ -93,9 +544,8 @@ class AzureDataLakeGen2():
     
     def create_or_replace_directory(self, container_name, directory_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            directory_client = container_client.get_directory_client(directory_name)
+            container_client = self._get_file_system_client(container_name)
+            directory_client = self._get_directory_client(container_name, directory_name)
             if directory_client.exists():
                 print(f"El directorio '{directory_name}' ya existe en el contenedor '{container_name}'")
             else:
@@ -108,8 +558,7 @@ class AzureDataLakeGen2():
 
     def create_hierarchical_directory(self, container_name, directory_path: list):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
+            container_client = self._get_file_system_client(container_name)
             directory_client = container_client.create_directory(directory_path)
             print(f"Directorio jerárquico '{directory_path}' creado exitosamente en el contenedor '{container_name}'")
         except ResourceExistsError:
@@ -121,9 +570,7 @@ class AzureDataLakeGen2():
 
     def delete_directory(self, container_name, directory_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            directory_client = container_client.get_directory_client(directory_name)
+            directory_client = self._get_directory_client(container_name, directory_name)
             directory_client.delete_directory()
             print(f"Directorio '{directory_name}' eliminado exitosamente del contenedor '{container_name}'")
         except ResourceNotFoundError:
@@ -131,27 +578,116 @@ class AzureDataLakeGen2():
         except Exception as e:
             print(f"Error al eliminar el directorio: {e}")
 
-    def get_empty_directory(self, container_name, directory_name):
+    def _delete_file_quietly(self, container_client, file_path):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            directory_client = container_client.get_directory_client(directory_name)
-            paths = container_client.get_paths(path=directory_name)
-            for path in paths:
-                if not path.is_directory:
-                    file_client = container_client.get_file_client(path.name)
-                    file_client.delete_file()
-            print(f"Directorio '{directory_name}' vaciado exitosamente en el contenedor '{container_name}'")
+            container_client.get_file_client(file_path).delete_file()
+            return None
+        except ResourceNotFoundError:
+            # Ya no existe: el objetivo de vaciar el directorio se cumple igualmente
+            return None
+        except Exception as e:
+            return f"{file_path}: {e}"
+
+    def _delete_files_concurrently(self, container_client, directory_name, max_workers, batch_size):
+        deleted = 0
+        errors = []
+        batch = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+            def run_batch():
+                nonlocal deleted
+                for error in executor.map(lambda name: self._delete_file_quietly(container_client, name), batch):
+                    if error is None:
+                        deleted += 1
+                    else:
+                        errors.append(error)
+                batch.clear()
+
+            # El listado se consume por lotes para no cargar todas las rutas en memoria
+            for path in container_client.get_paths(path=directory_name):
+                if path.is_directory:
+                    continue
+                batch.append(path.name)
+                if len(batch) >= batch_size:
+                    run_batch()
+            run_batch()
+        return deleted, errors
+
+    def _recreate_directory(self, container_client, directory_name, report, attempts: int = 3):
+        """
+        Vuelve a crear el directorio tras el borrado recursivo, con reintentos. Si no es posible,
+        el directorio ya no existe: se registra en el reporte (recreated=False) en lugar de
+        darlo por vaciado.
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                container_client.create_directory(directory_name)
+                report["recreated"] = True
+                return
+            except ResourceExistsError:
+                report["recreated"] = True
+                return
+            except Exception as e:
+                error = e
+                if attempt < attempts:
+                    time.sleep(2 ** (attempt - 1))
+        _record_recreate_failure(report, directory_name, error)
+
+    def get_empty_directory(
+        self,
+        container_name,
+        directory_name,
+        fast_clear: bool = False,
+        count_files: bool = False,
+        max_workers: int = 16,
+        batch_size: int = 500,
+    ):
+        """
+        Vacía un directorio del contenedor: por defecto borra sus archivos y conserva los subdirectorios.
+        :param fast_clear: Borra el directorio de forma recursiva en el servidor y lo vuelve a crear.
+                           Elimina también los subdirectorios y las ACL propias del directorio.
+                           Si no es posible, se recurre al borrado archivo por archivo.
+        :param count_files: En el modo recursivo, cuenta los archivos con un listado paginado antes
+                            del borrado para reportar deleted_files y files_per_second
+        :param max_workers: Borrados concurrentes en el modo archivo por archivo
+        :param batch_size: Rutas listadas que se procesan por lote en el modo archivo por archivo
+        :return: Reporte con el modo usado, archivos borrados, errores y throughput. En el modo
+                 recursivo, "recreated" indica si el directorio se pudo volver a crear.
+        """
+        start = time.perf_counter()
+        report = _new_clear_report()
+        try:
+            container_client = self._get_file_system_client(container_name)
+            directory_client = self._get_directory_client(container_name, directory_name)
+            if fast_clear and directory_name.strip("/"):
+                file_count = None
+                if count_files:
+                    file_count = sum(
+                        len(records)
+                        for records, _ in self.iter_path_pages(container_name, directory_name, files_only=True)
+                    )
+                try:
+                    directory_client.delete_directory()
+                    report.update(mode="recursive", deleted_files=file_count)
+                except ResourceNotFoundError:
+                    raise
+                except Exception as e:
+                    print(f"No se pudo vaciar el directorio de forma recursiva, se borrará archivo por archivo: {e}")
+                if report["mode"] == "recursive":
+                    self._recreate_directory(container_client, directory_name, report)
+            if report["mode"] is None:
+                deleted, errors = self._delete_files_concurrently(container_client, directory_name, max_workers, batch_size)
+                report.update(mode="per_file", deleted_files=deleted, failed_files=len(errors), errors=errors)
+            _finish_clear_report(report, start, container_name, directory_name)
         except ResourceNotFoundError:
             print(f"El contenedor '{container_name}' o el directorio '{directory_name}' no existe")
         except Exception as e:
             print(f"Error al vaciar el directorio: {e}")
-    
+        return report
+
     def delete_file(self, container_name, file_path):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            file_client = container_client.get_file_client(file_path)
+            file_client = self._get_file_client(container_name, file_path)
             file_client.delete_file()
             print(f"Archivo '{file_path}' eliminado exitosamente del contenedor '{container_name}'")
         except ResourceNotFoundError:
@@ -161,9 +697,7 @@ class AzureDataLakeGen2():
     
     def file_exists(self, container_name, file_path):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            file_client = container_client.get_file_client(file_path)
+            file_client = self._get_file_client(container_name, file_path)
             exists = file_client.exists()
             if exists:
                 print(f"El archivo '{file_path}' existe en el contenedor '{container_name}'")
@@ -177,28 +711,59 @@ class AzureDataLakeGen2():
             print(f"Error al verificar la existencia del archivo: {e}")
             return False
         
-    def to_csv_file(self, container_name, file_path, dataframe):
+    def write_dataframe(
+        self,
+        container_name,
+        file_path,
+        dataframe,
+        file_format: str = "csv",
+        chunk_rows: int = 100000,
+        compression: str = "snappy",
+        buffer_size: int = 8 * 1024 * 1024,
+        encoding: str = "utf-8",
+    ):
+        """
+        Escribe un DataFrame en el contenedor por bloques de filas, sin materializar el archivo completo en memoria.
+        :param file_format: 'csv' o 'parquet'
+        :param chunk_rows: Filas codificadas por bloque (en parquet, filas por row group)
+        :param compression: Compresión de columnas para parquet (snappy | zstd | gzip | none)
+        :param buffer_size: Bytes acumulados antes de cada append al servicio
+        :return: Bytes escritos, o None si hubo un error (el archivo existente queda intacto)
+        """
+        writer = None
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            file_client = container_client.get_file_client(file_path)            
-            csv_data = dataframe.to_csv(index=False).encode('utf-8')
-            if self.file_exists(container_name, file_path):
-                self.delete_file(container_name, file_path)
-            else:
-                pass
-            file_client.upload_data(csv_data, overwrite=True)
+            if file_format not in _WRITE_FORMATS:
+                raise ValueError(f"Formato no soportado: {file_format}")
+            writer = _DataLakeFileWriter(self._get_file_system_client(container_name), file_path, buffer_size=buffer_size)
+            for _ in _encode_dataframe(writer, dataframe, file_format, chunk_rows, compression, encoding):
+                writer.flush()
+            writer.close()
             print(f"Archivo '{file_path}' subido exitosamente al contenedor '{container_name}'")
+            return writer.tell()
         except ResourceNotFoundError:
             print(f"El contenedor '{container_name}' no existe")
         except Exception as e:
             print(f"Error al subir el archivo: {e}")
-            
+        if writer is not None:
+            writer.abort()
+        return None
+
+    def to_csv_file(self, container_name, file_path, dataframe, chunk_rows: int = 100000):
+        return self.write_dataframe(container_name, file_path, dataframe, file_format="csv", chunk_rows=chunk_rows)
+
+    def to_parquet_file(self, container_name, file_path, dataframe, chunk_rows: int = 100000, compression: str = "snappy"):
+        return self.write_dataframe(
+            container_name,
+            file_path,
+            dataframe,
+            file_format="parquet",
+            chunk_rows=chunk_rows,
+            compression=compression,
+        )
+
     def get_updated_date_file(self, container_name, file_path):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            file_client = container_client.get_file_client(file_path)
+            file_client = self._get_file_client(container_name, file_path)
             properties = file_client.get_file_properties()
             last_modified = properties.last_modified
             print(f"El archivo '{file_path}' fue modificado por última vez el {last_modified}")
@@ -212,9 +777,7 @@ class AzureDataLakeGen2():
 
     def download_file(self, container_name, file_path, download_path):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            file_client = container_client.get_file_client(file_path)
+            file_client = self._get_file_client(container_name, file_path)
             download = file_client.download_file()
             with open(download_path, "wb") as local_file:
                 download.readinto(local_file)
@@ -223,12 +786,147 @@ class AzureDataLakeGen2():
             print(f"El contenedor '{container_name}' o el archivo '{file_path}' no existe")
         except Exception as e:
             print(f"Error al descargar el archivo: {e}")
+
+    def read_file(self, container_name, file_path):
+        """
+        Devuelve el contenido completo de un archivo (bytes). A diferencia de download_file,
+        los errores se propagan para que el llamador decida cómo tratarlos.
+        """
+        file_client = self._get_file_client(container_name, file_path)
+        return file_client.download_file().readall()
     
+    def _upload_one(self, container_name, local_path, remote_path, max_concurrency, chunk_size):
+        # Cliente sin caché: en cargas masivas desplazaría del LRU a los clientes más usados
+        file_client = self._get_file_system_client(container_name).get_file_client(remote_path)
+        size = os.path.getsize(local_path)
+        with open(local_path, "rb") as data:
+            file_client.upload_data(
+                data,
+                length=size,
+                overwrite=True,
+                max_concurrency=max_concurrency,
+                chunk_size=chunk_size,
+            )
+        return size
+
+    def _download_one(self, container_name, remote_path, local_path, max_concurrency):
+        file_client = self._get_file_system_client(container_name).get_file_client(remote_path)
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        download = file_client.download_file(max_concurrency=max_concurrency)
+        # Se escribe a un temporal para no dejar archivos a medias si falla un reintento
+        partial_path = f"{local_path}.partial"
+        try:
+            with open(partial_path, "wb") as local_file:
+                size = download.readinto(local_file)
+            os.replace(partial_path, local_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return size
+
+    def _transfer_with_retry(self, transfer, source, destination, max_retries, retry_backoff):
+        start = time.perf_counter()
+        attempts = 0
+        error = None
+        while True:
+            attempts += 1
+            try:
+                size = transfer(source, destination)
+                return _transfer_result(source, destination, start, attempts, size=size)
+            except ResourceNotFoundError as e:
+                # No tiene sentido reintentar un recurso inexistente
+                error = e
+                break
+            except Exception as e:
+                error = e
+                if attempts > max_retries:
+                    break
+                time.sleep(retry_backoff * 2 ** (attempts - 1))
+        return _transfer_result(source, destination, start, attempts, error=error)
+
+    def _run_transfers(self, pairs, transfer, max_workers, max_retries, retry_backoff):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._transfer_with_retry, transfer, source, destination, max_retries, retry_backoff)
+                for source, destination in pairs
+            ]
+            results = [future.result() for future in futures]
+        return _transfer_report(results, time.perf_counter() - start)
+
+    def upload_many(
+        self,
+        container_name,
+        files,
+        max_workers: int = 8,
+        max_concurrency: int = 4,
+        chunk_size: int = 4 * 1024 * 1024,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Sube varios archivos locales en paralelo.
+        :param files: Lista de tuplas (ruta_local, ruta_en_el_contenedor)
+        :param max_workers: Archivos transferidos simultáneamente
+        :param max_concurrency: Bloques transferidos en paralelo dentro de cada archivo grande
+        :param chunk_size: Tamaño de bloque para la transferencia por bloques
+        :return: Reporte con el resultado de cada archivo
+        """
+        self.get_authenticacion()
+
+        def transfer(local_path, remote_path):
+            return self._upload_one(container_name, local_path, remote_path, max_concurrency, chunk_size)
+
+        return self._run_transfers(files, transfer, max_workers, max_retries, retry_backoff)
+
+    def download_many(
+        self,
+        container_name,
+        files,
+        max_workers: int = 8,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Descarga varios archivos del contenedor en paralelo. El tamaño de bloque de las
+        descargas lo fija la configuración del cliente (max_chunk_get_size).
+        :param files: Lista de tuplas (ruta_en_el_contenedor, ruta_local)
+        :param max_concurrency: Bloques descargados en paralelo dentro de cada archivo grande
+        :return: Reporte con el resultado de cada archivo
+        """
+        self.get_authenticacion()
+
+        def transfer(remote_path, local_path):
+            return self._download_one(container_name, remote_path, local_path, max_concurrency)
+
+        return self._run_transfers(files, transfer, max_workers, max_retries, retry_backoff)
+
+    def upload_directory(self, container_name, local_directory, directory_name, **kwargs):
+        """
+        Sube recursivamente un directorio local, conservando su estructura bajo directory_name.
+        Acepta los mismos parámetros opcionales que upload_many.
+        """
+        files = _local_upload_pairs(local_directory, directory_name)
+        return self.upload_many(container_name, files, **kwargs)
+
+    def download_directory(self, container_name, directory_name, local_directory, **kwargs):
+        """
+        Descarga recursivamente un directorio del contenedor, conservando su estructura en local_directory.
+        Acepta los mismos parámetros opcionales que download_many.
+        """
+        container_client = self._get_file_system_client(container_name)
+        files = [
+            (path.name, _local_download_path(path.name, directory_name, local_directory))
+            for path in container_client.get_paths(path=directory_name, recursive=True)
+            if not path.is_directory
+        ]
+        return self.download_many(container_name, files, **kwargs)
+
     def grant_access_directory(self, container_name, directory_name, permission, expiry_time):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
-            directory_client = container_client.get_directory_client(directory_name)
+            directory_client = self._get_directory_client(container_name, directory_name)
             sas_token = directory_client.generate_shared_access_signature(permission=permission, expiry=expiry_time)
             print(f"SAS token generado exitosamente para el directorio '{directory_name}': {sas_token}")
             return sas_token
@@ -241,8 +939,7 @@ class AzureDataLakeGen2():
         
     def change_anonymous_access_container(self, container_name):
         try:
-            self.get_authenticacion()
-            container_client = self.service_client.get_file_system_client(container_name)
+            container_client = self._get_file_system_client(container_name)
             container_client.set_file_system_access_policy(
                 signed_identifiers = {},
                 public_access="container"
@@ -252,4 +949,588 @@ class AzureDataLakeGen2():
         except ResourceNotFoundError:
             print(f"El contenedor '{container_name}' no existe")
         except Exception as e:
-            print(f"Error al cambiar el nivel de acceso anónimo: {e}")
\ No newline at end of file
+            print(f"Error al cambiar el nivel de acceso anónimo: {e}")
+
+
+class _AsyncDataLakeFileWriter(_BufferedFileWriter):
+    """
+    Flujo de escritura asíncrono: write() solo acumula en memoria (lo usan pandas y
+    pyarrow de forma síncrona) y drain()/close() envían los bytes al servicio.
+    """
+
+    async def create(self):
+        await self.file_client.create_file()
+
+    def flush(self):
+        pass
+
+    async def drain(self, force: bool = False):
+        pending = self._take(force)
+        if pending is not None:
+            data, offset = pending
+            await self.file_client.append_data(data, offset=offset, length=len(data))
+
+    async def close(self):
+        if self.closed:
+            return
+        await self.drain(force=True)
+        await self.file_client.flush_data(self._offset)
+        await self.file_client.rename_file(self._destination())
+        self.closed = True
+
+    async def abort(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self.file_client.delete_file()
+        except Exception as e:
+            self._report_abort_error(e)
+
+
+class AsyncAzureDataLakeGen2():
+    """
+    Versión asyncio de AzureDataLakeGen2 sobre los clientes `.aio` del SDK.
+    Se autentica con la cadena de conexión o con account_url + una credencial asíncrona
+    (por ejemplo AzureAuthHelper.get_async_credential()).
+    """
+
+    def __init__(
+        self,
+        connection_string=None,
+        account_url=None,
+        credential=None,
+        pool_maxsize: int = 100,
+        connection_timeout: int = 20,
+        read_timeout: int = 60,
+    ):
+        if connection_string is None and account_url is None:
+            raise ValueError("Se requiere connection_string o account_url")
+        self.connection_string = connection_string
+        self.account_url = account_url
+        self.credential = credential
+        self.pool_maxsize = pool_maxsize
+        self.connection_timeout = connection_timeout
+        self.read_timeout = read_timeout
+        self.service_client = None
+        self._session = None
+        self._lock = asyncio.Lock()
+        self._file_system_clients = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _build_transport(self):
+        import aiohttp
+
+        self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_maxsize))
+        return AioHttpTransport(
+            session=self._session,
+            session_owner=False,
+            connection_timeout=self.connection_timeout,
+            read_timeout=self.read_timeout,
+        )
+
+    async def get_authenticacion(self):
+        if self.service_client is not None:
+            return
+        async with self._lock:
+            if self.service_client is not None:
+                return
+            try:
+                if self.connection_string:
+                    self.service_client = AsyncDataLakeServiceClient.from_connection_string(
+                        self.connection_string,
+                        transport=self._build_transport(),
+                    )
+                else:
+                    self.service_client = AsyncDataLakeServiceClient(
+                        self.account_url,
+                        credential=self.credential,
+                        transport=self._build_transport(),
+                    )
+                print("Autenticación exitosa")
+            except Exception as e:
+                print(f"Error en la autenticación: {e}")
+
+    async def close(self):
+        if self.service_client is not None:
+            await self.service_client.close()
+        if self._session is not None:
+            await self._session.close()
+        self.service_client = None
+        self._session = None
+        self._file_system_clients.clear()
+
+    async def _get_file_system_client(self, container_name):
+        await self.get_authenticacion()
+        container_client = self._file_system_clients.get(container_name)
+        if container_client is None:
+            container_client = self.service_client.get_file_system_client(container_name)
+            self._file_system_clients[container_name] = container_client
+        return container_client
+
+    async def _get_file_client(self, container_name, file_path):
+        return (await self._get_file_system_client(container_name)).get_file_client(file_path)
+
+    async def _get_directory_client(self, container_name, directory_name):
+        return (await self._get_file_system_client(container_name)).get_directory_client(directory_name)
+
+    async def create_container(self, container_name):
+        try:
+            await self.get_authenticacion()
+            await self.service_client.create_file_system(container_name)
+            print(f"Contenedor '{container_name}' creado exitosamente")
+        except ResourceExistsError:
+            print(f"El contenedor '{container_name}' ya existe")
+        except Exception as e:
+            print(f"Error al crear el contenedor: {e}")
+
+    async def create_or_replace_container(self, container_name):
+        try:
+            if await (await self._get_file_system_client(container_name)).exists():
+                print(f"El contenedor '{container_name}' ya existe")
+            else:
+                await self.service_client.create_file_system(container_name)
+        except Exception as e:
+            print(f"Error al crear o reemplazar el contenedor: {e}")
+
+    async def delete_container(self, container_name):
+        try:
+            await self.get_authenticacion()
+            await self.service_client.delete_file_system(container_name)
+            print(f"Contenedor '{container_name}' eliminado exitosamente")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al eliminar el contenedor: {e}")
+
+    async def list_containers(self):
+        try:
+            await self.get_authenticacion()
+            names = [container.name async for container in self.service_client.list_file_systems()]
+            for name in names:
+                print(name)
+            return names
+        except Exception as e:
+            print(f"Error al listar los contenedores: {e}")
+            return []
+
+    async def list_directories(self, container_name):
+        try:
+            names = [record.name async for record in self.iter_paths(container_name)]
+            for name in names:
+                print(name)
+            return names
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al listar los directorios: {e}")
+        return []
+
+    async def list_files(self, container_name, directory_name):
+        try:
+            names = [record.name async for record in self.iter_paths(container_name, directory_name)]
+            for name in names:
+                print(name)
+            return names
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el directorio '{directory_name}' no existe")
+        except Exception as e:
+            print(f"Error al listar los archivos: {e}")
+        return []
+
+    async def create_directory(self, container_name, directory_name):
+        try:
+            container_client = await self._get_file_system_client(container_name)
+            await container_client.create_directory(directory_name)
+            print(f"Directorio '{directory_name}' creado exitosamente en el contenedor '{container_name}'")
+        except ResourceExistsError:
+            print(f"El directorio '{directory_name}' ya existe en el contenedor '{container_name}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al crear el directorio: {e}")
+
+    async def create_or_replace_directory(self, container_name, directory_name):
+        try:
+            container_client = await self._get_file_system_client(container_name)
+            if await container_client.get_directory_client(directory_name).exists():
+                print(f"El directorio '{directory_name}' ya existe en el contenedor '{container_name}'")
+            else:
+                await container_client.create_directory(directory_name)
+                print(f"Directorio '{directory_name}' creado exitosamente en el contenedor '{container_name}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al crear o reemplazar el directorio: {e}")
+
+    async def create_hierarchical_directory(self, container_name, directory_path: list):
+        try:
+            container_client = await self._get_file_system_client(container_name)
+            await container_client.create_directory(directory_path)
+            print(f"Directorio jerárquico '{directory_path}' creado exitosamente en el contenedor '{container_name}'")
+        except ResourceExistsError:
+            print(f"El directorio jerárquico '{directory_path}' ya existe en el contenedor '{container_name}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al crear el directorio jerárquico: {e}")
+
+    async def delete_directory(self, container_name, directory_name):
+        try:
+            directory_client = await self._get_directory_client(container_name, directory_name)
+            await directory_client.delete_directory()
+            print(f"Directorio '{directory_name}' eliminado exitosamente del contenedor '{container_name}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el directorio '{directory_name}' no existe")
+        except Exception as e:
+            print(f"Error al eliminar el directorio: {e}")
+
+    async def _delete_file_quietly(self, container_client, file_path, semaphore):
+        async with semaphore:
+            try:
+                await container_client.get_file_client(file_path).delete_file()
+                return None
+            except ResourceNotFoundError:
+                return None
+            except Exception as e:
+                return f"{file_path}: {e}"
+
+    async def _recreate_directory(self, container_client, directory_name, report, attempts: int = 3):
+        """Mismo comportamiento que AzureDataLakeGen2._recreate_directory."""
+        for attempt in range(1, attempts + 1):
+            try:
+                await container_client.create_directory(directory_name)
+                report["recreated"] = True
+                return
+            except ResourceExistsError:
+                report["recreated"] = True
+                return
+            except Exception as e:
+                error = e
+                if attempt < attempts:
+                    await asyncio.sleep(2 ** (attempt - 1))
+        _record_recreate_failure(report, directory_name, error)
+
+    async def get_empty_directory(
+        self,
+        container_name,
+        directory_name,
+        fast_clear: bool = False,
+        count_files: bool = False,
+        max_concurrency: int = 64,
+        batch_size: int = 500,
+    ):
+        """
+        Vacía un directorio del contenedor. Mismo comportamiento y reporte que
+        AzureDataLakeGen2.get_empty_directory, con borrados concurrentes en el event loop.
+        """
+        start = time.perf_counter()
+        report = _new_clear_report()
+        try:
+            container_client = await self._get_file_system_client(container_name)
+            if fast_clear and directory_name.strip("/"):
+                file_count = None
+                if count_files:
+                    file_count = 0
+                    async for _ in self.iter_paths(container_name, directory_name, files_only=True):
+                        file_count += 1
+                try:
+                    await container_client.get_directory_client(directory_name).delete_directory()
+                    report.update(mode="recursive", deleted_files=file_count)
+                except ResourceNotFoundError:
+                    raise
+                except Exception as e:
+                    print(f"No se pudo vaciar el directorio de forma recursiva, se borrará archivo por archivo: {e}")
+                if report["mode"] == "recursive":
+                    await self._recreate_directory(container_client, directory_name, report)
+            if report["mode"] is None:
+                semaphore = asyncio.Semaphore(max_concurrency)
+                deleted = 0
+                errors = []
+                batch = []
+
+                async def run_batch():
+                    nonlocal deleted
+                    for error in await asyncio.gather(*(self._delete_file_quietly(container_client, name, semaphore) for name in batch)):
+                        if error is None:
+                            deleted += 1
+                        else:
+                            errors.append(error)
+                    batch.clear()
+
+                async for path in container_client.get_paths(path=directory_name):
+                    if path.is_directory:
+                        continue
+                    batch.append(path.name)
+                    if len(batch) >= batch_size:
+                        await run_batch()
+                await run_batch()
+                report.update(mode="per_file", deleted_files=deleted, failed_files=len(errors), errors=errors)
+            _finish_clear_report(report, start, container_name, directory_name)
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el directorio '{directory_name}' no existe")
+        except Exception as e:
+            print(f"Error al vaciar el directorio: {e}")
+        return report
+
+    async def delete_file(self, container_name, file_path):
+        try:
+            file_client = await self._get_file_client(container_name, file_path)
+            await file_client.delete_file()
+            print(f"Archivo '{file_path}' eliminado exitosamente del contenedor '{container_name}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el archivo '{file_path}' no existe")
+        except Exception as e:
+            print(f"Error al eliminar el archivo: {e}")
+
+    async def file_exists(self, container_name, file_path):
+        try:
+            file_client = await self._get_file_client(container_name, file_path)
+            exists = await file_client.exists()
+            if exists:
+                print(f"El archivo '{file_path}' existe en el contenedor '{container_name}'")
+            else:
+                print(f"El archivo '{file_path}' no existe en el contenedor '{container_name}'")
+            return exists
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+            return False
+        except Exception as e:
+            print(f"Error al verificar la existencia del archivo: {e}")
+            return False
+
+    async def write_dataframe(
+        self,
+        container_name,
+        file_path,
+        dataframe,
+        file_format: str = "csv",
+        chunk_rows: int = 100000,
+        compression: str = "snappy",
+        buffer_size: int = 8 * 1024 * 1024,
+        encoding: str = "utf-8",
+    ):
+        """
+        Escribe un DataFrame por bloques de filas. Mismos parámetros que AzureDataLakeGen2.write_dataframe.
+        :return: Bytes escritos, o None si hubo un error (el archivo existente queda intacto)
+        """
+        writer = None
+        try:
+            if file_format not in _WRITE_FORMATS:
+                raise ValueError(f"Formato no soportado: {file_format}")
+            container_client = await self._get_file_system_client(container_name)
+            writer = _AsyncDataLakeFileWriter(container_client, file_path, buffer_size=buffer_size)
+            await writer.create()
+            for _ in _encode_dataframe(writer, dataframe, file_format, chunk_rows, compression, encoding):
+                await writer.drain()
+            await writer.close()
+            print(f"Archivo '{file_path}' subido exitosamente al contenedor '{container_name}'")
+            return writer.tell()
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al subir el archivo: {e}")
+        if writer is not None:
+            await writer.abort()
+        return None
+
+    async def to_csv_file(self, container_name, file_path, dataframe, chunk_rows: int = 100000):
+        return await self.write_dataframe(container_name, file_path, dataframe, file_format="csv", chunk_rows=chunk_rows)
+
+    async def to_parquet_file(self, container_name, file_path, dataframe, chunk_rows: int = 100000, compression: str = "snappy"):
+        return await self.write_dataframe(
+            container_name,
+            file_path,
+            dataframe,
+            file_format="parquet",
+            chunk_rows=chunk_rows,
+            compression=compression,
+        )
+
+    async def get_updated_date_file(self, container_name, file_path):
+        try:
+            file_client = await self._get_file_client(container_name, file_path)
+            properties = await file_client.get_file_properties()
+            last_modified = properties.last_modified
+            print(f"El archivo '{file_path}' fue modificado por última vez el {last_modified}")
+            return last_modified
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el archivo '{file_path}' no existe")
+            return None
+        except Exception as e:
+            print(f"Error al obtener la fecha de actualización del archivo: {e}")
+            return None
+
+    async def download_file(self, container_name, file_path, download_path):
+        try:
+            file_client = await self._get_file_client(container_name, file_path)
+            download = await file_client.download_file()
+            with open(download_path, "wb") as local_file:
+                await download.readinto(local_file)
+            print(f"Archivo '{file_path}' descargado exitosamente a '{download_path}'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' o el archivo '{file_path}' no existe")
+        except Exception as e:
+            print(f"Error al descargar el archivo: {e}")
+
+    async def read_file(self, container_name, file_path):
+        """
+        Devuelve el contenido completo de un archivo (bytes). A diferencia de download_file,
+        los errores se propagan para que el llamador decida cómo tratarlos.
+        """
+        file_client = await self._get_file_client(container_name, file_path)
+        download = await file_client.download_file()
+        return await download.readall()
+
+    async def iter_paths(
+        self,
+        container_name,
+        directory_name=None,
+        recursive: bool = True,
+        max_results: int = 5000,
+        prefix: str = None,
+        files_only: bool = False,
+    ):
+        """Genera PathRecord de cada ruta (mismos argumentos que AzureDataLakeGen2.iter_path_pages)."""
+        container_client = await self._get_file_system_client(container_name)
+        path, full_prefix = _split_prefix(directory_name, prefix)
+        async for item in container_client.get_paths(path=path, recursive=recursive, max_results=max_results):
+            if files_only and item.is_directory:
+                continue
+            if full_prefix is None or item.name.startswith(full_prefix):
+                yield _to_path_record(item)
+
+    async def list_file_paths(self, container_name, directory_name):
+        """Rutas de todos los archivos bajo un directorio (recursivo, sin directorios)."""
+        return [record.name async for record in self.iter_paths(container_name, directory_name, files_only=True)]
+
+    async def _upload_one(self, container_name, local_path, remote_path, max_concurrency, chunk_size):
+        file_client = await self._get_file_client(container_name, remote_path)
+        size = os.path.getsize(local_path)
+        with open(local_path, "rb") as data:
+            await file_client.upload_data(
+                data,
+                length=size,
+                overwrite=True,
+                max_concurrency=max_concurrency,
+                chunk_size=chunk_size,
+            )
+        return size
+
+    async def _download_one(self, container_name, remote_path, local_path, max_concurrency):
+        file_client = await self._get_file_client(container_name, remote_path)
+        os.makedirs(os.path.dirname(local_path) or ".", exist_ok=True)
+        download = await file_client.download_file(max_concurrency=max_concurrency)
+        partial_path = f"{local_path}.partial"
+        try:
+            with open(partial_path, "wb") as local_file:
+                size = await download.readinto(local_file)
+            os.replace(partial_path, local_path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return size
+
+    async def _transfer_with_retry(self, transfer, source, destination, semaphore, max_retries, retry_backoff):
+        async with semaphore:
+            start = time.perf_counter()
+            attempts = 0
+            error = None
+            while True:
+                attempts += 1
+                try:
+                    size = await transfer(source, destination)
+                    return _transfer_result(source, destination, start, attempts, size=size)
+                except ResourceNotFoundError as e:
+                    error = e
+                    break
+                except Exception as e:
+                    error = e
+                    if attempts > max_retries:
+                        break
+                    await asyncio.sleep(retry_backoff * 2 ** (attempts - 1))
+            return _transfer_result(source, destination, start, attempts, error=error)
+
+    async def _run_transfers(self, pairs, transfer, max_workers, max_retries, retry_backoff):
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(max_workers)
+        results = await asyncio.gather(
+            *(
+                self._transfer_with_retry(transfer, source, destination, semaphore, max_retries, retry_backoff)
+                for source, destination in pairs
+            )
+        )
+        return _transfer_report(results, time.perf_counter() - start)
+
+    async def upload_many(
+        self,
+        container_name,
+        files,
+        max_workers: int = 32,
+        max_concurrency: int = 4,
+        chunk_size: int = 4 * 1024 * 1024,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Sube varios archivos locales de forma concurrente. Ver AzureDataLakeGen2.upload_many.
+        :param max_workers: Archivos en vuelo simultáneamente
+        """
+        await self.get_authenticacion()
+
+        async def transfer(local_path, remote_path):
+            return await self._upload_one(container_name, local_path, remote_path, max_concurrency, chunk_size)
+
+        return await self._run_transfers(files, transfer, max_workers, max_retries, retry_backoff)
+
+    async def download_many(
+        self,
+        container_name,
+        files,
+        max_workers: int = 32,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+    ):
+        """
+        Descarga varios archivos del contenedor de forma concurrente. Ver AzureDataLakeGen2.download_many.
+        """
+        await self.get_authenticacion()
+
+        async def transfer(remote_path, local_path):
+            return await self._download_one(container_name, remote_path, local_path, max_concurrency)
+
+        return await self._run_transfers(files, transfer, max_workers, max_retries, retry_backoff)
+
+    async def upload_directory(self, container_name, local_directory, directory_name, **kwargs):
+        files = _local_upload_pairs(local_directory, directory_name)
+        return await self.upload_many(container_name, files, **kwargs)
+
+    async def download_directory(self, container_name, directory_name, local_directory, **kwargs):
+        container_client = await self._get_file_system_client(container_name)
+        files = [
+            (path.name, _local_download_path(path.name, directory_name, local_directory))
+            async for path in container_client.get_paths(path=directory_name, recursive=True)
+            if not path.is_directory
+        ]
+        return await self.download_many(container_name, files, **kwargs)
+
+    async def change_anonymous_access_container(self, container_name):
+        try:
+            container_client = await self._get_file_system_client(container_name)
+            await container_client.set_file_system_access_policy(
+                signed_identifiers = {},
+                public_access="container"
+                )
+
+            print(f"El nivel de acceso anónimo del contenedor '{container_name}' ha sido cambiado a Public access'")
+        except ResourceNotFoundError:
+            print(f"El contenedor '{container_name}' no existe")
+        except Exception as e:
+            print(f"Error al cambiar el nivel de acceso anónimo: {e}")
@@ -0,0 +1,337 @@
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+DEFAULT_COLUMNS = ["_id", "title", "text", "text-embedding-3-large-3072-embedding"]
+
+# Builders that load whatever local files they are given: their dataset name says nothing
+# about which data was read
+_FILE_BUILDERS = {"arrow", "csv", "json", "parquet", "text"}
+
+
+def _local_files(source: str) -> list:
+    """[path, size, mtime_ns] of every file behind a local directory, file or pattern."""
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(source)
+            for name in names
+        ]
+    else:
+        paths = glob.glob(source)
+    files = []
+    for path in sorted(paths):
+        stat = os.stat(path)
+        files.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    return files
+
+
+def open_streaming_dataset(source: str, split: str = "train", columns: list = None):
+    """
+    Open a dataset as a streaming IterableDataset.
+    The resolved source (local files with size and modification time, or the Hub dataset,
+    config and version) is attached as `source_description`, which ParquetDatasetIngestor
+    uses to recognise the same ingestion.
+    :param source: Hugging Face dataset name, a directory written by save_to_disk,
+                   or a local directory / file pattern of parquet or json files
+    """
+    from datasets import load_dataset, load_from_disk
+
+    local = True
+    if os.path.isdir(source) and os.path.exists(os.path.join(source, "state.json")):
+        dataset = load_from_disk(source).to_iterable_dataset()
+    elif os.path.isdir(source):
+        dataset = load_dataset(source, streaming=True, split=split)
+    elif os.path.isfile(source) or "*" in source:
+        builder = "json" if source.endswith((".json", ".jsonl")) else "parquet"
+        dataset = load_dataset(builder, data_files=source, streaming=True, split=split)
+    else:
+        dataset = load_dataset(source, streaming=True, split=split)
+        local = False
+    if columns:
+        dataset = dataset.select_columns(columns)
+    if local:
+        description = {"files": _local_files(source), "split": split}
+    else:
+        info = dataset.info
+        description = {
+            "dataset": source,
+            "config": info.config_name,
+            "version": str(info.version or ""),
+            "split": split,
+        }
+    dataset.source_description = description
+    return dataset
+
+
+class ParquetDatasetIngestor:
+    """
+    Streams examples from a dataset into Parquet one row group at a time, with a
+    checkpoint after every row group so an interrupted run resumes where it stopped.
+
+    Each row group is written as a part file next to the output (atomically, via
+    os.replace) and recorded in a checkpoint together with the number of rows consumed
+    and, when the source supports it, its resumable state_dict. When the stream ends
+    (or the limit is reached) the parts are copied row group by row group into a single
+    file with ParquetWriter. Memory is bounded by one row group. A completed run leaves
+    a small marker next to the output, so running it again with the same source and
+    settings returns immediately while the output file is untouched. Both the marker and
+    the checkpoint carry the fingerprint of the source and settings: a checkpoint written
+    for anything else is discarded instead of resumed. A source that cannot be identified
+    (a plain list or generator without source_id) is never skipped nor resumed.
+    """
+
+    def __init__(
+        self,
+        output_file: str,
+        row_group_size: int = 2000,
+        limit: int = None,
+        columns: list = None,
+        compression: str = "snappy",
+        keep_parts: bool = False,
+    ):
+        """
+        :param output_file: Final Parquet file
+        :param row_group_size: Rows buffered before a row group is written and checkpointed
+        :param limit: Maximum number of rows to ingest (None = the whole stream)
+        :param columns: Columns kept from each example (None = all)
+        :param keep_parts: Keep the part files after the final file has been written
+        """
+        self.output_file = output_file
+        self.row_group_size = row_group_size
+        self.limit = limit
+        self.columns = columns
+        self.compression = compression
+        self.keep_parts = keep_parts
+        self.parts_dir = f"{output_file}.parts"
+        self.checkpoint_file = os.path.join(self.parts_dir, "checkpoint.json")
+        self.marker_file = f"{output_file}.done.json"
+
+    # ------------------------------------------------------------------ checkpoint
+
+    def load_checkpoint(self) -> dict:
+        if not os.path.exists(self.checkpoint_file):
+            return {"rows": 0, "parts": [], "state": None, "completed": False, "fingerprint": None}
+        with open(self.checkpoint_file, encoding="utf-8") as file:
+            return json.load(file)
+
+    def _save_checkpoint(self, checkpoint: dict):
+        partial = f"{self.checkpoint_file}.partial"
+        with open(partial, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file)
+        os.replace(partial, self.checkpoint_file)
+
+    def reset(self):
+        """Discard the checkpoint and every part file."""
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+
+    @staticmethod
+    def _source_identity(source, source_id):
+        if source_id is not None:
+            return source_id
+        description = getattr(source, "source_description", None)
+        if description is not None:
+            return description
+        # A Hub dataset opened without open_streaming_dataset; datasets built from local
+        # data_files are only named after their builder and cannot be told apart
+        info = getattr(source, "info", None)
+        name = getattr(info, "dataset_name", None)
+        if name and name not in _FILE_BUILDERS:
+            return {
+                "dataset": name,
+                "config": getattr(info, "config_name", None),
+                "version": str(getattr(info, "version", None) or ""),
+                "split": str(getattr(source, "split", None) or ""),
+            }
+        return None
+
+    def fingerprint(self, source, source_id: str = None):
+        """
+        Identity of an ingestion: the resolved source and the settings that shape the output.
+        None when the source cannot be identified.
+        """
+        identity = self._source_identity(source, source_id)
+        if identity is None:
+            return None
+        description = {
+            "source": identity,
+            "columns": self.columns,
+            "limit": self.limit,
+            "row_group_size": self.row_group_size,
+            "compression": self.compression,
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _output_state(self):
+        stat = os.stat(self.output_file)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    def load_marker(self, fingerprint: str):
+        """The completion marker of a previous identical run, or None if missing or stale."""
+        if fingerprint is None:
+            return None
+        if not os.path.exists(self.marker_file) or not os.path.exists(self.output_file):
+            return None
+        with open(self.marker_file, encoding="utf-8") as file:
+            marker = json.load(file)
+        if (
+            marker.get("output_file") != os.path.abspath(self.output_file)
+            or marker.get("fingerprint") != fingerprint
+            or marker.get("output") != self._output_state()
+        ):
+            return None
+        return marker
+
+    def _save_marker(self, fingerprint, checkpoint):
+        marker = {
+            "output_file": os.path.abspath(self.output_file),
+            "fingerprint": fingerprint,
+            "output": self._output_state(),
+            "rows": checkpoint["rows"],
+            "row_groups": len(checkpoint["parts"]),
+        }
+        partial = f"{self.marker_file}.partial"
+        with open(partial, "w", encoding="utf-8") as file:
+            json.dump(marker, file)
+        os.replace(partial, self.marker_file)
+
+    # ------------------------------------------------------------------ writing
+
+    def _schema(self, checkpoint):
+        if checkpoint["parts"]:
+            return pq.read_schema(os.path.join(self.parts_dir, checkpoint["parts"][0]))
+        return None
+
+    def _write_part(self, checkpoint, buffer, schema, source):
+        table = pa.Table.from_pydict(buffer)
+        if schema is not None:
+            table = table.select(schema.names).cast(schema)
+        name = f"part-{len(checkpoint['parts']):05d}.parquet"
+        path = os.path.join(self.parts_dir, name)
+        pq.write_table(table, f"{path}.partial", compression=self.compression, row_group_size=len(table))
+        os.replace(f"{path}.partial", path)
+        checkpoint["parts"].append(name)
+        checkpoint["rows"] += len(table)
+        checkpoint["state"] = source.state_dict() if hasattr(source, "state_dict") else None
+        self._save_checkpoint(checkpoint)
+        return table.schema
+
+    def _consolidate(self, checkpoint):
+        partial = f"{self.output_file}.partial"
+        writer = None
+        try:
+            for name in checkpoint["parts"]:
+                part = pq.ParquetFile(os.path.join(self.parts_dir, name))
+                if writer is None:
+                    writer = pq.ParquetWriter(partial, part.schema_arrow, compression=self.compression)
+                for index in range(part.num_row_groups):
+                    writer.write_table(part.read_row_group(index))
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is not None:
+            os.replace(partial, self.output_file)
+
+    # ------------------------------------------------------------------ run
+
+    def _resume(self, source, checkpoint):
+        """Position the source after the rows already ingested."""
+        if not checkpoint["rows"]:
+            return iter(source)
+        if checkpoint["state"] is not None and hasattr(source, "load_state_dict"):
+            source.load_state_dict(checkpoint["state"])
+            return iter(source)
+        if hasattr(source, "skip"):
+            return iter(source.skip(checkpoint["rows"]))
+        iterator = iter(source)
+        for _ in range(checkpoint["rows"]):
+            next(iterator, None)
+        return iterator
+
+    def run(self, source, source_id: str = None) -> dict:
+        """
+        Ingest a dataset. `source` is an IterableDataset (see open_streaming_dataset)
+        or any iterable of dict examples; re-running with the same source and output resumes.
+        :param source_id: Stable identity of the source (e.g. its path and version). Required
+                          to resume or skip a plain iterable, which cannot be identified otherwise
+        :return: Report with rows, row groups, resumed rows, elapsed time and rows/s
+                 (skipped=True when an identical previous run had already completed)
+        """
+        start = time.perf_counter()
+        fingerprint = self.fingerprint(source, source_id)
+        marker = self.load_marker(fingerprint)
+        if marker is not None:
+            print(f"Dataset already ingested to {self.output_file} ({marker['rows']} rows), skipping")
+            return {
+                "output_file": self.output_file,
+                "rows": marker["rows"],
+                "row_groups": marker["row_groups"],
+                "resumed_rows": marker["rows"],
+                "elapsed_seconds": time.perf_counter() - start,
+                "rows_per_second": None,
+                "skipped": True,
+            }
+        if os.path.exists(self.marker_file):
+            os.remove(self.marker_file)
+
+        checkpoint = self.load_checkpoint()
+        if fingerprint is None or checkpoint.get("fingerprint") != fingerprint:
+            if checkpoint["parts"]:
+                reason = "the source cannot be identified (pass source_id)" if fingerprint is None \
+                    else "it was written for a different source or settings"
+                print(f"Discarding the checkpoint in {self.parts_dir}: {reason}")
+            self.reset()
+            checkpoint = self.load_checkpoint()
+            checkpoint["fingerprint"] = fingerprint
+        os.makedirs(self.parts_dir, exist_ok=True)
+        resumed_rows = checkpoint["rows"]
+
+        if not checkpoint["completed"]:
+            schema = self._schema(checkpoint)
+            iterator = self._resume(source, checkpoint)
+            buffer = None
+            buffered = 0
+            while self.limit is None or checkpoint["rows"] + buffered < self.limit:
+                example = next(iterator, None)
+                if example is None:
+                    break
+                if self.columns:
+                    example = {column: example[column] for column in self.columns}
+                if buffer is None:
+                    buffer = {column: [] for column in example}
+                for column, values in buffer.items():
+                    values.append(example.get(column))
+                buffered += 1
+                if buffered == self.row_group_size:
+                    schema = self._write_part(checkpoint, buffer, schema, source)
+                    print(f"Row group {len(checkpoint['parts'])} written ({checkpoint['rows']} rows)")
+                    buffer, buffered = None, 0
+            if buffered:
+                self._write_part(checkpoint, buffer, schema, source)
+            checkpoint["completed"] = True
+            self._save_checkpoint(checkpoint)
+
+        self._consolidate(checkpoint)
+        if os.path.exists(self.output_file):
+            self._save_marker(fingerprint, checkpoint)
+        if not self.keep_parts:
+            self.reset()
+
+        elapsed = time.perf_counter() - start
+        ingested = checkpoint["rows"] - resumed_rows
+        report = {
+            "output_file": self.output_file,
+            "rows": checkpoint["rows"],
+            "row_groups": len(checkpoint["parts"]),
+            "resumed_rows": resumed_rows,
+            "elapsed_seconds": elapsed,
+            "rows_per_second": ingested / elapsed if elapsed > 0 else None,
+            "skipped": False,
+        }
+        print(f"Dataset saved to {self.output_file} ({report['rows']} rows, {report['row_groups']} row groups)")
+        return report
@@ -0,0 +1,157 @@
+import os
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from commons.vector_quantization import normalize
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+
+def _encode_ids(ids) -> np.ndarray:
+    """Document ids as fixed-width UTF-8 bytes (sortable, comparable with searchsorted)."""
+    return np.char.encode(np.asarray(ids, dtype=str), "utf-8")
+
+
+class EmbeddingStore:
+    """
+    Contiguous, memory-mapped embedding matrix converted once from a Parquet column.
+
+    The directory holds embeddings.npy (float32, float16 or int8 with one scale per row),
+    the ids in row order as fixed-width bytes, a sorted copy plus row numbers for
+    id -> row lookups by binary search, and a JSON manifest. Everything is opened with mmap, so slices are zero-copy views and
+    several worker processes share the same pages through the OS page cache.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "store.json"), encoding="utf-8") as file:
+            self.manifest = json.load(file)
+        self.directory = directory
+        self.dtype = self.manifest["dtype"]
+        self.normalized = self.manifest["normalized"]
+        self.vectors = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+        self.scales = (
+            np.load(os.path.join(directory, "scales.npy"), mmap_mode="r")
+            if self.dtype == "int8" else None
+        )
+        self.ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        self._sorted_ids = np.load(os.path.join(directory, "ids_sorted.npy"), mmap_mode="r")
+        self._sorted_rows = np.load(os.path.join(directory, "ids_rows.npy"), mmap_mode="r")
+
+    @classmethod
+    def build(
+        cls,
+        parquet_path: str,
+        directory: str,
+        column: str = "text-embedding-3-large-3072-embedding",
+        id_column: str = "_id",
+        dtype: str = "float32",
+        normalize_vectors: bool = False,
+        batch_size: int = 4096,
+    ):
+        """
+        Convert a Parquet embedding column into a store, one record batch at a time.
+        :param dtype: Storage type (float32 | float16 | int8 with per-row symmetric scale)
+        :param normalize_vectors: L2-normalize rows so cosine search needs no extra copy
+        :return: The opened EmbeddingStore
+        """
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported dtype: {dtype}")
+        os.makedirs(directory, exist_ok=True)
+        parquet_file = pq.ParquetFile(parquet_path)
+        count = parquet_file.metadata.num_rows
+        if count == 0:
+            raise ValueError(f"No rows in {parquet_path}")
+
+        vectors = None
+        scales = np.empty(count, dtype=np.float32) if dtype == "int8" else None
+        id_batches = []
+        row = 0
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=[id_column, column]):
+            values = batch.column(1)
+            block = values.flatten().to_numpy(zero_copy_only=False).reshape(len(values), -1).astype(np.float32)
+            if normalize_vectors:
+                block = normalize(block)
+            if vectors is None:
+                vectors = np.lib.format.open_memmap(
+                    os.path.join(directory, "embeddings.npy"), mode="w+", dtype=dtype, shape=(count, block.shape[1])
+                )
+            if dtype == "int8":
+                block_scales = np.abs(block).max(axis=1) / 127.0
+                block_scales[block_scales == 0] = 1.0
+                scales[row:row + len(block)] = block_scales
+                vectors[row:row + len(block)] = np.rint(block / block_scales[:, None]).astype(np.int8)
+            else:
+                vectors[row:row + len(block)] = block
+            id_batches.append(pc.cast(batch.column(0), pa.string()))
+            row += len(block)
+        vectors.flush()
+        del vectors
+        if scales is not None:
+            np.save(os.path.join(directory, "scales.npy"), scales)
+
+        ids = _encode_ids(pa.concat_arrays(id_batches).to_numpy(zero_copy_only=False))
+        order = np.argsort(ids, kind="stable")
+        np.save(os.path.join(directory, "ids.npy"), ids)
+        np.save(os.path.join(directory, "ids_sorted.npy"), ids[order])
+        np.save(os.path.join(directory, "ids_rows.npy"), order.astype(np.int64))
+
+        manifest = {
+            "source": os.path.abspath(parquet_path),
+            "column": column,
+            "id_column": id_column,
+            "dtype": dtype,
+            "normalized": normalize_vectors,
+            "count": count,
+        }
+        with open(os.path.join(directory, "store.json"), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        return cls(directory)
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def dims(self) -> int:
+        return self.vectors.shape[1]
+
+    def slice(self, start: int, stop: int) -> np.ndarray:
+        """
+        Rows [start, stop). float32/float16 stores return a zero-copy view of the mapping;
+        int8 stores return dequantized float32 rows.
+        """
+        if self.dtype == "int8":
+            return self.vectors[start:stop].astype(np.float32) * self.scales[start:stop, None]
+        return self.vectors[start:stop]
+
+    def get(self, rows) -> np.ndarray:
+        """Rows at arbitrary positions (always a copy, dequantized for int8)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.dtype == "int8":
+            return self.vectors[rows].astype(np.float32) * self.scales[rows, None]
+        return self.vectors[rows]
+
+    def rows_for_ids(self, ids) -> np.ndarray:
+        """Row numbers of the given document ids (-1 where the id is unknown)."""
+        keys = _encode_ids([str(key) for key in ids])
+        positions = np.searchsorted(self._sorted_ids, keys)
+        positions = np.minimum(positions, len(self._sorted_ids) - 1)
+        found = self._sorted_ids[positions] == keys
+        return np.where(found, self._sorted_rows[positions], -1)
+
+    def get_by_ids(self, ids) -> np.ndarray:
+        rows = self.rows_for_ids(ids)
+        if (rows < 0).any():
+            missing = [key for key, row in zip(ids, rows) if row < 0]
+            raise KeyError(f"Unknown ids: {missing[:5]}")
+        return self.get(rows)
+
+    def ids_for_rows(self, start: int, stop: int) -> list:
+        return [key.decode("utf-8") for key in self.ids[start:stop].tolist()]
+
+    def iter_slices(self, batch_size: int = 8192):
+        """Yield (start, rows) for consecutive slices of the store."""
+        for start in range(0, len(self), batch_size):
+            yield start, self.slice(start, min(start + batch_size, len(self)))
@@ -0,0 +1,467 @@
+import os
+import json
+import heapq
+import math
+import time
+import numpy as np
+
+from commons.vector_quantization import (
+    BinaryQuantizer,
+    ScalarQuantizer,
+    normalize,
+    top_k,
+    truncate,
+)
+
+
+class LocalVectorIndex:
+    """
+    In-process vector index mirroring the configuration AzureSearchIndexManager.create_index
+    builds from a scenario dict: an HNSW graph (m, ef_construction, ef_search, cosine),
+    optional int8/binary compressed storage with Matryoshka truncation, and oversampled
+    rescoring on preserved originals. Exhaustive search is available for exact results.
+
+    The graph is built over the compressed representation, as the service does, and
+    all arrays can be saved to .npy files and reopened memory-mapped. Document keys are
+    unique: adding an existing key replaces its document.
+    Intended for tests and small corpora; it is pure NumPy/Python.
+    """
+
+    def __init__(
+        self,
+        dims: int,
+        compression_type: str = None,
+        truncate_dims: int = None,
+        discard_originals: bool = False,
+        oversample_ratio: int = 10,
+        hnsw_parameters: dict = None,
+        seed: int = 0,
+    ):
+        # Imported here so loading this module does not need the Azure SDK
+        from commons.azure_search_index import AzureSearchIndexManager
+
+        parameters = {**AzureSearchIndexManager.DEFAULT_HNSW_PARAMETERS, **(hnsw_parameters or {})}
+        if parameters["metric"] != "cosine":
+            raise ValueError(f"Unsupported metric: {parameters['metric']}")
+        self.dims = dims
+        self.compression_type = compression_type
+        self.truncate_dims = truncate_dims if compression_type else None
+        self.search_dims = self.truncate_dims or dims
+        self.discard_originals = bool(compression_type) and discard_originals
+        self.rescoring = bool(compression_type) and not discard_originals
+        self.oversample_ratio = oversample_ratio
+        self.m = parameters["m"]
+        self.ef_construction = parameters["ef_construction"]
+        self.ef_search = parameters["ef_search"]
+        self.metric = parameters["metric"]
+        self._level_multiplier = 1 / math.log(max(self.m, 2))
+        self._rng = np.random.default_rng(seed)
+
+        self.ids = []
+        self._positions = {}
+        self.count = 0
+        self.originals = None
+        self.codes = None
+        self.levels = np.empty(0, dtype=np.int8)
+        self.deleted = np.empty(0, dtype=bool)
+        self.graph = []
+        self.entry_point = -1
+        self.max_level = -1
+        if compression_type == "scalar":
+            self.quantizer = ScalarQuantizer()
+        elif compression_type == "binary":
+            self.quantizer = BinaryQuantizer()
+        else:
+            self.quantizer = None
+
+    @classmethod
+    def from_scenario(cls, scenario: dict, dims: int, **kwargs):
+        """Build an empty index from the same scenario dict create_index consumes."""
+        return cls(
+            dims=dims,
+            compression_type=scenario.get("compression_type"),
+            truncate_dims=scenario.get("truncate_dims"),
+            discard_originals=scenario.get("discard_originals", False),
+            oversample_ratio=scenario.get("oversample_ratio", 10),
+            hnsw_parameters=scenario.get("hnsw_parameters"),
+            **kwargs,
+        )
+
+    # ------------------------------------------------------------------ storage
+
+    def _max_degree(self, level):
+        return 2 * self.m if level == 0 else self.m
+
+    def _grow(self, needed):
+        capacity = 0 if self.codes is None else len(self.codes)
+        if self.codes is not None and needed <= capacity and self.codes.flags.writeable:
+            return
+        capacity = max(needed, 2 * capacity, 1024)
+
+        def resized(array, shape, dtype, fill=0):
+            grown = np.full(shape, fill, dtype=dtype)
+            if array is not None:
+                grown[:self.count] = array[:self.count]
+            return grown
+
+        if self.compression_type == "binary":
+            code_shape, code_dtype = ((capacity, (self.search_dims + 7) // 8), np.uint8)
+        elif self.compression_type == "scalar":
+            code_shape, code_dtype = ((capacity, self.search_dims), np.int8)
+        else:
+            code_shape, code_dtype = ((capacity, self.dims), np.float32)
+        self.codes = resized(self.codes, code_shape, code_dtype)
+        if self.compression_type and not self.discard_originals:
+            self.originals = resized(self.originals, (capacity, self.dims), np.float32)
+        self.levels = resized(self.levels, (capacity,), np.int8)
+        self.deleted = resized(self.deleted, (capacity,), bool, fill=False)
+        self.graph = [
+            resized(layer, (capacity, self._max_degree(level)), np.int32, fill=-1)
+            for level, layer in enumerate(self.graph)
+        ]
+
+    def _ensure_level(self, level):
+        capacity = len(self.codes)
+        while len(self.graph) <= level:
+            self.graph.append(np.full((capacity, self._max_degree(len(self.graph))), -1, dtype=np.int32))
+
+    # ------------------------------------------------------------------ scoring
+
+    def _query_repr(self, vector):
+        """Representation used to score a normalized full-dimension vector against the codes."""
+        if self.compression_type == "binary":
+            return self.quantizer.encode(vector[None, :self.search_dims])[0]
+        if self.compression_type == "scalar":
+            return truncate(vector, self.search_dims)
+        return vector
+
+    def _node_repr(self, node):
+        if self.compression_type == "binary":
+            return self.codes[node]
+        if self.compression_type == "scalar":
+            return self.quantizer.decode(self.codes[node][None])[0]
+        return self.codes[node]
+
+    def _scores(self, query, nodes):
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if self.compression_type == "binary":
+            return self.quantizer.score(query[None], self.codes[nodes], self.search_dims)[0]
+        if self.compression_type == "scalar":
+            return self.quantizer.score(query[None], self.codes[nodes])[0]
+        return self.codes[nodes] @ query
+
+    def _neighbors(self, level, node):
+        row = self.graph[level][node]
+        return row[row >= 0]
+
+    # ------------------------------------------------------------------ HNSW
+
+    def _search_layer(self, query, entry_points, ef, level, live_only=False):
+        """
+        Beam search of one layer. With live_only, replaced documents are still walked
+        through (they keep the graph connected) but never returned.
+        """
+        visited = set(entry_points)
+        entry_scores = self._scores(query, entry_points)
+        candidates = [(-score, node) for score, node in zip(entry_scores.tolist(), entry_points)]
+        heapq.heapify(candidates)
+        results = [
+            (score, node)
+            for score, node in zip(entry_scores.tolist(), entry_points)
+            if not (live_only and self.deleted[node])
+        ]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+        while candidates:
+            negative_score, node = heapq.heappop(candidates)
+            if len(results) >= ef and -negative_score < results[0][0]:
+                break
+            fresh = [n for n in self._neighbors(level, node).tolist() if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for score, neighbor in zip(self._scores(query, fresh).tolist(), fresh):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    if live_only and self.deleted[neighbor]:
+                        continue
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _select_neighbors(self, candidates, limit):
+        """HNSW heuristic: keep a candidate only if it is closer to the base than to any kept neighbor."""
+        if len(candidates) <= limit:
+            return candidates
+        nodes = np.array([node for _, node in candidates], dtype=np.int64)
+        # Best similarity of each candidate to the neighbors kept so far, updated once per kept node
+        closest_kept = np.full(len(candidates), -np.inf, dtype=np.float32)
+        selected = []
+        for position, (score, node) in enumerate(candidates):
+            if len(selected) >= limit:
+                break
+            if closest_kept[position] > score:
+                continue
+            selected.append((score, node))
+            closest_kept = np.maximum(closest_kept, self._scores(self._node_repr(node), nodes))
+        if len(selected) < limit:
+            chosen = {node for _, node in selected}
+            selected.extend([c for c in candidates if c[1] not in chosen][:limit - len(selected)])
+        return selected
+
+    def _connect(self, node, neighbors, level):
+        limit = self._max_degree(level)
+        layer = self.graph[level]
+        layer[node, :] = -1
+        layer[node, :len(neighbors)] = [n for _, n in neighbors]
+        for _, neighbor in neighbors:
+            current = self._neighbors(level, neighbor)
+            if len(current) < limit:
+                layer[neighbor, len(current)] = node
+                continue
+            # Neighbor is full: re-select its connections including the new node
+            pool = np.append(current, node)
+            scores = self._scores(self._node_repr(neighbor), pool)
+            ranked = sorted(zip(scores.tolist(), pool.tolist()), reverse=True)
+            kept = self._select_neighbors(ranked, limit)
+            layer[neighbor, :] = -1
+            layer[neighbor, :len(kept)] = [n for _, n in kept]
+
+    def _insert(self, node):
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_multiplier)
+        self.levels[node] = level
+        self._ensure_level(level)
+        if self.entry_point < 0:
+            self.entry_point, self.max_level = node, level
+            return
+        query = self._node_repr(node)
+        entry_points = [self.entry_point]
+        for current_level in range(self.max_level, level, -1):
+            entry_points = [self._search_layer(query, entry_points, 1, current_level)[0][1]]
+        for current_level in range(min(level, self.max_level), -1, -1):
+            candidates = self._search_layer(query, entry_points, self.ef_construction, current_level)
+            self._connect(node, self._select_neighbors(candidates, self._max_degree(current_level)), current_level)
+            entry_points = [n for _, n in candidates]
+        if level > self.max_level:
+            self.entry_point, self.max_level = node, level
+
+    def fit_quantizer(self, vectors):
+        """
+        Fit the scalar quantizer ranges on representative vectors (e.g. a sample of the
+        corpus). Documents already added are re-encoded from their preserved originals.
+        """
+        if self.compression_type != "scalar":
+            return
+        if self.count and self.originals is None:
+            raise ValueError("Cannot refit the quantizer of a populated index without preserved originals")
+        self.quantizer.fit(truncate(normalize(vectors), self.search_dims))
+        if self.count:
+            self.codes[:self.count] = self.quantizer.encode(truncate(self.originals[:self.count], self.search_dims))
+
+    def add(self, ids, vectors):
+        """
+        Add documents to the index. Unless fit_quantizer was called first, the scalar
+        quantizer is fitted on the first batch, so that batch should be representative.
+        A key that is already indexed is replaced, as mergeOrUpload does: its old node is
+        marked deleted, so it still routes graph searches but is never returned.
+        :param ids: Document keys
+        :param vectors: Embedding matrix (n x dims)
+        """
+        vectors = normalize(vectors)
+        if vectors.shape[1] != self.dims:
+            raise ValueError(f"Expected {self.dims} dimensions, got {vectors.shape[1]}")
+        ids = list(ids)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} ids for {len(vectors)} vectors")
+        if not len(vectors):
+            return
+        start = self.count
+        self._grow(start + len(vectors))
+        if self.compression_type == "scalar":
+            if self.quantizer.scale is None:
+                self.quantizer.fit(truncate(vectors, self.search_dims))
+            self.codes[start:start + len(vectors)] = self.quantizer.encode(truncate(vectors, self.search_dims))
+        elif self.compression_type == "binary":
+            self.codes[start:start + len(vectors)] = self.quantizer.encode(vectors[:, :self.search_dims])
+        else:
+            self.codes[start:start + len(vectors)] = vectors
+        if self.originals is not None:
+            self.originals[start:start + len(vectors)] = vectors
+        for offset, key in enumerate(ids):
+            node = start + offset
+            previous = self._positions.get(key)
+            if previous is not None:
+                self.deleted[previous] = True
+            self.ids.append(key)
+            self._positions[key] = node
+            self.count = node + 1
+            self._insert(node)
+
+    def add_store(self, store, batch_size: int = 8192, sample_size: int = 10000):
+        """
+        Add every document of an EmbeddingStore, reading it one mapped slice at a time.
+        An unfitted scalar quantizer is first fitted on sample_size rows spread evenly
+        over the whole store.
+        """
+        if self.compression_type == "scalar" and self.quantizer.scale is None and len(store):
+            rows = np.unique(np.linspace(0, len(store) - 1, min(sample_size, len(store))).astype(np.int64))
+            self.fit_quantizer(np.asarray(store.get(rows), dtype=np.float32))
+        for start, vectors in store.iter_slices(batch_size):
+            self.add(store.ids_for_rows(start, start + len(vectors)), vectors)
+
+    # ------------------------------------------------------------------ search
+
+    def _exhaustive(self, query, k, block_size=8192):
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, self.count, block_size):
+            nodes = np.arange(start, min(start + block_size, self.count))
+            nodes = nodes[~self.deleted[nodes]]
+            if not len(nodes):
+                continue
+            scores = self._scores(query, nodes).astype(np.float32)
+            best_ids = np.concatenate([best_ids, nodes])
+            best_scores = np.concatenate([best_scores, scores])
+            order, best_scores = top_k(best_scores[None], k)
+            best_ids, best_scores = best_ids[order[0]], best_scores[0]
+        return list(zip(best_scores.tolist(), best_ids.tolist()))
+
+    def search(self, vector, k: int = 10, ef_search: int = None, exhaustive: bool = False, oversampling: int = None):
+        """
+        Find the k nearest documents to a query vector.
+        :param ef_search: Overrides the configured ef_search
+        :param exhaustive: Score every document instead of walking the graph
+        :param oversampling: Overrides the scenario's oversample_ratio when rescoring
+        :return: List of (id, score) sorted by descending cosine similarity
+        """
+        if self.count == 0:
+            return []
+        vector = normalize(np.asarray(vector, dtype=np.float32)[None])[0]
+        query = self._query_repr(vector)
+        candidates_k = k * (oversampling or self.oversample_ratio) if self.rescoring else k
+        if exhaustive:
+            candidates = self._exhaustive(query, candidates_k)
+        else:
+            entry_points = [self.entry_point]
+            for level in range(self.max_level, 0, -1):
+                entry_points = [self._search_layer(query, entry_points, 1, level)[0][1]]
+            ef = max(ef_search or self.ef_search, candidates_k)
+            candidates = self._search_layer(query, entry_points, ef, 0, live_only=True)[:candidates_k]
+        if self.rescoring:
+            nodes = np.array([n for _, n in candidates], dtype=np.int64)
+            scores = self.originals[nodes] @ vector
+            candidates = sorted(zip(scores.tolist(), nodes.tolist()), reverse=True)
+        return [(self.ids[node], score) for score, node in candidates[:k]]
+
+    # ------------------------------------------------------------------ persistence
+
+    def save(self, directory: str):
+        """Write the index as .npy arrays plus a JSON manifest."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "codes.npy"), self.codes[:self.count])
+        if self.originals is not None:
+            np.save(os.path.join(directory, "originals.npy"), self.originals[:self.count])
+        np.save(os.path.join(directory, "levels.npy"), self.levels[:self.count])
+        np.save(os.path.join(directory, "deleted.npy"), self.deleted[:self.count])
+        for level, layer in enumerate(self.graph):
+            np.save(os.path.join(directory, f"graph_{level}.npy"), layer[:self.count])
+        if self.compression_type == "scalar":
+            np.save(os.path.join(directory, "quantizer.npy"), np.stack([self.quantizer.minimum, self.quantizer.scale]))
+        manifest = {
+            "dims": self.dims,
+            "compression_type": self.compression_type,
+            "truncate_dims": self.truncate_dims,
+            "discard_originals": self.discard_originals,
+            "oversample_ratio": self.oversample_ratio,
+            "hnsw_parameters": {"m": self.m, "ef_construction": self.ef_construction, "ef_search": self.ef_search, "metric": self.metric},
+            "count": self.count,
+            "levels": len(self.graph),
+            "entry_point": self.entry_point,
+            "max_level": self.max_level,
+            "ids": self.ids,
+        }
+        with open(os.path.join(directory, "index.json"), "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = "r"):
+        """
+        Open a saved index. With mmap_mode="r" the arrays stay on disk and are shared through
+        the page cache; adding documents copies them into memory first.
+        """
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as file:
+            manifest = json.load(file)
+        index = cls(
+            dims=manifest["dims"],
+            compression_type=manifest["compression_type"],
+            truncate_dims=manifest["truncate_dims"],
+            discard_originals=manifest["discard_originals"],
+            oversample_ratio=manifest["oversample_ratio"],
+            hnsw_parameters=manifest["hnsw_parameters"],
+        )
+        index.codes = np.load(os.path.join(directory, "codes.npy"), mmap_mode=mmap_mode)
+        if os.path.exists(os.path.join(directory, "originals.npy")):
+            index.originals = np.load(os.path.join(directory, "originals.npy"), mmap_mode=mmap_mode)
+        index.levels = np.load(os.path.join(directory, "levels.npy"), mmap_mode=mmap_mode)
+        if os.path.exists(os.path.join(directory, "deleted.npy")):
+            index.deleted = np.load(os.path.join(directory, "deleted.npy"), mmap_mode=mmap_mode)
+        else:
+            index.deleted = np.zeros(manifest["count"], dtype=bool)
+        index.graph = [
+            np.load(os.path.join(directory, f"graph_{level}.npy"), mmap_mode=mmap_mode)
+            for level in range(manifest["levels"])
+        ]
+        if manifest["compression_type"] == "scalar":
+            index.quantizer.minimum, index.quantizer.scale = np.load(os.path.join(directory, "quantizer.npy"))
+        index.ids = manifest["ids"]
+        index._positions = {key: position for position, key in enumerate(index.ids) if not index.deleted[position]}
+        index.count = manifest["count"]
+        index.entry_point = manifest["entry_point"]
+        index.max_level = manifest["max_level"]
+        return index
+
+
+def sweep_hnsw(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    scenario: dict,
+    m_values=(4, 8, 16),
+    ef_construction_values=(100, 400),
+    ef_search_values=(50, 100, 500),
+    k: int = 10,
+) -> list:
+    """
+    Build one LocalVectorIndex per (m, ef_construction) and query it with each ef_search,
+    reporting recall@k against exhaustive full-precision search, mean latency and build time.
+    """
+    vectors = normalize(vectors)
+    queries = normalize(queries)
+    ids = list(range(len(vectors)))
+    exact = [set(top_k((queries[i:i + 1] @ vectors.T), k)[0][0].tolist()) for i in range(len(queries))]
+    rows = []
+    for m in m_values:
+        for ef_construction in ef_construction_values:
+            parameters = {**(scenario.get("hnsw_parameters") or {}), "m": m, "ef_construction": ef_construction}
+            index = LocalVectorIndex.from_scenario({**scenario, "hnsw_parameters": parameters}, dims=vectors.shape[1])
+            build_start = time.perf_counter()
+            index.add(ids, vectors)
+            build_seconds = time.perf_counter() - build_start
+            for ef_search in ef_search_values:
+                hits = 0
+                search_start = time.perf_counter()
+                for query, truth in zip(queries, exact):
+                    found = {key for key, _ in index.search(query, k=k, ef_search=ef_search)}
+                    hits += len(found & truth)
+                latency = (time.perf_counter() - search_start) / len(queries)
+                rows.append({
+                    "scenario": scenario.get("name"),
+                    "m": m,
+                    "ef_construction": ef_construction,
+                    "ef_search": ef_search,
+                    f"recall@{k}": hits / (k * len(queries)),
+                    "latency_ms": latency * 1000,
+                    "build_seconds": build_seconds,
+                })
+    return rows
@@ -0,0 +1,216 @@
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from commons.vector_quantization import (
+    BinaryQuantizer,
+    ScalarQuantizer,
+    bytes_per_vector,
+    normalize,
+    top_k,
+    truncate,
+)
+
+
+def _flatten_list_array(values):
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    return values.flatten()
+
+
+def load_parquet_embeddings(
+    path: str,
+    column: str = "text-embedding-3-large-3072-embedding",
+    limit: int = None,
+    batch_size: int = 4096,
+) -> np.ndarray:
+    """
+    Read an embedding column into a float32 matrix, one record batch at a time,
+    so float64 source data is never fully materialized.
+    """
+    parquet_file = pq.ParquetFile(path)
+    total = parquet_file.metadata.num_rows if limit is None else min(limit, parquet_file.metadata.num_rows)
+    embeddings = None
+    row = 0
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=[column]):
+        values = batch.column(0)
+        if row + len(values) > total:
+            values = values.slice(0, total - row)
+        flat = _flatten_list_array(values).to_numpy(zero_copy_only=False)
+        block = flat.reshape(len(values), -1)
+        if embeddings is None:
+            embeddings = np.empty((total, block.shape[1]), dtype=np.float32)
+        embeddings[row:row + len(block)] = block
+        row += len(block)
+        if row >= total:
+            break
+    return embeddings
+
+
+class VectorCompressionBenchmark:
+    """
+    Local simulation of the vector compression scenarios used with
+    AzureSearchIndexManager.create_index. Each scenario dict is mapped to the same
+    settings the service applies (int8 scalar or binary quantization, Matryoshka
+    truncation, oversampled rescoring on preserved originals) and evaluated with NumPy
+    against exact cosine search: recall@k, QPS and bytes per vector.
+
+    Uncompressed scenarios are searched exhaustively, so they measure the cost of
+    full-precision vectors but not HNSW approximation error.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        queries: np.ndarray = None,
+        n_queries: int = 100,
+        k: int = 10,
+        default_oversampling: int = 10,
+        block_size: int = 8192,
+        seed: int = 0,
+        normalized: bool = False,
+    ):
+        """
+        :param embeddings: Corpus matrix (n_docs x dims)
+        :param queries: Query matrix; when omitted, n_queries corpus rows are used and
+                        excluded from their own results
+        :param k: Number of neighbors for recall@k
+        :param default_oversampling: Oversampling applied when a scenario does not set oversample_ratio
+        :param block_size: Corpus rows scored at a time (bounds temporary memory)
+        :param normalized: The embeddings are already L2-normalized and are used as-is
+                           (e.g. a memory-mapped EmbeddingStore, never copied into RAM)
+        """
+        self.corpus = embeddings if normalized else normalize(embeddings)
+        self.dims = self.corpus.shape[1]
+        self.k = k
+        self.default_oversampling = default_oversampling
+        self.block_size = block_size
+        if queries is None:
+            rng = np.random.default_rng(seed)
+            self.query_ids = rng.choice(len(self.corpus), size=min(n_queries, len(self.corpus)), replace=False)
+            self.queries = np.asarray(self.corpus[self.query_ids], dtype=np.float32)
+        else:
+            self.query_ids = None
+            self.queries = normalize(queries)
+        self.ground_truth = self._search(lambda start, end: self.queries @ self.corpus[start:end].T, self.k)
+
+    @classmethod
+    def from_parquet(cls, path: str, column: str = "text-embedding-3-large-3072-embedding", limit: int = None, **kwargs):
+        return cls(load_parquet_embeddings(path, column=column, limit=limit), **kwargs)
+
+    @classmethod
+    def from_store(cls, store, **kwargs):
+        """
+        Benchmark an EmbeddingStore. float32/float16 stores built with normalize_vectors=True
+        are scored straight from the mapping; other stores are loaded and normalized.
+        """
+        if store.normalized and store.dtype != "int8":
+            return cls(store.vectors, normalized=True, **kwargs)
+        return cls(store.slice(0, len(store)), **kwargs)
+
+    def _search(self, score_block, k):
+        """Blockwise top-k over the corpus, excluding each sampled query's own row."""
+        best_ids = np.empty((len(self.queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(self.queries), 0), dtype=np.float32)
+        for start in range(0, len(self.corpus), self.block_size):
+            end = min(start + self.block_size, len(self.corpus))
+            scores = np.asarray(score_block(start, end), dtype=np.float32)
+            if self.query_ids is not None:
+                inside = (self.query_ids >= start) & (self.query_ids < end)
+                scores[np.nonzero(inside)[0], self.query_ids[inside] - start] = -np.inf
+            ids, block_scores = top_k(scores, k)
+            best_ids = np.concatenate([best_ids, ids + start], axis=1)
+            best_scores = np.concatenate([best_scores, block_scores], axis=1)
+            order, best_scores = top_k(best_scores, k)
+            best_ids = np.take_along_axis(best_ids, order, axis=1)
+        return best_ids
+
+    def _encode(self, compression_type, dims):
+        """Build the compressed corpus and return a block scoring function for it."""
+        if compression_type == "scalar":
+            quantizer = ScalarQuantizer()
+            minimum = np.full(dims, np.inf, dtype=np.float32)
+            maximum = np.full(dims, -np.inf, dtype=np.float32)
+            for start in range(0, len(self.corpus), self.block_size):
+                block = truncate(self.corpus[start:start + self.block_size], dims)
+                minimum = np.minimum(minimum, block.min(axis=0))
+                maximum = np.maximum(maximum, block.max(axis=0))
+            quantizer.fit(np.stack([minimum, maximum]))
+            codes = np.concatenate([
+                quantizer.encode(truncate(self.corpus[start:start + self.block_size], dims))
+                for start in range(0, len(self.corpus), self.block_size)
+            ])
+            queries = truncate(self.queries, dims)
+            return codes, lambda start, end: quantizer.score(queries, codes[start:end])
+        if compression_type == "binary":
+            quantizer = BinaryQuantizer()
+            codes = np.concatenate([
+                quantizer.encode(self.corpus[start:start + self.block_size, :dims])
+                for start in range(0, len(self.corpus), self.block_size)
+            ])
+            query_codes = quantizer.encode(self.queries[:, :dims])
+            return codes, lambda start, end: quantizer.score(query_codes, codes[start:end], dims)
+        queries = truncate(self.queries, dims)
+        return None, lambda start, end: queries @ truncate(self.corpus[start:end], dims).T
+
+    def _rescore(self, candidates):
+        """Rescore oversampled candidates with the full-precision original vectors."""
+        scores = np.einsum("qd,qcd->qc", self.queries, self.corpus[candidates])
+        order, _ = top_k(scores, self.k)
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def run_scenario(self, scenario: dict) -> dict:
+        compression_type = scenario.get("compression_type")
+        dims = scenario.get("truncate_dims") or self.dims
+        rescore = bool(compression_type) and not scenario.get("discard_originals", False)
+        oversampling = scenario.get("oversample_ratio", self.default_oversampling) if rescore else 1
+
+        build_start = time.perf_counter()
+        _, score_block = self._encode(compression_type, dims)
+        build_seconds = time.perf_counter() - build_start
+
+        search_start = time.perf_counter()
+        results = self._search(score_block, self.k * oversampling)
+        if rescore:
+            results = self._rescore(results)
+        search_seconds = time.perf_counter() - search_start
+
+        hits = [len(set(found[:self.k]) & set(truth)) for found, truth in zip(results.tolist(), self.ground_truth.tolist())]
+        index_bytes = bytes_per_vector(compression_type, dims)
+        originals_bytes = self.dims * 4 if compression_type and not scenario.get("discard_originals", False) else 0
+        stored_bytes = self.dims * 4 if scenario.get("stored_embedding", True) else 0
+        return {
+            "scenario": scenario["name"],
+            "compression": compression_type or "none",
+            "dims": dims,
+            "rescoring": rescore,
+            "oversampling": oversampling if rescore else None,
+            f"recall@{self.k}": sum(hits) / (self.k * len(hits)),
+            "qps": len(self.queries) / search_seconds if search_seconds > 0 else float("inf"),
+            "build_seconds": build_seconds,
+            "vector_bytes_per_vector": index_bytes,
+            "total_bytes_per_vector": index_bytes + originals_bytes + stored_bytes,
+            "compression_ratio": (self.dims * 4) / index_bytes,
+        }
+
+    def run(self, scenarios: list) -> list:
+        """
+        Run every scenario and return one result row per scenario.
+        """
+        rows = []
+        for scenario in scenarios:
+            row = self.run_scenario(scenario)
+            print(
+                f"{row['scenario']}: recall@{self.k}={row[f'recall@{self.k}']:.3f} "
+                f"qps={row['qps']:.1f} bytes/vector={row['vector_bytes_per_vector']}"
+            )
+            rows.append(row)
+        return rows
+
+
+def format_report(rows: list, tablefmt: str = "github") -> str:
+    """Render benchmark rows with tabulate."""
+    from tabulate import tabulate
+
+    return tabulate(rows, headers="keys", tablefmt=tablefmt, floatfmt=".4f")
@@ -0,0 +1,97 @@
+import numpy as np
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (cosine similarity becomes a dot product)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def truncate(vectors: np.ndarray, dims: int = None) -> np.ndarray:
+    """Matryoshka truncation: keep the first `dims` dimensions and renormalize."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dims:
+        vectors = vectors[..., :dims]
+    return normalize(vectors)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Number of set bits of each uint8 element."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    return _POPCOUNT_TABLE[values]
+
+
+def top_k(scores: np.ndarray, k: int):
+    """
+    Indices and scores of the k highest scores of each row, sorted descending.
+    """
+    k = min(k, scores.shape[1])
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+class ScalarQuantizer:
+    """
+    int8 scalar quantization with per-dimension min/max ranges, as used by
+    ScalarQuantizationCompression(quantized_data_type="int8").
+    Scoring is asymmetric: float queries against dequantized int8 codes.
+    """
+
+    def __init__(self):
+        self.minimum = None
+        self.scale = None
+
+    def fit(self, vectors: np.ndarray):
+        self.minimum = vectors.min(axis=0).astype(np.float32)
+        maximum = vectors.max(axis=0).astype(np.float32)
+        self.scale = (maximum - self.minimum) / 255.0
+        self.scale[self.scale == 0] = 1.0
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        codes = np.rint((vectors - self.minimum) / self.scale) - 128
+        return np.clip(codes, -128, 127).astype(np.int8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return (codes.astype(np.float32) + 128) * self.scale + self.minimum
+
+    def score(self, queries: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # dot(q, (c + 128) * scale + min) = dot(q * scale, c) + dot(q, 128 * scale + min)
+        weighted = queries * self.scale
+        bias = queries @ (128 * self.scale + self.minimum)
+        return weighted @ codes.astype(np.float32).T + bias[:, None]
+
+
+class BinaryQuantizer:
+    """
+    1-bit binary quantization (sign of each dimension), as used by
+    BinaryQuantizationCompression. Similarity is derived from the Hamming distance.
+    """
+
+    def fit(self, vectors: np.ndarray):
+        return self
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.packbits(vectors > 0, axis=-1)
+
+    def score(self, query_codes: np.ndarray, codes: np.ndarray, dims: int) -> np.ndarray:
+        distances = np.empty((len(query_codes), len(codes)), dtype=np.float32)
+        for i, query in enumerate(query_codes):
+            distances[i] = popcount(np.bitwise_xor(codes, query)).sum(axis=1, dtype=np.int32)
+        return 1.0 - 2.0 * distances / dims
+
+
+def bytes_per_vector(compression_type: str, dims: int) -> int:
+    """Size of one vector in the vector index for the given compression."""
+    if compression_type == "scalar":
+        return dims
+    if compression_type == "binary":
+        return (dims + 7) // 8
+    return dims * 4
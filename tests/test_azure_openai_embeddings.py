@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from commons.azure_openai_embeddings import EmbeddingClient, FakeEmbeddingBackend
+
+
+class RecordingBackend(FakeEmbeddingBackend):
+    """FakeEmbeddingBackend that keeps the texts of every call."""
+
+    def __init__(self, dims: int = 8):
+        super().__init__(dims=dims)
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: list, dimensions: int = None):
+        with self._lock:
+            self.batches.append(list(texts))
+        return super().__call__(texts, dimensions)
+
+
+def test_embed_many_chunks_by_max_batch_size_and_keeps_order():
+    backend = RecordingBackend()
+    texts = [f"text {i}" for i in range(10)]
+    with EmbeddingClient(backend, max_batch_size=4) as client:
+        vectors = client.embed_many(texts)
+
+    assert sorted(len(batch) for batch in backend.batches) == [2, 4, 4]
+    assert vectors.shape == (10, 8)
+    expected, _ = FakeEmbeddingBackend(dims=8)(texts)
+    np.testing.assert_array_equal(vectors, expected)
+
+
+def test_concurrent_embed_calls_share_backend_requests():
+    backend = RecordingBackend()
+    texts = [f"query {i}" for i in range(32)]
+    with EmbeddingClient(backend, max_batch_size=64, batch_window=0.2) as client:
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            vectors = list(pool.map(client.embed, texts))
+
+    assert len(backend.batches) < len(texts)
+    assert sorted(text for batch in backend.batches for text in batch) == sorted(texts)
+    expected, _ = FakeEmbeddingBackend(dims=8)(texts)
+    np.testing.assert_array_equal(np.stack(vectors), expected)
+
+
+def test_duplicate_texts_are_embedded_once():
+    backend = RecordingBackend()
+    with EmbeddingClient(backend) as client:
+        vectors = client.embed_many(["a", "b", "a", "a"])
+
+        assert backend.batches == [["a", "b"]]
+        assert client.stats["deduplicated"] == 2
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+
+        first, second = client.submit("c"), client.submit("c")
+        assert first is second
+        first.result(timeout=5)
+    assert sum(batch.count("c") for batch in backend.batches) == 1
+
+
+def test_cached_texts_do_not_call_the_backend():
+    backend = RecordingBackend()
+    with EmbeddingClient(backend) as client:
+        vector = client.embed("cached")
+        again = client.embed("cached")
+        client.embed_many(["cached"])
+
+        assert backend.calls == 1
+        assert client.stats["cache_hits"] == 2
+        np.testing.assert_array_equal(vector, again)
+
+
+def test_disk_cache_is_shared_between_clients(tmp_path):
+    with EmbeddingClient(RecordingBackend(), cache_dir=str(tmp_path)) as client:
+        vector = client.embed("persisted")
+
+    backend = RecordingBackend()
+    with EmbeddingClient(backend, cache_dir=str(tmp_path)) as client:
+        np.testing.assert_array_equal(client.embed("persisted"), vector)
+        assert client.stats["disk_hits"] == 1
+    assert backend.calls == 0
+
+
+def test_submit_after_close_raises():
+    client = EmbeddingClient(RecordingBackend())
+    client.embed("warm up")
+    client.close()
+
+    with pytest.raises(RuntimeError):
+        client.submit("late")
+
+
+def test_close_fails_futures_that_were_never_resolved():
+    client = EmbeddingClient(RecordingBackend())
+    orphan = client._in_flight["orphan"] = Future()
+    client.close()
+
+    with pytest.raises(RuntimeError):
+        orphan.result(timeout=5)
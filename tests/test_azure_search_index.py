@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from azure.core.credentials import AzureKeyCredential
+from azure.search.documents.indexes.models import SearchIndex
+
+from commons.azure_search_index import AzureSearchDocumentUploader, AzureSearchIndexManager
+
+
+def _manager():
+    manager = AzureSearchIndexManager.__new__(AzureSearchIndexManager)
+    manager.index_name_prefix = "test"
+    manager.vector_dimensions = 8
+    return manager
+
+
+def test_uncompressed_index_round_trip_is_unchanged():
+    manager = _manager()
+    index = manager._build_index({"name": "baseline", "compression_type": None})
+
+    # The service echoes an empty compressions list and no compression on the profile
+    deployed = index.as_dict()
+    deployed["vector_search"]["compressions"] = []
+    deployed["vector_search"]["profiles"][0]["compression_name"] = None
+
+    assert manager._plan_index(index, SearchIndex.from_dict(deployed)) == ("unchanged", [])
+    assert manager._plan_index(index, SearchIndex.from_dict(index.as_dict())) == ("unchanged", [])
+
+
+def test_removing_compression_needs_rebuild():
+    manager = _manager()
+    compressed = manager._build_index({"name": "scalar", "compression_type": "scalar"})
+    uncompressed = manager._build_index({"name": "scalar", "compression_type": None})
+
+    action, changes = manager._plan_index(uncompressed, SearchIndex.from_dict(compressed.as_dict()))
+
+    assert action == "rebuild"
+    assert changes
+
+
+class _Response:
+    def __init__(self, status_code, results):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = ""
+        self._results = results
+
+    def json(self):
+        return {"value": self._results}
+
+
+def test_uploader_matches_results_by_key():
+    uploader = AzureSearchDocumentUploader("https://search", AzureKeyCredential("key"), ["docs"], max_retries=0)
+
+    def post(index_name, actions):
+        keys = [json.loads(action)["id"] for action in actions]
+        # Results out of order, one document missing and one rejected
+        results = [
+            {"key": key, "status": key != "c", "statusCode": 400 if key == "c" else 200, "errorMessage": "invalid"}
+            for key in reversed(keys)
+            if key != "b"
+        ]
+        return _Response(207, results), 0
+
+    uploader._post = post
+    batch = uploader.upload([{"id": key} for key in "abcd"])["batches"][0]
+
+    assert batch["succeeded"] == 2
+    assert batch["failed"] == 2
+    assert sorted(batch["failed_keys"]) == ["b", "c"]
+
+
+def test_uploader_requires_index_names():
+    with pytest.raises(ValueError):
+        AzureSearchDocumentUploader("https://search", AzureKeyCredential("key"), [])
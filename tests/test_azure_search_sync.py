@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+
+from azure.core.credentials import AzureKeyCredential
+
+from commons.azure_search_documents import encode_key
+from commons.azure_search_sync import DataLakeIndexSync
+from commons.azure_storage import PathRecord
+
+
+class FakeDataLake:
+    """In-memory stand-in for AzureDataLakeGen2: {path: (etag, content)}."""
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.unreadable = set()
+
+    def iter_paths(self, container_name, directory_name=None, max_results=None, files_only=False):
+        for path, (etag, content) in sorted(self.files.items()):
+            yield PathRecord(path, len(content), False, datetime(2026, 1, 1, tzinfo=timezone.utc), etag)
+
+    def read_file(self, container_name, file_path):
+        if file_path in self.unreadable:
+            raise OSError("download failed")
+        return self.files[file_path][1]
+
+
+class FakeUploader:
+    """Applies actions to a shared {key: document} index, rejecting the keys in `rejected`."""
+
+    def __init__(self, index, action, key_field="id"):
+        self.index = index
+        self.action = action
+        self.key_field = key_field
+        self.rejected = set()
+        self.calls = []
+
+    def upload(self, documents):
+        documents = list(documents)
+        self.calls.append(documents)
+        failed = []
+        for document in documents:
+            key = document[self.key_field]
+            if key in self.rejected:
+                failed.append(key)
+            elif self.action == "delete":
+                self.index.pop(key, None)
+            else:
+                self.index[key] = document
+        return {"batches": [{"failed_keys": failed}]}
+
+    def close(self):
+        pass
+
+
+def _sync(datalake, index, tmp_path, **kwargs):
+    sync = DataLakeIndexSync(
+        datalake,
+        "container",
+        "docs",
+        "https://search",
+        AzureKeyCredential("key"),
+        ["docs"],
+        manifest_path=str(tmp_path / "manifest.sqlite"),
+        **kwargs,
+    )
+    sync.upserts.close()
+    sync.deletes.close()
+    sync.upserts = FakeUploader(index, "mergeOrUpload")
+    sync.deletes = FakeUploader(index, "delete")
+    return sync
+
+
+def _content_keyed(path, content):
+    # The document key comes from the content, so a document can move between files
+    return [{"id": content.decode(), "title": path}]
+
+
+def test_plan_classifies_new_changed_deleted_and_unchanged(tmp_path):
+    datalake = FakeDataLake({"docs/a": ("1", b"a"), "docs/b": ("1", b"b"), "docs/c": ("1", b"c")})
+    index = {}
+    with _sync(datalake, index, tmp_path) as sync:
+        sync.sync()
+
+        datalake.files["docs/b"] = ("2", b"b v2")
+        del datalake.files["docs/c"]
+        datalake.files["docs/d"] = ("1", b"d")
+        plan = sync.plan()
+
+    assert plan["new"] == ["docs/d"]
+    assert plan["changed"] == ["docs/b"]
+    assert plan["deleted"] == ["docs/c"]
+    assert plan["unchanged"] == 1
+
+
+def test_sync_uploads_changes_and_deletes_removed_documents(tmp_path):
+    datalake = FakeDataLake({"docs/a": ("1", b"a"), "docs/b": ("1", b"b")})
+    index = {}
+    with _sync(datalake, index, tmp_path) as sync:
+        first = sync.sync()
+        again = sync.sync()
+
+        datalake.files["docs/a"] = ("2", b"a v2")
+        del datalake.files["docs/b"]
+        report = sync.sync()
+
+    assert first["uploaded"] == 2
+    assert again["uploaded"] == 0 and again["unchanged"] == 2
+    assert report["uploaded"] == 1 and report["removed"] == 1
+    assert set(index) == {encode_key("docs/a")}
+    assert index[encode_key("docs/a")]["content"] == "a v2"
+
+
+def test_moved_key_is_not_deleted(tmp_path):
+    datalake = FakeDataLake({"docs/a": ("1", b"K1"), "docs/b": ("1", b"K2")})
+    index = {}
+    with _sync(datalake, index, tmp_path, build_documents=_content_keyed) as sync:
+        sync.sync()
+
+        del datalake.files["docs/a"]
+        datalake.files["docs/c"] = ("1", b"K1")
+        report = sync.sync()
+        known = sync.manifest.entries()
+
+    assert report["removed"] == 0
+    assert index["K1"]["title"] == "docs/c"
+    assert set(known) == {"docs/b", "docs/c"}
+
+
+def test_failed_download_is_not_recorded(tmp_path):
+    datalake = FakeDataLake({"docs/a": ("1", b"a")})
+    index = {}
+    with _sync(datalake, index, tmp_path) as sync:
+        sync.sync()
+
+        datalake.files["docs/a"] = ("2", b"a v2")
+        datalake.files["docs/b"] = ("1", b"b")
+        datalake.unreadable.add("docs/a")
+        report = sync.sync()
+        known = sync.manifest.entries()
+
+        datalake.unreadable.clear()
+        retry = sync.plan()
+
+    assert report["failed_files"] == 1
+    # The previous version stays indexed and recorded until the file can be read
+    assert index[encode_key("docs/a")]["content"] == "a"
+    assert known["docs/a"][0] == "1"
+    assert retry["changed"] == ["docs/a"] and retry["new"] == []
+
+
+def test_failed_delete_keeps_the_file_in_the_manifest(tmp_path):
+    datalake = FakeDataLake({"docs/a": ("1", b"a"), "docs/b": ("1", b"b")})
+    index = {}
+    with _sync(datalake, index, tmp_path) as sync:
+        sync.sync()
+
+        del datalake.files["docs/b"]
+        sync.deletes.rejected.add(encode_key("docs/b"))
+        report = sync.sync()
+        retry = sync.plan()
+
+        sync.deletes.rejected.clear()
+        sync.sync()
+        known = sync.manifest.entries()
+
+    assert report["removed"] == 0 and report["failed_files"] == 1
+    assert retry["deleted"] == ["docs/b"]
+    assert set(known) == {"docs/a"}
+    assert set(index) == {encode_key("docs/a")}
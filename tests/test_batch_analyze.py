@@ -0,0 +1,105 @@
+import asyncio
+import json
+import os
+import sys
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "02_understanding_application"))
+
+from batch_analyze import BatchAnalyzer  # noqa: E402
+
+RESULT = {
+    "status": "Succeeded",
+    "result": {
+        "analyzerId": "cards",
+        "contents": [{"fields": {"Name": {"type": "string", "valueString": "Ada", "confidence": 0.9}}}],
+    },
+}
+
+
+class MockContentUnderstanding:
+    """
+    Stand-in for the analyze and analyzerResults endpoints. Analyze requests answer with
+    the scripted statuses first, then 202 and an Operation-Location; every operation is
+    Running on its first poll and Succeeded afterwards.
+    """
+
+    def __init__(self, analyze_statuses=()):
+        self.analyze_statuses = list(analyze_statuses)
+        self.analyze_requests = 0
+        self.polls = {}
+
+    def app(self):
+        app = web.Application()
+        app.router.add_post("/contentunderstanding/analyzers/{analyzer}", self.analyze)
+        app.router.add_get("/contentunderstanding/analyzerResults/{operation_id}", self.result)
+        return app
+
+    async def analyze(self, request):
+        await request.read()
+        self.analyze_requests += 1
+        status = self.analyze_statuses.pop(0) if self.analyze_statuses else 202
+        if status != 202:
+            return web.json_response({"error": {"code": str(status)}}, status=status, headers={"Retry-After": "0"})
+        operation_id = f"operation-{self.analyze_requests}"
+        location = request.url.with_path(f"/contentunderstanding/analyzerResults/{operation_id}")
+        return web.json_response({"id": operation_id}, status=202, headers={"Operation-Location": str(location)})
+
+    async def result(self, request):
+        operation_id = request.match_info["operation_id"]
+        self.polls[operation_id] = self.polls.get(operation_id, 0) + 1
+        if self.polls[operation_id] == 1:
+            return web.json_response({"id": operation_id, "status": "Running"})
+        return web.json_response({"id": operation_id, **RESULT})
+
+
+def _analyze(service, tmp_path, file_count):
+    files = []
+    for number in range(file_count):
+        path = tmp_path / f"card-{number}.png"
+        path.write_bytes(f"image {number}".encode())
+        files.append(str(path))
+    output_file = str(tmp_path / "results.jsonl")
+
+    async def run():
+        async with TestServer(service.app()) as server:
+            analyzer = BatchAnalyzer(
+                str(server.make_url("")), "key", "cards", initial_poll_interval=0.01, max_retries=2
+            )
+            return await analyzer.run(files, output_file)
+
+    report = asyncio.run(run())
+    with open(output_file, encoding="utf-8") as file:
+        records = [json.loads(line) for line in file]
+    return report, records
+
+
+def test_batch_analyzer_against_mock_service(tmp_path):
+    service = MockContentUnderstanding()
+    report, records = _analyze(service, tmp_path, file_count=3)
+
+    assert report["succeeded"] == 3
+    assert report["failed"] == 0
+    assert service.analyze_requests == 3
+    assert sorted(os.path.basename(record["file"]) for record in records) == ["card-0.png", "card-1.png", "card-2.png"]
+    assert all(record["fields"] == {"Name": "Ada"} for record in records)
+
+
+def test_throttled_analyze_is_resubmitted(tmp_path):
+    service = MockContentUnderstanding(analyze_statuses=[429])
+    report, _ = _analyze(service, tmp_path, file_count=1)
+
+    assert report["succeeded"] == 1
+    assert service.analyze_requests == 2
+
+
+def test_failed_analyze_is_not_resubmitted(tmp_path):
+    # A 5xx may come after the analysis was accepted: sending it again would bill it twice
+    service = MockContentUnderstanding(analyze_statuses=[500])
+    report, records = _analyze(service, tmp_path, file_count=1)
+
+    assert report["failed"] == 1
+    assert service.analyze_requests == 1
+    assert records[0]["status"] == "Error"